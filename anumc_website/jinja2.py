@@ -0,0 +1,61 @@
+"""Jinja2 environment for the high-traffic ANUMC templates.
+
+The home page and event detail page (and the base template they extend)
+have Jinja2 equivalents under ``jinja2/main/``.  This module builds the
+environment used by Django's Jinja2 backend and exposes the helpers and
+filters those templates rely on so they render the same markup as the
+Django templates:
+
+* ``static()`` and ``url()`` globals, mirroring ``{% static %}`` and
+  ``{% url %}``;
+* ``truncatewords``, ``linebreaks`` and ``date`` filters, mirroring the
+  Django built-in filters of the same name.
+
+The backend is only enabled when Jinja2 is installed; see ``TEMPLATES`` in
+``settings.py``.
+"""
+from __future__ import annotations
+
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils import dateformat
+from django.utils.html import linebreaks as _linebreaks
+from django.utils.text import Truncator
+from jinja2 import Environment, pass_eval_context
+from markupsafe import Markup
+
+
+def url(viewname: str, *args, **kwargs) -> str:
+    """Reverse a named URL, accepting positional or keyword arguments."""
+    return reverse(viewname, args=args or None, kwargs=kwargs or None)
+
+
+def truncatewords(value, length: int) -> str:
+    """Truncate ``value`` after ``length`` words, like Django's filter."""
+    return Truncator(str(value)).words(int(length), truncate=" …")
+
+
+@pass_eval_context
+def linebreaks(eval_ctx, value) -> Markup | str:
+    """Convert newlines into ``<p>`` and ``<br>`` tags, escaping input."""
+    html = _linebreaks(value, autoescape=eval_ctx.autoescape)
+    return Markup(html) if eval_ctx.autoescape else html
+
+
+def date(value, fmt: str = "N j, Y") -> str:
+    """Format a date/datetime using Django's ``date`` format syntax."""
+    if value in (None, ""):
+        return ""
+    return dateformat.format(value, fmt)
+
+
+def environment(**options) -> Environment:
+    """Return the Jinja2 environment used by the template backend."""
+    env = Environment(**options)
+    env.globals.update({"static": static, "url": url})
+    env.filters.update({
+        "truncatewords": truncatewords,
+        "linebreaks": linebreaks,
+        "date": date,
+    })
+    return env
@@ -53,21 +53,39 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    # Outermost after security so it sees the final response body.
+    "main.compression.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    # Must follow AuthenticationMiddleware so per-user buckets can be keyed.
+    "main.throttling.ThrottleMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
 ROOT_URLCONF = "anumc_website.urls"
 
+# Django templates are always served through the cached loader.  Django
+# enables it implicitly when ``loaders`` is omitted, but spelling it out
+# guarantees compiled templates are reused between requests in production
+# regardless of ``DEBUG`` (the cached loader still picks up edits under the
+# development server's autoreloader).
+TEMPLATE_LOADERS = [
+    (
+        "django.template.loaders.cached.Loader",
+        [
+            "django.template.loaders.filesystem.Loader",
+            "django.template.loaders.app_directories.Loader",
+        ],
+    ),
+]
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
-        "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
                 "django.template.context_processors.debug",
@@ -75,15 +93,44 @@ TEMPLATES = [
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
             ],
+            "loaders": TEMPLATE_LOADERS,
         },
     },
 ]
 
+# Optional Jinja2 backend for the high-traffic templates (base, home and
+# event detail) under ``jinja2/main/``.  It is registered whenever Jinja2
+# is installed so it can be benchmarked, but only takes precedence over
+# the Django templates when ``DJANGO_TEMPLATE_ENGINE=jinja2``; templates
+# without a Jinja2 counterpart always fall through to the Django engine.
+try:
+    import jinja2  # noqa: F401
+except ImportError:  # pragma: no cover - Jinja2 is optional
+    pass
+else:
+    JINJA2_TEMPLATES = {
+        "BACKEND": "django.template.backends.jinja2.Jinja2",
+        "NAME": "jinja2",
+        "DIRS": [BASE_DIR / "jinja2"],
+        "APP_DIRS": False,
+        "OPTIONS": {
+            "environment": "anumc_website.jinja2.environment",
+            "auto_reload": DEBUG,
+        },
+    }
+    if os.environ.get("DJANGO_TEMPLATE_ENGINE") == "jinja2":
+        TEMPLATES.insert(0, JINJA2_TEMPLATES)
+    else:
+        TEMPLATES.append(JINJA2_TEMPLATES)
+
 WSGI_APPLICATION = "anumc_website.wsgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/stable/ref/settings/#databases
 
+# Seconds a database connection is reused for; 0 closes it after every request.
+DB_CONN_MAX_AGE = int(os.environ.get("DB_CONN_MAX_AGE", "600"))
+
 if os.environ.get("DJANGO_DATABASE") == "mariadb":
     # Example MariaDB configuration.  Ensure mysqlclient or mariadb connector
     # package is installed and adjust credentials accordingly.
@@ -100,6 +147,10 @@ if os.environ.get("DJANGO_DATABASE") == "mariadb":
                 # MariaDB specific option to support strict mode
                 "init_command": "SET sql_mode='STRICT_TRANS_TABLES'",
             },
+            # Keep connections across requests, so the one opened by the
+            # worker warm-up (main/warmup.py) is still there for traffic.
+            "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": True,
         }
     }
 else:
@@ -107,9 +158,56 @@ else:
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": BASE_DIR / "db.sqlite3",
+            # Use an on-disk test database: SQLite's shared in-memory
+            # databases fail concurrent writers immediately with "table is
+            # locked" instead of waiting, which breaks the concurrency tests.
+            "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
+            "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": True,
         }
     }
 
+# Cache
+# https://docs.djangoproject.com/en/stable/topics/cache/
+#
+# Throttling buckets and cached page fragments must be shared between
+# worker processes in production, so point ``DJANGO_REDIS_URL`` at a Redis
+# server there.  Without it each process uses its own local-memory cache.
+
+if os.environ.get("DJANGO_REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["DJANGO_REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Throttling of expensive POSTs, keyed by URL name; see main/throttling.py.
+THROTTLE_RATES = {
+    "event-signup": {"user": "10/min", "ip": "30/min", "event": "300/min"},
+    "signup": {"ip": "10/hour"},
+}
+# Reverse proxies (e.g. nginx) in front of the site; the client address is
+# then read from THROTTLE_PROXY_HEADER rather than REMOTE_ADDR.
+THROTTLE_TRUSTED_PROXIES = int(os.environ.get("ANUMC_TRUSTED_PROXIES", "0"))
+THROTTLE_PROXY_HEADER = "HTTP_X_FORWARDED_FOR"
+
+# Response compression (main/compression.py): level per encoding, and how
+# long compressed copies of cacheable pages are kept.  Brotli is used when
+# the ``brotli`` package is installed.
+COMPRESSION_LEVELS = {"br": 5, "gzip": 6}
+COMPRESSION_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Names the service worker's caches so a deploy replaces the old ones; when
+# unset a hash of the worker and precached assets is used (main/offline.py).
+SERVICE_WORKER_VERSION = os.environ.get("ANUMC_RELEASE", "")
+
 # Password validation
 # https://docs.djangoproject.com/en/stable/ref/settings/#auth-password-validators
 
@@ -150,6 +248,19 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Uploads.  Form fields other than files may total 1 MB.  Files of up to
+# 256 KB are kept in memory and larger ones go straight to disk.  Event
+# images are streamed to disk by main.uploads.EventImageUploadHandler,
+# which enforces the EVENT_IMAGE_* limits while the upload arrives.
+DATA_UPLOAD_MAX_MEMORY_SIZE = 2**20
+DATA_UPLOAD_MAX_NUMBER_FIELDS = 200
+FILE_UPLOAD_MAX_MEMORY_SIZE = 256 * 2**10
+FILE_UPLOAD_TEMP_DIR = os.environ.get("ANUMC_UPLOAD_TEMP_DIR") or None
+FILE_UPLOAD_PERMISSIONS = 0o644
+EVENT_IMAGE_MAX_BYTES = 10 * 2**20
+EVENT_IMAGE_MAX_SIDE = 12_000
+EVENT_IMAGE_MAX_PIXELS = 50_000_000
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/stable/ref/settings/#default-auto-field
 
@@ -0,0 +1,39 @@
+"""Gunicorn settings for the ANUMC site (``gunicorn anumc_website.wsgi``).
+
+Gunicorn reads this file from the working directory.  The application is
+imported once in the master and shared with the workers copy-on-write;
+each worker then warms itself up before accepting requests.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+preload_app = True
+# Recycle workers now and then; the warm-up keeps that cheap.
+max_requests = 5000
+max_requests_jitter = 500
+
+
+def post_fork(server, worker):
+    # Never share database sockets opened in the master with workers.
+    from django.db import connections
+
+    connections.close_all()
+
+
+def post_worker_init(worker):
+    # Best effort: an exception here would stop the worker from booting and
+    # gunicorn would then shut down, e.g. during a short database outage.
+    try:
+        from main.warmup import warm_up
+
+        def failed(step, exc):
+            worker.log.exception("warm-up %s failed; continuing", step)
+
+        for step, count, seconds in warm_up(on_error=failed):
+            worker.log.info("warm-up %s: %d in %.1f ms", step, count, seconds * 1000)
+    except Exception:
+        worker.log.exception("warm-up failed; serving requests cold")
@@ -2,12 +2,12 @@
 from __future__ import annotations
 
 from django.contrib import admin
-from .models import Announcement, Event, EventSignup
+from .models import Announcement, ArchivedEvent, Event, EventSignup, GearItem, HireBooking
 
 
 @admin.register(Announcement)
 class AnnouncementAdmin(admin.ModelAdmin):
-    list_display = ("title", "created_at", "display_on_home")
+    list_display = ("title", "created_at", "display_on_home", "publish_at", "expire_at")
     list_filter = ("display_on_home",)
 
 
@@ -19,8 +19,8 @@ class EventAdmin(admin.ModelAdmin):
         "start_datetime",
         "end_datetime",
         "category",
-        "spots_total",
-        "spots_available",
+        "trip_capacity",
+        "participant_count",
         "approval_status",
     )
     list_filter = ("category", "approval_status")
@@ -29,4 +29,27 @@ class EventAdmin(admin.ModelAdmin):
 @admin.register(EventSignup)
 class EventSignupAdmin(admin.ModelAdmin):
     list_display = ("event", "full_name", "email", "created_at")
-    search_fields = ("full_name", "email", "event__title")
\ No newline at end of file
+    search_fields = ("full_name", "email", "event__title")
+
+
+@admin.register(ArchivedEvent)
+class ArchivedEventAdmin(admin.ModelAdmin):
+    list_display = ("title", "start_datetime", "end_datetime", "archived_at")
+    search_fields = ("title", "slug")
+    readonly_fields = ("original_id", "slug", "title", "start_datetime", "end_datetime", "archived_at", "data")
+
+
+@admin.register(GearItem)
+class GearItemAdmin(admin.ModelAdmin):
+    list_display = ("code", "name", "kind", "active")
+    list_filter = ("kind", "active")
+    search_fields = ("code", "name")
+
+
+@admin.register(HireBooking)
+class HireBookingAdmin(admin.ModelAdmin):
+    list_display = ("item", "hirer_name", "pickup_date", "return_date", "status")
+    list_filter = ("status", "item__kind")
+    search_fields = ("item__code", "hirer_name", "email")
+    date_hierarchy = "pickup_date"
+    raw_id_fields = ("item", "user")
@@ -0,0 +1,129 @@
+"""Move finished trips out of the hot tables and back again.
+
+Every page that lists trips, and every sign-up, reads ``Event`` and
+``EventSignup``; after a few seasons most of their rows are trips that
+ended long ago.  :func:`archive_events` moves those rows into
+:class:`~main.models.ArchivedEvent` and
+:class:`~main.models.ArchivedEventSignup` in bounded batches, each in its
+own transaction, so the hot tables (and their indexes) only hold recent
+and upcoming trips.  Each trip's revision history goes with it.
+:func:`restore_event` moves a trip back with its original primary keys.
+
+Rows are serialised with Django's JSON serializer, so the archive does not
+need a migration whenever a column is added to ``Event``.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+
+from django.contrib.auth.models import User
+from django.core import serializers
+from django.db import transaction
+
+from .models import ArchivedEvent, ArchivedEventRevision, ArchivedEventSignup, Event, EventRevision, EventSignup
+
+
+class SlugTaken(Exception):
+    """A trip cannot be restored because its slug is used by a live event."""
+
+
+def archive_events(cutoff: datetime, *, batch_size: int = 500, dry_run: bool = False) -> int:
+    """Archive events that ended before ``cutoff``; return how many moved.
+
+    Each batch of events is copied to the archive and deleted from the hot
+    tables in one transaction, so an interrupted run leaves every trip
+    either fully live or fully archived.
+    """
+    candidates = Event.objects.filter(end_datetime__lt=cutoff)
+    if dry_run:
+        return candidates.count()
+    moved = 0
+    while True:
+        with transaction.atomic():
+            events = list(candidates.select_for_update().order_by("pk")[:batch_size])
+            if not events:
+                return moved
+            _archive_batch(events)
+        moved += len(events)
+
+
+def _archive_batch(events: list[Event]) -> None:
+    archived = ArchivedEvent.objects.bulk_create([
+        ArchivedEvent(
+            original_id=event.pk,
+            slug=event.slug,
+            title=event.title,
+            start_datetime=event.start_datetime,
+            end_datetime=event.end_datetime,
+            data=serializers.serialize("json", [event]),
+        )
+        for event in events
+    ])
+    archive_ids = dict(
+        ArchivedEvent.objects.filter(original_id__in=[a.original_id for a in archived])
+        .values_list("original_id", "pk")
+    )
+    event_ids = list(archive_ids)
+    signups = EventSignup.objects.filter(event_id__in=event_ids)
+    ArchivedEventSignup.objects.bulk_create(
+        [
+            ArchivedEventSignup(
+                original_id=signup.pk,
+                event_id=archive_ids[signup.event_id],
+                email=signup.email,
+                user_id=signup.user_id,
+                data=serializers.serialize("json", [signup]),
+            )
+            for signup in signups.iterator()
+        ],
+        batch_size=1000,
+    )
+    ArchivedEventRevision.objects.bulk_create(
+        [
+            ArchivedEventRevision(
+                event_id=archive_ids[revision.event_id],
+                number=revision.number,
+                is_snapshot=revision.is_snapshot,
+                comment=revision.comment,
+                created_at=revision.created_at,
+                payload=revision.payload,
+            )
+            for revision in EventRevision.objects.filter(event_id__in=event_ids).iterator()
+        ],
+        batch_size=1000,
+    )
+    # Sign-ups and revisions go with their events (``release_place`` skips
+    # sign-ups deleted along with their trip).
+    Event.objects.filter(pk__in=event_ids).delete()
+
+
+@transaction.atomic
+def restore_event(slug: str) -> Event:
+    """Move the archived trip ``slug`` back into the hot tables."""
+    archived = ArchivedEvent.objects.select_for_update().get(slug=slug)
+    if Event.objects.filter(slug=slug).exists():
+        raise SlugTaken(slug)
+    event = archived.to_event()
+    signups = [signup.to_signup() for signup in archived.signups.iterator()]
+    # Accounts deleted since archiving: keep the rows, drop the links.
+    user_ids = {event.created_by_id} | {signup.user_id for signup in signups}
+    existing = set(User.objects.filter(pk__in=user_ids - {None}).values_list("pk", flat=True))
+    if event.created_by_id not in existing:
+        event.created_by_id = None
+    for signup in signups:
+        if signup.user_id not in existing:
+            signup.user_id = None
+    # ``bulk_create`` keeps the original primary keys and, unlike ``save``,
+    # fires no signals: the stored participant counter is still correct.
+    Event.objects.bulk_create([event])
+    EventSignup.objects.bulk_create(signups, batch_size=1000)
+    revisions = [revision.to_revision(event.pk) for revision in archived.revisions.iterator()]
+    created_at = [revision.created_at for revision in revisions]
+    EventRevision.objects.bulk_create(revisions, batch_size=1000)
+    # ``auto_now_add`` stamped the restored rows with the current time;
+    # put the original edit times back.
+    for revision, timestamp in zip(revisions, created_at):
+        revision.created_at = timestamp
+    EventRevision.objects.bulk_update(revisions, ["created_at"], batch_size=1000)
+    archived.delete()
+    return event
@@ -0,0 +1,65 @@
+"""Cache helpers for the ANUMC site.
+
+Cached values are invalidated explicitly from the signal handlers in
+``signals.py`` whenever the underlying rows are edited.  That only clears
+the cache of the process that made the edit: with the default per-process
+``LocMemCache`` the other workers keep their copy, so there every entry
+also expires after at most ``HOME_ANNOUNCEMENTS_MAX_TTL`` seconds.  A
+shared cache (Redis, via ``DJANGO_REDIS_URL``) sees every invalidation,
+so entries are kept until the next edit.  TTLs also account for changes
+that happen without an edit (such as a scheduled announcement going
+live).
+"""
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Announcement
+
+HOME_ANNOUNCEMENTS_KEY = "main:home-announcements"
+
+#: Longest time an edit may take to reach workers that didn't make it,
+#: when each worker has its own cache.
+HOME_ANNOUNCEMENTS_MAX_TTL = 5 * 60
+
+
+def cache_is_local() -> bool:
+    """Whether each worker process has a cache of its own."""
+    return settings.CACHES["default"]["BACKEND"].endswith(".LocMemCache")
+
+
+def announcements_ttl(now) -> int | None:
+    """Seconds the home-page announcement block may be cached at ``now``.
+
+    The lifetime runs until the next scheduled ``publish_at``/``expire_at``
+    boundary, rounded down so cached output is never served past a
+    scheduled change.  With a per-process cache it is capped at
+    ``HOME_ANNOUNCEMENTS_MAX_TTL``; with a shared one and nothing
+    scheduled it is ``None``, i.e. until invalidated.
+    """
+    cap = HOME_ANNOUNCEMENTS_MAX_TTL if cache_is_local() else None
+    boundary = Announcement.objects.next_boundary(now)
+    if boundary is None:
+        return cap
+    ttl = max(int((boundary - now).total_seconds()), 0)
+    return ttl if cap is None else min(ttl, cap)
+
+
+def home_announcements(now=None) -> list[Announcement]:
+    """Return the announcements currently shown on the home page."""
+    announcements = cache.get(HOME_ANNOUNCEMENTS_KEY)
+    if announcements is not None:
+        return announcements
+    now = now or timezone.now()
+    announcements = list(Announcement.objects.live(now))
+    ttl = announcements_ttl(now)
+    # A TTL of zero means a boundary is imminent; don't cache at all.
+    if ttl != 0:
+        cache.set(HOME_ANNOUNCEMENTS_KEY, announcements, ttl)
+    return announcements
+
+
+def invalidate_home_announcements() -> None:
+    cache.delete(HOME_ANNOUNCEMENTS_KEY)
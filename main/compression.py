@@ -0,0 +1,214 @@
+"""Response compression with brotli or gzip.
+
+:class:`CompressionMiddleware` compresses text responses (HTML, JSON,
+JavaScript, CSS) for clients that accept it, choosing the encoding from
+``Accept-Encoding`` with its q-values.  Brotli is used when the optional
+``brotli`` package is installed, gzip otherwise.
+
+Compressing the same page over and over is wasted CPU, so the compressed
+body of a cacheable response - status 200, an ``ETag`` and no
+``private``/``no-store`` - is kept in the default cache under its URL,
+ETag, a hash of the body, encoding and level.  The next hit with the same
+body reuses it.
+
+Pages that include a CSRF token are open to the BREACH attack, which
+guesses a secret from how well it compresses next to text the attacker
+controls.  Like Django's ``GZipMiddleware``, they are sent as gzip with
+up to ``BREACH_MAX_RANDOM_BYTES`` of random padding in the header, so the
+length no longer tells a guess apart, and are never cached.
+
+Streaming responses (exports, feeds) are compressed chunk by chunk and
+each chunk is flushed, so bytes keep flowing to the client.
+
+Levels are set per encoding in ``COMPRESSION_LEVELS``; the defaults trade
+a little ratio for much less CPU than the maximum levels.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import re
+import secrets
+import zlib
+from typing import Iterable, Iterator
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+DEFAULT_LEVELS = {"br": 5, "gzip": 6}
+
+#: How long compressed variants stay cached, in seconds.
+DEFAULT_CACHE_TIMEOUT = 60 * 60 * 24
+
+#: Bodies shorter than this are sent as they are.
+MIN_LENGTH = 200
+
+#: Most random bytes padded into responses that carry a CSRF token; the
+#: same as Django's ``GZipMiddleware``.
+BREACH_MAX_RANDOM_BYTES = 100
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+_weak_etag = re.compile(r'^"')
+_uncacheable = re.compile(r"\b(private|no-store)\b")
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Supported encodings, most preferred first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str, encodings: tuple[str, ...] | None = None) -> str | None:
+    """Pick the encoding to use for an ``Accept-Encoding`` header.
+
+    ``encodings`` limits the choice; it defaults to
+    :func:`available_encodings`.
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        match = re.search(r"q\s*=\s*([0-9.]+)", params)
+        if match:
+            try:
+                quality = float(match.group(1))
+            except ValueError:
+                quality = 0.0
+        weights[coding] = quality
+    best, best_quality = None, 0.0
+    for encoding in encodings or available_encodings():
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def level_for(encoding: str) -> int:
+    levels = {**DEFAULT_LEVELS, **getattr(settings, "COMPRESSION_LEVELS", {})}
+    return levels[encoding]
+
+
+def _pad_gzip(data: bytes, max_random_bytes: int) -> bytes:
+    """Put a random-length file name into the header of gzip ``data``."""
+    header = bytearray(data[:10])
+    header[3] |= gzip.FNAME
+    return bytes(header) + b"a" * secrets.randbelow(max_random_bytes) + b"\x00" + data[10:]
+
+
+def compress(data: bytes, encoding: str, level: int, *, max_random_bytes: int = 0) -> bytes:
+    """Compress ``data``; gzip output gets up to ``max_random_bytes`` of padding."""
+    if encoding == "br":
+        return brotli.compress(data, quality=level, mode=brotli.MODE_TEXT)
+    data = gzip.compress(data, compresslevel=level, mtime=0)
+    return _pad_gzip(data, max_random_bytes) if max_random_bytes else data
+
+
+def compress_stream(
+    chunks: Iterable[bytes], encoding: str, level: int, *, max_random_bytes: int = 0
+) -> Iterator[bytes]:
+    """Compress ``chunks`` incrementally, flushing after every chunk."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=level, mode=brotli.MODE_TEXT)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+    # wbits=31 writes a gzip header and trailer.
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    padded = not max_random_bytes
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            if not padded:
+                data, padded = _pad_gzip(data, max_random_bytes), True
+            yield data
+    data = compressor.flush()
+    yield data if padded else _pad_gzip(data, max_random_bytes)
+
+
+def _cache_key(request, response, encoding: str, level: int) -> str | None:
+    """Key for the compressed body, or ``None`` if it must not be cached."""
+    etag = response.get("ETag")
+    if response.status_code != 200 or not etag or _uncacheable.search(response.get("Cache-Control", "")):
+        return None
+    # The body hash guards against a deploy changing a template while the
+    # ETag (derived from the data) stays the same.
+    ident = f"{request.get_host()}{request.get_full_path()}\n{etag}\n".encode()
+    return f"compressed:{encoding}:{level}:{hashlib.md5(ident + response.content).hexdigest()}"
+
+
+def carries_csrf_token(request) -> bool:
+    """Whether the response includes this request's CSRF token."""
+    # Set by ``get_token``, i.e. whenever ``{% csrf_token %}`` is rendered.
+    return bool(request.META.get("CSRF_COOKIE_NEEDS_UPDATE"))
+
+
+class CompressionMiddleware:
+    """Compress text responses with brotli or gzip, caching the results."""
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding") or not response.get("Content-Type", "").startswith(
+            COMPRESSIBLE_TYPES
+        ):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if not response.streaming and len(response.content) < MIN_LENGTH:
+            return response
+        # Only gzip can be padded against BREACH.
+        padding = BREACH_MAX_RANDOM_BYTES if carries_csrf_token(request) else 0
+        encoding = negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""), ("gzip",) if padding else None)
+        if encoding is None:
+            return response
+        level = level_for(encoding)
+
+        if response.streaming:
+            if response.is_async:
+                # Leave async iterators to the server; they're not used here.
+                return response
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding, level, max_random_bytes=padding
+            )
+            del response["Content-Length"]
+        else:
+            key = None if padding else _cache_key(request, response, encoding, level)
+            body = cache.get(key) if key else None
+            if body is None:
+                body = compress(response.content, encoding, level, max_random_bytes=padding)
+                if key:
+                    timeout = getattr(settings, "COMPRESSION_CACHE_TIMEOUT", DEFAULT_CACHE_TIMEOUT)
+                    cache.set(key, body, timeout)
+            if len(body) >= len(response.content):
+                return response
+            response.content = body
+            response["Content-Length"] = str(len(body))
+
+        # The compressed bytes differ from the identity representation, so
+        # the ETag can only be a weak validator from here on.
+        if response.has_header("ETag"):
+            response["ETag"] = _weak_etag.sub('W/"', response["ETag"])
+        response["Content-Encoding"] = encoding
+        return response
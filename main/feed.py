@@ -0,0 +1,202 @@
+"""Personalised ordering of the home page for logged-in members.
+
+Each upcoming event gets a score for each member.  The score combines:
+
+* the categories picked on the preferences page;
+* past sign-ups in the event's category;
+* how close the event's difficulty is to the member's.  This is the
+  preferred difficulty or, if none is set, the most common difficulty
+  of the member's past sign-ups.
+
+Events are listed by score, highest first.  Equal scores keep the usual
+date order.
+
+Requests never score events.  The scores are kept in the cache for each
+member as ``(generation, taste, scores)``.  ``scores`` maps event ids to
+scores and holds only the non-zero ones.  When an event is saved or
+deleted, :func:`event_changed` increments the shared ``generation``
+counter and stores that event's new category and difficulty under the
+new generation.  On the next request, :func:`ranking` re-scores only the
+events changed since the member's cached generation, using the cached
+taste, so no query is needed.  A member's ranking is rebuilt with three
+queries only in these cases:
+
+* it is missing;
+* it is more than ``MAX_CHANGES`` generations behind;
+* one of the change records has expired.
+
+The counter starts at a random value, so a counter that was evicted and
+started again cannot line up with old rankings by accident.  Editing a
+member's preferences or sign-ups drops that member's ranking.
+``FEED_TTL`` limits how long a ranking can stay stale after bulk changes
+that send no signals.
+
+The counter is only shared between worker processes when the cache is
+(Redis, via ``DJANGO_REDIS_URL``).  With the local-memory cache every
+worker keeps its own counter and never hears of edits made through the
+others, so rankings are kept for ``LOCAL_FEED_TTL`` only.
+"""
+from __future__ import annotations
+
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .caching import cache_is_local
+from .models import Event, EventSignup, UserProfile
+
+FEED_KEY = "main:feed:{user_id}"
+GENERATION_KEY = "main:feed:generation"
+CHANGE_KEY = "main:feed:change:{generation}"
+
+#: Seconds a ranking or change record is kept.
+FEED_TTL = 60 * 60
+#: The same when the cache belongs to one worker process.
+LOCAL_FEED_TTL = 60
+
+#: Changes applied incrementally before a ranking is rebuilt instead.
+MAX_CHANGES = 200
+
+CATEGORY_WEIGHT = 30
+HISTORY_WEIGHT = 10
+#: Past sign-ups in one category counted towards its weight.
+HISTORY_CAP = 3
+DIFFICULTY_WEIGHT = 20
+DIFFICULTY_RANK = {"easy": 1, "moderate": 2, "hard": 3}
+
+
+@dataclass(frozen=True)
+class Taste:
+    """What a member's ranking is computed from."""
+
+    categories: frozenset = frozenset()
+    difficulty: int | None = None
+    history: dict = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(self.categories or self.difficulty or self.history)
+
+
+def taste_for(user) -> Taste:
+    """Read a member's preferences and sign-up history (two queries)."""
+    categories, difficulty = (
+        UserProfile.objects.filter(user=user).values_list("preferred_categories", "preferred_difficulty").first()
+        or ([], "")
+    )
+    history: Counter = Counter()
+    difficulties: Counter = Counter()
+    for category, level in EventSignup.objects.filter(user=user).values_list("event__category", "event__difficulty_level"):
+        history[category] += 1
+        if level in DIFFICULTY_RANK:
+            difficulties[level] += 1
+    if not difficulty and difficulties:
+        difficulty = difficulties.most_common(1)[0][0]
+    return Taste(
+        categories=frozenset(categories or ()),
+        difficulty=DIFFICULTY_RANK.get(difficulty),
+        history={category: min(count, HISTORY_CAP) for category, count in history.items()},
+    )
+
+
+def score(taste: Taste, category: str, difficulty: str) -> int:
+    """Score of an event with ``category`` and ``difficulty`` for ``taste``."""
+    points = HISTORY_WEIGHT * taste.history.get(category, 0)
+    if category in taste.categories:
+        points += CATEGORY_WEIGHT
+    if taste.difficulty is not None:
+        rank = DIFFICULTY_RANK.get(difficulty)
+        if rank is None:
+            # Ungraded events neither fit nor clash.
+            points += DIFFICULTY_WEIGHT // 2
+        else:
+            points += max(DIFFICULTY_WEIGHT - 10 * abs(rank - taste.difficulty), 0)
+    return points
+
+
+def feed_ttl() -> int:
+    """Seconds to keep rankings for, given how widely the cache is shared."""
+    if cache_is_local():
+        return LOCAL_FEED_TTL
+    return FEED_TTL
+
+
+def _start_generation() -> int:
+    cache.add(GENERATION_KEY, random.getrandbits(48), None)
+    return cache.get(GENERATION_KEY)
+
+
+def _build(user, generation: int) -> tuple[int, Taste, dict[int, int]]:
+    taste = taste_for(user)
+    scores: dict[int, int] = {}
+    if taste:
+        upcoming = Event.objects.filter(end_datetime__gte=timezone.now()).values_list("pk", "category", "difficulty_level")
+        for pk, category, difficulty in upcoming:
+            points = score(taste, category, difficulty)
+            if points:
+                scores[pk] = points
+    return generation, taste, scores
+
+
+def _apply(feed: tuple[int, Taste, dict[int, int]], generation: int):
+    """Bring a cached ranking up to ``generation``, or return ``None``."""
+    feed_generation, taste, scores = feed
+    if not 0 < generation - feed_generation <= MAX_CHANGES:
+        return None
+    keys = [CHANGE_KEY.format(generation=number) for number in range(feed_generation + 1, generation + 1)]
+    changes = cache.get_many(keys)
+    if len(changes) != len(keys):
+        return None
+    scores = dict(scores)
+    for key in keys:
+        pk, features = changes[key]
+        points = score(taste, *features) if features else 0
+        if points:
+            scores[pk] = points
+        else:
+            scores.pop(pk, None)
+    return generation, taste, scores
+
+
+def ranking(user) -> dict[int, int]:
+    """Return the member's scores by event id, updating the cache as needed."""
+    key = FEED_KEY.format(user_id=user.pk)
+    cached = cache.get_many([GENERATION_KEY, key])
+    generation = cached.get(GENERATION_KEY)
+    if generation is None:
+        generation = _start_generation()
+    feed = cached.get(key)
+    if feed is not None and feed[0] == generation:
+        return feed[2]
+    # The generation is read before any rows, so edits committed while
+    # rebuilding are applied on the next request.
+    feed = (feed is not None and _apply(feed, generation)) or _build(user, generation)
+    cache.set(key, feed, feed_ttl())
+    return feed[2]
+
+
+def personalise(user, events) -> list[Event]:
+    """Order ``events`` for ``user``: best scores first, then by date."""
+    scores = ranking(user)
+    events = list(events)
+    if scores:
+        events.sort(key=lambda event: -scores.get(event.pk, 0))
+    return events
+
+
+def event_changed(pk: int, category: str, difficulty: str, end_datetime, *, deleted: bool = False) -> None:
+    """Record an edit to an event for every member's ranking."""
+    upcoming = not deleted and end_datetime >= timezone.now()
+    try:
+        generation = cache.incr(GENERATION_KEY)
+    except ValueError:
+        # No counter, so no ranking can be current; the next read starts one.
+        return
+    cache.set(CHANGE_KEY.format(generation=generation), (pk, (category, difficulty) if upcoming else None), feed_ttl())
+
+
+def invalidate(user_id: int) -> None:
+    """Drop a member's ranking after their preferences or sign-ups change."""
+    cache.delete(FEED_KEY.format(user_id=user_id))
@@ -9,11 +9,13 @@ validation for free.
 
 from __future__ import annotations
 
+import uuid
+
 from django import forms
 from django.contrib.auth.models import User
-from django.utils.text import slugify
 
-from .models import Event, EventSignup
+from .models import Event, EventSignup, UserProfile
+from .slugs import allocate_slug, save_with_unique_slug
 
 
 class EventForm(forms.ModelForm):
@@ -30,6 +32,7 @@ class EventForm(forms.ModelForm):
         fields = [
             "title",
             "description",
+            "image",
             "meeting_datetime",
             "meeting_location",
             "emergency_contact_details",
@@ -56,21 +59,24 @@ class EventForm(forms.ModelForm):
             "description": forms.Textarea(attrs={"rows": 6}),
             "comment": forms.Textarea(attrs={"rows": 3}),
             "requested_information": forms.TextInput(),
+            "image": forms.ClearableFileInput(attrs={"accept": "image/jpeg,image/png,image/gif,image/webp"}),
         }
 
     def save(self, commit: bool = True) -> Event:
         """Automatically generate a slug from the title if not provided.
 
-        Because the slug field on the Event model is unique, this helper
-        ensures that a sensible slug is created by lowercasing the title
-        and replacing spaces with hyphens.  Duplicate slugs will raise
-        an integrity error when saving if a trip with the same title
-        already exists.
+        Because the slug field on the Event model is unique, recurring
+        titles are given the next free numeric suffix (``-2``, ``-3`` ...)
+        by :func:`main.slugs.save_with_unique_slug`, which also retries if
+        a concurrent creator claims the same slug first.  When saving with
+        ``commit=False`` the slug is allocated but not reserved.
         """
         instance = super().save(commit=False)
         # Generate slug only if this is a new instance and no slug has been set.
         if not instance.slug:
-            instance.slug = slugify(instance.title)
+            if commit:
+                return save_with_unique_slug(instance)
+            instance.slug = allocate_slug(Event, instance.title)
         if commit:
             instance.save()
         return instance
@@ -81,9 +87,13 @@ class EventSignupForm(forms.ModelForm):
 
     Only collects the participant's name, email and an optional
     experience/notes field.  The corresponding Event is provided via
-    the view and is not exposed on the form.
+    the view and is not exposed on the form.  A hidden, per-render
+    ``idempotency_key`` lets the view recognise double-clicks and retried
+    submissions of the same form.
     """
 
+    idempotency_key = forms.UUIDField(widget=forms.HiddenInput, required=False, initial=uuid.uuid4)
+
     class Meta:
         model = EventSignup
         fields = ["full_name", "email", "experience"]
@@ -128,4 +138,34 @@ class UserRegistrationForm(forms.ModelForm):
             profile.email = self.cleaned_data.get("email")
             profile.emergency_contact = self.cleaned_data.get("emergency_contact")
             profile.save()
-        return user
\ No newline at end of file
+        return user
+
+
+class TripPreferencesForm(forms.ModelForm):
+    """A member's preferred trip categories and difficulty."""
+
+    preferred_categories = forms.MultipleChoiceField(
+        choices=Event.CATEGORY_CHOICES,
+        required=False,
+        widget=forms.CheckboxSelectMultiple,
+        label="Activities",
+    )
+
+    class Meta:
+        model = UserProfile
+        fields = ["preferred_categories", "preferred_difficulty"]
+        labels = {"preferred_difficulty": "Difficulty"}
+
+
+class SignupSelectionForm(forms.Form):
+    """Leader's bulk accept/reject decision for sign-ups to one event."""
+
+    action = forms.ChoiceField(choices=[("accepted", "Accept"), ("rejected", "Reject")])
+    signups = forms.ModelMultipleChoiceField(
+        queryset=EventSignup.objects.none(),
+        widget=forms.CheckboxSelectMultiple,
+    )
+
+    def __init__(self, *args, event: Event, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.fields["signups"].queryset = event.signups.all()
@@ -0,0 +1,162 @@
+"""Offline geocoding of free-text trip locations.
+
+Locations are matched against the :class:`~main.models.GazetteerPlace`
+table, which ships with a small extract of the places the club visits
+(``main/data/gazetteer_au.csv``, loaded by a migration) and can be
+extended with a full GeoNames country file (``AU.txt`` from
+https://download.geonames.org/export/dump/) through the
+``load_gazetteer`` command.  No network service is involved.
+
+A location such as "Booroomba Rocks car park, Namadgi NP" is normalised
+and split into candidate phrases (longest first, in order of appearance).
+The first phrase naming a gazetteer place wins; among places sharing a
+name the most populous is used.
+
+Name lookups are cached in-process, so geocoding on every event save only
+hits the database for names this worker has not seen yet.
+:func:`geocode_many` resolves a whole batch of locations with one query.
+"""
+from __future__ import annotations
+
+import csv
+import re
+import unicodedata
+from pathlib import Path
+from typing import Iterable, Iterator
+
+BUNDLED_GAZETTEER = Path(__file__).resolve().parent / "data" / "gazetteer_au.csv"
+
+#: Longest phrase, in words, tried as a place name.
+MAX_PHRASE_WORDS = 5
+
+#: Names cached in-process before the cache is emptied.
+CACHE_SIZE = 10_000
+
+# Words that never make a place name on their own.
+STOPWORDS = {
+    "the", "and", "at", "near", "via", "of", "in", "on", "to", "from", "start", "meet", "meeting",
+    "car", "park", "carpark", "trailhead", "track", "walk", "road", "rd", "north", "south",
+    "east", "west", "upper", "lower", "area", "tbc", "tba", "somewhere",
+}
+# Generic feature words: part of many names ("Falls Creek") but never a
+# name by themselves.
+GENERIC_WORDS = {
+    "national", "nature", "reserve", "np", "nr", "mount", "mt", "lake", "river", "creek", "falls",
+    "valley", "state", "forest", "gorge", "peak", "rocks", "range", "beach", "bay", "island", "dam",
+    "point", "village", "hut",
+}
+_SEPARATORS = re.compile(r"[,;/()\[\]]|\s[-–—]\s|\b(?:near|via|then|and|or)\b")
+
+Coordinates = tuple[float, float]
+
+_cache: dict[str, Coordinates | None] = {}
+
+
+def normalise(text: str) -> str:
+    """Lower-case, strip accents and punctuation, collapse whitespace."""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    text = re.sub(r"[^a-z0-9]+", " ", text.lower())
+    return " ".join(text.split())
+
+
+def candidates(text: str) -> Iterator[str]:
+    """Yield the phrases of ``text`` that could name a place, best first."""
+    for part in _SEPARATORS.split(text.lower()):
+        words = normalise(part).split()
+        for size in range(min(len(words), MAX_PHRASE_WORDS), 0, -1):
+            for start in range(len(words) - size + 1):
+                phrase = words[start:start + size]
+                if all(word in STOPWORDS or word.isdigit() for word in phrase):
+                    continue
+                if size == 1 and (len(phrase[0]) < 3 or phrase[0] in GENERIC_WORDS):
+                    continue
+                yield " ".join(phrase)
+
+
+def _fetch(names: Iterable[str]) -> None:
+    """Load the coordinates of ``names`` into the cache."""
+    from .models import GazetteerPlace
+
+    missing = [name for name in dict.fromkeys(names) if name not in _cache]
+    if len(_cache) + len(missing) > CACHE_SIZE:
+        _cache.clear()
+    # Keep each query well inside SQLite's parameter limit.
+    for offset in range(0, len(missing), 500):
+        chunk = missing[offset:offset + 500]
+        found: dict[str, Coordinates] = {}
+        rows = (
+            GazetteerPlace.objects.filter(search_name__in=chunk)
+            .order_by("search_name", "-population")
+            .values_list("search_name", "latitude", "longitude")
+        )
+        for name, latitude, longitude in rows:
+            found.setdefault(name, (latitude, longitude))
+        for name in chunk:
+            _cache[name] = found.get(name)
+
+
+def _resolve(text: str) -> Coordinates | None:
+    for phrase in candidates(text):
+        if _cache.get(phrase):
+            return _cache[phrase]
+    return None
+
+
+def geocode(text: str) -> Coordinates | None:
+    """Return ``(latitude, longitude)`` for a free-text location, if known."""
+    if not text or not text.strip():
+        return None
+    _fetch(candidates(text))
+    return _resolve(text)
+
+
+def geocode_many(texts: Iterable[str]) -> list[Coordinates | None]:
+    """Geocode a batch of locations, fetching all unseen names at once."""
+    texts = list(texts)
+    _fetch(phrase for text in texts if text for phrase in candidates(text))
+    return [_resolve(text) if text else None for text in texts]
+
+
+def clear_cache() -> None:
+    """Forget cached lookups, e.g. after the gazetteer was reloaded."""
+    _cache.clear()
+
+
+def read_bundled(path: Path = BUNDLED_GAZETTEER) -> Iterator[dict]:
+    """Yield place rows (one per name and alternate name) from the bundled CSV."""
+    with open(path, newline="", encoding="utf-8") as fh:
+        for row in csv.DictReader(fh):
+            names = [row["name"]] + [name for name in row["alternate_names"].split("|") if name]
+            for name in names:
+                yield {
+                    "name": row["name"],
+                    "search_name": normalise(name),
+                    "latitude": float(row["latitude"]),
+                    "longitude": float(row["longitude"]),
+                    "admin1": row["admin1"],
+                    "population": int(row["population"] or 0),
+                }
+
+
+def read_geonames(path: Path) -> Iterator[dict]:
+    """Yield place rows from a GeoNames dump (tab separated, no header).
+
+    Only populated places, parks, mountains and other natural features
+    (feature classes P, L, T, H and V) are kept.
+    """
+    with open(path, newline="", encoding="utf-8") as fh:
+        for line in fh:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 15 or fields[6] not in {"P", "L", "T", "H", "V"}:
+                continue
+            name, ascii_name = fields[1], fields[2]
+            for search_name in dict.fromkeys([normalise(name), normalise(ascii_name)]):
+                if search_name:
+                    yield {
+                        "name": name[:200],
+                        "search_name": search_name[:200],
+                        "latitude": float(fields[4]),
+                        "longitude": float(fields[5]),
+                        "admin1": fields[10][:20],
+                        "population": int(fields[14] or 0),
+                    }
@@ -0,0 +1,95 @@
+"""Gear Store hire availability and bookings.
+
+An item is out from a hire's ``pickup_date`` to its ``return_date``
+inclusive, so two hires of the same item clash when each starts on or
+before the other ends.  :func:`available_items` answers "which tents are
+free from Friday to Sunday" with one query: the items of the kind for
+which no holding hire overlaps the requested dates, checked through the
+``(item, return_date, pickup_date)`` index.
+
+:func:`book_item` makes the check and the insert atomic per item.  Its
+first statement is an ``UPDATE`` of the item row, which takes the row lock
+on MySQL/PostgreSQL and the database write lock on SQLite, so a second
+booking of the same item waits and then sees the first one's hire.
+"""
+from __future__ import annotations
+
+from datetime import date
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import GearItem, HireBooking
+
+
+def overlapping(pickup_date: date, return_date: date):
+    """Holding hires that overlap ``pickup_date``–``return_date``."""
+    return HireBooking.objects.filter(
+        return_date__gte=pickup_date,
+        pickup_date__lte=return_date,
+        status__in=HireBooking.HOLDING_STATUSES,
+    )
+
+
+def _check_dates(pickup_date: date, return_date: date) -> None:
+    if return_date < pickup_date:
+        raise ValidationError("The return date must not be before the pickup date.")
+
+
+def available_items(kind: str, pickup_date: date, return_date: date):
+    """Active items of ``kind`` free for the whole of the given dates."""
+    _check_dates(pickup_date, return_date)
+    clashes = overlapping(pickup_date, return_date).filter(item=OuterRef("pk"))
+    return GearItem.objects.filter(kind=kind, active=True).exclude(Exists(clashes))
+
+
+def book_item(item: GearItem, pickup_date: date, return_date: date, *, hirer_name: str, email: str, user=None) -> HireBooking:
+    """Book ``item`` for the given dates.
+
+    Raises :class:`ValidationError` if the item is inactive or already
+    hired for any of the dates.
+    """
+    _check_dates(pickup_date, return_date)
+    with transaction.atomic():
+        # Write first: this locks the item against concurrent bookings
+        # before the overlap check reads anything.
+        locked = GearItem.objects.filter(pk=item.pk, active=True).update(last_booked_at=timezone.now())
+        if not locked:
+            raise ValidationError(f"{item.code} is not available for hire.")
+        if overlapping(pickup_date, return_date).filter(item=item).exists():
+            raise ValidationError(f"{item.code} is already hired between {pickup_date} and {return_date}.")
+        return HireBooking.objects.create(
+            item=item,
+            user=user,
+            hirer_name=hirer_name,
+            email=email,
+            pickup_date=pickup_date,
+            return_date=return_date,
+        )
+
+
+def book_any(kind: str, pickup_date: date, return_date: date, **hirer) -> HireBooking:
+    """Book the first free item of ``kind``, trying the next on a clash.
+
+    ``hirer`` takes the keyword arguments of :func:`book_item`.  Raises
+    :class:`ValidationError` when every item of the kind is taken.
+    """
+    for item in available_items(kind, pickup_date, return_date):
+        try:
+            return book_item(item, pickup_date, return_date, **hirer)
+        except ValidationError:
+            # Someone else booked it since the availability query.
+            continue
+    label = dict(GearItem.KIND_CHOICES).get(kind, kind)
+    raise ValidationError(f"No {label.lower()} is free between {pickup_date} and {return_date}.")
+
+
+def daily_manifest(day: date) -> dict[str, list[HireBooking]]:
+    """Hires to hand out and to expect back on ``day``."""
+    hires = HireBooking.objects.select_related("item").order_by("item__kind", "item__code")
+    return {
+        "pickups": list(hires.filter(pickup_date=day, status="booked")),
+        "returns": list(hires.filter(return_date=day, status="out")),
+    }
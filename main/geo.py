@@ -0,0 +1,105 @@
+"""Geohash grid and distance helpers for location search.
+
+Each geocoded event stores the geohash of its trip location
+(``Event.geohash``, ``GEOHASH_PRECISION`` characters, cells of about
+1.2 × 0.6 km).  Every prefix of a geohash is the cell containing it at a
+coarser precision, so "events inside these cells" becomes a few indexed
+range scans (``'r3dp' <= geohash < 'r3dp{'``).  :func:`covering_cells` picks the
+finest precision whose cells cover a bounding box in at most
+``MAX_CELLS`` cells; the exact box and radius filters then only run over
+the rows those scans return.
+
+Boxes crossing the antimeridian are not supported, which is fine for
+Australian trips.
+"""
+from __future__ import annotations
+
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+GEOHASH_PRECISION = 6
+MAX_CELLS = 16
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+#: Sorts after every geohash character: ``cell <= h < cell + PREFIX_END``
+#: holds exactly for the geohashes ``h`` starting with ``cell``.
+PREFIX_END = "{"
+
+
+def encode(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Return the geohash of a point."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coord = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coord >= mid:
+            value |= 1
+            interval[0] = mid
+        else:
+            interval[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = value = 0
+    return "".join(chars)
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    """Return the ``(height, width)`` in degrees of cells at ``precision``."""
+    lon_bits = math.ceil(5 * precision / 2)
+    lat_bits = 5 * precision // 2
+    return 180 / 2**lat_bits, 360 / 2**lon_bits
+
+
+def _cells(south: float, west: float, north: float, east: float, precision: int) -> set[str]:
+    height, width = cell_size(precision)
+    cells = set()
+    # Sample the box on the cell grid; stepping from each edge and
+    # including the far edges covers partial cells at the borders.
+    lat = south
+    while True:
+        lon = west
+        while True:
+            cells.add(encode(lat, lon, precision))
+            if lon >= east:
+                break
+            lon = min(lon + width, east)
+        if lat >= north:
+            break
+        lat = min(lat + height, north)
+    return cells
+
+
+def covering_cells(south: float, west: float, north: float, east: float) -> set[str]:
+    """Geohash prefixes whose cells together cover the bounding box."""
+    south, north = max(south, -90.0), min(north, 90.0)
+    west, east = max(west, -180.0), min(east, 180.0)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        estimate = (math.ceil((north - south) / height) + 1) * (math.ceil((east - west) / width) + 1)
+        if estimate > MAX_CELLS * 4:
+            continue
+        cells = _cells(south, west, north, east, precision)
+        if len(cells) <= MAX_CELLS:
+            return cells
+    return _cells(south, west, north, east, 1)
+
+
+def radius_bbox(latitude: float, longitude: float, km: float) -> tuple[float, float, float, float]:
+    """Return ``(south, west, north, east)`` enclosing a circle."""
+    dlat = km / KM_PER_DEGREE
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    dlon = min(km / (KM_PER_DEGREE * cos_lat), 180.0)
+    return latitude - dlat, longitude - dlon, latitude + dlat, longitude + dlon
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi, dlambda = phi2 - phi1, math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
@@ -0,0 +1,34 @@
+"""Move trips that ended more than ``--months`` months ago into the archive.
+
+See :mod:`main.archive`.  Archived trip pages are still served by slug;
+``restore_events`` brings a trip back.
+"""
+from __future__ import annotations
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from main.archive import archive_events
+
+
+class Command(BaseCommand):
+    help = "Move finished events and their sign-ups into the archive tables."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--months", type=int, default=12, help="Archive events that ended this many months ago (default 12).")
+        parser.add_argument("--batch-size", type=int, default=500, help="Events per transaction (default 500).")
+        parser.add_argument("--dry-run", action="store_true", help="Report how many events would be archived.")
+
+    def handle(self, *args, **options) -> None:
+        if options["months"] < 1:
+            raise CommandError("--months must be at least 1")
+        # Months are approximated as 30 days; the cut-off needn't be exact.
+        cutoff = timezone.now() - timedelta(days=30 * options["months"])
+        started = time.perf_counter()
+        count = archive_events(cutoff, batch_size=options["batch_size"], dry_run=options["dry_run"])
+        elapsed = time.perf_counter() - started
+        verb = "Would archive" if options["dry_run"] else "Archived"
+        self.stdout.write(f"{verb} {count} events that ended before {cutoff:%Y-%m-%d} in {elapsed:.2f}s")
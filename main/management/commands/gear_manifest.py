@@ -0,0 +1,33 @@
+"""Print the Gear Store's pickup and return list for a day."""
+from __future__ import annotations
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from main.gear import daily_manifest
+
+
+class Command(BaseCommand):
+    help = "List the gear hires to hand out and to expect back on a day."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--date", help="Day to list, YYYY-MM-DD (default today).")
+
+    def handle(self, *args, **options) -> None:
+        try:
+            day = date.fromisoformat(options["date"]) if options["date"] else timezone.now().date()
+        except ValueError:
+            raise CommandError(f"Invalid date {options['date']!r}; use YYYY-MM-DD")
+        manifest = daily_manifest(day)
+        self.stdout.write(f"Pickups for {day:%a %d %b %Y}: {len(manifest['pickups'])}")
+        for hire in manifest["pickups"]:
+            self.stdout.write(f"  {self._line(hire)} (back {hire.return_date:%d %b})")
+        self.stdout.write(f"Returns for {day:%a %d %b %Y}: {len(manifest['returns'])}")
+        for hire in manifest["returns"]:
+            self.stdout.write(f"  {self._line(hire)} (since {hire.pickup_date:%d %b})")
+
+    @staticmethod
+    def _line(hire) -> str:
+        return f"{hire.item.code:<12} {hire.item.name:<30} {hire.hirer_name} <{hire.email}>"
@@ -0,0 +1,62 @@
+"""Geocode the trip and meeting locations of existing events in batches.
+
+Events are geocoded automatically when saved; this command fills in rows
+created before geocoding existed or by bulk imports, and re-geocodes
+everything with ``--all`` after the gazetteer has grown.
+"""
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main import gazetteer
+from main.models import Event
+
+FIELDS = ["latitude", "longitude", "geohash", "meeting_latitude", "meeting_longitude"]
+
+
+def geocode_events(*, everything: bool = False, batch_size: int = 1000) -> tuple[int, int]:
+    """Geocode events in keyset batches; return ``(checked, located)``."""
+    events = Event.objects.order_by("pk").only("pk", "trip_location", "meeting_location")
+    if not everything:
+        events = events.filter(latitude__isnull=True).exclude(trip_location="")
+    checked = located = 0
+    last_pk = 0
+    while True:
+        batch = list(events.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return checked, located
+        last_pk = batch[-1].pk
+        texts = [text for event in batch for text in (event.trip_location, event.meeting_location)]
+        points = gazetteer.geocode_many(texts)
+        # Trips cluster at a few popular places, so one UPDATE per distinct
+        # pair of coordinates is far cheaper than a per-row bulk_update.
+        by_point: dict[tuple, list[int]] = defaultdict(list)
+        for event, trip, meeting in zip(batch, points[::2], points[1::2]):
+            by_point[trip, meeting].append(event.pk)
+            located += trip is not None
+        with transaction.atomic():
+            for (trip, meeting), pks in by_point.items():
+                located_event = Event(pk=None)
+                located_event.set_coordinates(trip, meeting)
+                Event.objects.filter(pk__in=pks).update(
+                    **{field: getattr(located_event, field) for field in FIELDS}
+                )
+        checked += len(batch)
+
+
+class Command(BaseCommand):
+    help = "Geocode event locations against the offline gazetteer."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--all", action="store_true", help="Re-geocode events that already have coordinates.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Events per batch (default 1000).")
+
+    def handle(self, *args, **options) -> None:
+        started = time.perf_counter()
+        checked, located = geocode_events(everything=options["all"], batch_size=options["batch_size"])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"Geocoded {located} of {checked} events in {elapsed:.2f}s")
@@ -0,0 +1,369 @@
+"""Import users, trips and registrations from the legacy Drupal site.
+
+Each input is a CSV file (with a header row) or a JSON dump, either a
+single JSON array of objects or one object per line.  Files are streamed
+row by row, so memory use does not grow with the size of the export.  The
+expected columns are:
+
+users
+    ``uid``, ``name``, ``mail`` and optionally ``full_name``, ``created``
+    and ``membership_expiry``.
+nodes
+    ``nid``, ``type``, ``title``, ``body``, ``uid``, ``start``, ``end``,
+    ``location`` and optionally ``category``, ``difficulty``,
+    ``capacity``, ``contact``, ``status``.  Only ``trip``/``event`` nodes
+    are imported.
+registrations
+    ``registration_id``, ``nid``, ``uid``, ``mail``, ``full_name`` and
+    optionally ``experience``.
+
+Dates may be Unix timestamps or ISO 8601 strings.
+
+Rows are written with ``bulk_create`` in batches, so model signals (such as
+the automatic ``UserProfile`` creation) do not fire; profiles are created
+explicitly instead.  Usernames and slugs that are already taken (also by
+archived trips) get a suffix, checked with one query per batch.  Foreign keys are resolved through in-memory maps of
+Drupal id to local primary key, built once from the ``drupal_*`` columns.
+
+The import is idempotent: rows whose Drupal id has already been imported
+are skipped.  It is also resumable: after each batch an
+:class:`~main.models.ImportCheckpoint` records how many rows of each file
+have been committed, and a re-run skips straight past them.  With
+``--dry-run`` everything runs inside a transaction that is rolled back.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.text import slugify
+
+from main.management.commands.reconcile_capacity import reconcile_capacity
+from main.models import ArchivedEvent, Event, EventSignup, ImportCheckpoint, UserProfile
+
+NODE_TYPES = {"trip", "event"}
+READ_SIZE = 1 << 16
+
+
+class DryRunRollback(Exception):
+    """Raised to roll back the transaction wrapping a dry run."""
+
+
+def iter_rows(path: Path) -> Iterator[dict]:
+    """Yield one dict per record in a CSV or JSON export, streaming."""
+    with open(path, newline="", encoding="utf-8") as fh:
+        if path.suffix.lower() == ".csv":
+            yield from csv.DictReader(fh)
+            return
+        head = fh.read(1)
+        while head and head.isspace():
+            head = fh.read(1)
+        if head == "[":
+            yield from _iter_json_array(fh)
+            return
+        for line in _prepend(head, fh):
+            if line.strip():
+                yield json.loads(line)
+
+
+def _prepend(head: str, fh) -> Iterator[str]:
+    first = head + fh.readline()
+    yield first
+    yield from fh
+
+
+def _iter_json_array(fh) -> Iterator[dict]:
+    """Incrementally decode the elements of a JSON array after its ``[``."""
+    decoder = json.JSONDecoder()
+    buf = fh.read(READ_SIZE)
+    while True:
+        buf = buf.lstrip(" \t\r\n,")
+        if not buf:
+            buf = fh.read(READ_SIZE)
+            if not buf:
+                return
+            continue
+        if buf[0] == "]":
+            return
+        try:
+            obj, end = decoder.raw_decode(buf)
+        except json.JSONDecodeError:
+            more = fh.read(READ_SIZE)
+            if not more:
+                raise
+            buf += more
+            continue
+        yield obj
+        buf = buf[end:]
+        if len(buf) < READ_SIZE:
+            buf += fh.read(READ_SIZE)
+
+
+def chunks(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    batch: list[dict] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _int(value) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _datetime(value) -> datetime | None:
+    if value in (None, ""):
+        return None
+    timestamp = _int(value)
+    if timestamp is not None:
+        return datetime.fromtimestamp(timestamp)
+    parsed = parse_datetime(str(value))
+    if parsed is None:
+        parsed_date = parse_date(str(value))
+        parsed = datetime.combine(parsed_date, datetime.min.time()) if parsed_date else None
+    if parsed is not None and parsed.tzinfo is not None:
+        parsed = parsed.replace(tzinfo=None)
+    return parsed
+
+
+def _str(row: dict, key: str, max_length: int | None = None) -> str:
+    value = row.get(key)
+    value = "" if value is None else str(value).strip()
+    return value[:max_length] if max_length else value
+
+
+def _unique(keys: Iterable, candidate: Callable[[object, int], str], taken: Callable[[set], set]) -> dict:
+    """Give each key the first of its candidates nobody has taken.
+
+    ``candidate(key, n)`` is the ``n``-th choice for ``key``, and
+    ``taken(values)`` returns the values already in use.  Each round is one
+    call to ``taken`` for every key still unresolved.
+    """
+    result: dict = {}
+    used: set[str] = set()
+    attempts = dict.fromkeys(keys, 0)
+    while attempts:
+        candidates = {key: candidate(key, n) for key, n in attempts.items()}
+        clashes = taken(set(candidates.values()))
+        for key, value in candidates.items():
+            if value in clashes or value in used:
+                attempts[key] += 1
+            else:
+                result[key] = value
+                used.add(value)
+                del attempts[key]
+    return result
+
+
+def _suffixed(base: str, suffix: str, max_length: int) -> str:
+    return f"{base[: max_length - len(suffix)].rstrip('-')}{suffix}"
+
+
+class Command(BaseCommand):
+    help = "Stream a legacy Drupal export into users, events and event signups."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--users", type=Path, help="Users export (CSV or JSON).")
+        parser.add_argument("--nodes", type=Path, help="Trip nodes export (CSV or JSON).")
+        parser.add_argument("--registrations", type=Path, help="Registrations export (CSV or JSON).")
+        parser.add_argument("--batch-size", type=int, default=2000, help="Rows per batch (default 2000).")
+        parser.add_argument("--dry-run", action="store_true", help="Run the import and roll it back.")
+        parser.add_argument("--restart", action="store_true", help="Ignore existing checkpoints.")
+
+    def handle(self, *args, **options) -> None:
+        inputs = [
+            (kind, options[kind]) for kind in ("users", "nodes", "registrations") if options[kind]
+        ]
+        if not inputs:
+            raise CommandError("Provide at least one of --users, --nodes or --registrations.")
+        for _, path in inputs:
+            if not path.exists():
+                raise CommandError(f"{path} does not exist")
+
+        self.batch_size = options["batch_size"]
+        self.restart = options["restart"]
+        self.user_map = dict(
+            UserProfile.objects.filter(drupal_uid__isnull=False).values_list("drupal_uid", "user_id").iterator()
+        )
+        self.event_map = dict(
+            Event.objects.filter(drupal_nid__isnull=False).values_list("drupal_nid", "pk").iterator()
+        )
+        if not options["dry_run"]:
+            # Each batch commits on its own so checkpoints survive a crash.
+            self.run(inputs, options)
+            return
+        try:
+            with transaction.atomic():
+                self.run(inputs, options)
+                raise DryRunRollback
+        except DryRunRollback:
+            self.stdout.write("Dry run: all changes rolled back.")
+
+    def run(self, inputs: list[tuple[str, Path]], options: dict) -> None:
+        for kind, path in inputs:
+            self.import_file(kind, path)
+        # Registrations bypass the participant counters; recount.
+        if options["registrations"]:
+            drifted = reconcile_capacity()
+            self.stdout.write(f"Recounted participants for {len(drifted)} events.")
+
+    def import_file(self, kind: str, path: Path) -> None:
+        handler = getattr(self, f"import_{kind}")
+        checkpoint, _ = ImportCheckpoint.objects.get_or_create(source=f"drupal:{kind}:{path.name}")
+        if self.restart:
+            checkpoint.rows_done = 0
+        rows = iter_rows(path)
+        for _ in range(checkpoint.rows_done):
+            if next(rows, None) is None:
+                break
+
+        started = time.perf_counter()
+        read = created = 0
+        for batch in chunks(rows, self.batch_size):
+            with transaction.atomic():
+                created += handler(batch)
+                checkpoint.rows_done += len(batch)
+                checkpoint.save(update_fields=["rows_done", "updated_at"])
+            read += len(batch)
+        elapsed = time.perf_counter() - started
+        rate = read / elapsed if elapsed else 0.0
+        self.stdout.write(
+            f"{kind}: read {read} rows, created {created} in {elapsed:.2f}s ({rate:.0f} rows/s)"
+        )
+
+    def import_users(self, batch: list[dict]) -> int:
+        rows = {}
+        for row in batch:
+            uid = _int(row.get("uid"))
+            if uid and uid not in self.user_map:
+                rows[uid] = row
+        if not rows:
+            return 0
+        wanted = {uid: _str(row, "name", 140) or f"drupal{uid}" for uid, row in rows.items()}
+        max_length = User._meta.get_field("username").max_length
+
+        def username(uid: int, n: int) -> str:
+            if not n:
+                return wanted[uid]
+            return _suffixed(wanted[uid], f"-d{uid}" if n == 1 else f"-d{uid}-{n}", max_length)
+
+        names = _unique(
+            rows, username, lambda names: set(User.objects.filter(username__in=names).values_list("username", flat=True))
+        )
+        users = []
+        for uid, row in rows.items():
+            users.append(User(
+                username=names[uid],
+                email=_str(row, "mail", 254),
+                password=make_password(None),
+                date_joined=_datetime(row.get("created")) or datetime.now(),
+            ))
+        User.objects.bulk_create(users)
+        user_ids = dict(User.objects.filter(username__in=names.values()).values_list("username", "pk"))
+        profiles = []
+        for uid, row in rows.items():
+            expiry = _datetime(row.get("membership_expiry"))
+            profiles.append(UserProfile(
+                user_id=user_ids[names[uid]],
+                full_name=_str(row, "full_name", 200) or names[uid],
+                email=_str(row, "mail", 254),
+                membership_expiry_date=expiry.date() if expiry else None,
+                drupal_uid=uid,
+            ))
+            self.user_map[uid] = user_ids[names[uid]]
+        UserProfile.objects.bulk_create(profiles)
+        return len(users)
+
+    def import_nodes(self, batch: list[dict]) -> int:
+        categories = {value for value, _ in Event._meta.get_field("category").choices}
+        difficulties = {value for value, _ in Event.DIFFICULTY_CHOICES}
+        events = {}
+        for row in batch:
+            nid = _int(row.get("nid"))
+            node_type = _str(row, "type")
+            if not nid or nid in self.event_map or (node_type and node_type not in NODE_TYPES):
+                continue
+            start = _datetime(row.get("start"))
+            if start is None:
+                continue
+            title = _str(row, "title", 200) or f"Trip {nid}"
+            category = _str(row, "category").lower()
+            difficulty = _str(row, "difficulty").lower()
+            capacity = _int(row.get("capacity"))
+            events[nid] = Event(
+                title=title,
+                description=_str(row, "body"),
+                category=category if category in categories else "general",
+                difficulty_level=difficulty if difficulty in difficulties else "none",
+                trip_location=_str(row, "location", 200),
+                start_datetime=start,
+                end_datetime=_datetime(row.get("end")) or start,
+                trip_capacity=capacity if capacity and capacity > 0 else -1,
+                contact_details=_str(row, "contact", 200),
+                approval_status="approved" if _str(row, "status") in ("1", "True", "true") else "pending",
+                created_by_id=self.user_map.get(_int(row.get("uid"))),
+                drupal_nid=nid,
+            )
+        if not events:
+            return 0
+        max_length = Event._meta.get_field("slug").max_length
+
+        def slug(nid: int, n: int) -> str:
+            base = slugify(events[nid].title)[:40].strip("-") or "event"
+            return _suffixed(base, f"-{nid}" if not n else f"-{nid}-{n + 1}", max_length)
+
+        def taken(slugs: set) -> set:
+            # Archived trips keep their slug so old links still resolve.
+            live = Event.objects.filter(slug__in=slugs).order_by().values_list("slug", flat=True)
+            archived = ArchivedEvent.objects.filter(slug__in=slugs).order_by().values_list("slug", flat=True)
+            return set(live.union(archived, all=True))
+
+        slugs = _unique(events, slug, taken)
+        for nid, event in events.items():
+            event.slug = slugs[nid]
+        Event.objects.bulk_create(events.values())
+        self.event_map.update(
+            Event.objects.filter(drupal_nid__in=events.keys()).values_list("drupal_nid", "pk")
+        )
+        return len(events)
+
+    def import_registrations(self, batch: list[dict]) -> int:
+        signups = []
+        for row in batch:
+            registration_id = _int(row.get("registration_id"))
+            event_id = self.event_map.get(_int(row.get("nid")))
+            email = _str(row, "mail", 254)
+            if not registration_id or event_id is None or not email:
+                continue
+            signups.append(EventSignup(
+                event_id=event_id,
+                user_id=self.user_map.get(_int(row.get("uid"))),
+                full_name=_str(row, "full_name", 200) or email,
+                email=email,
+                experience=_str(row, "experience"),
+                drupal_id=registration_id,
+            ))
+        if not signups:
+            return 0
+        # Already-imported registrations (and duplicate emails for the same
+        # event) collide with a unique constraint and are skipped, so count
+        # the rows that are there afterwards.
+        imported = EventSignup.objects.filter(drupal_id__in=[signup.drupal_id for signup in signups])
+        before = imported.count()
+        EventSignup.objects.bulk_create(signups, ignore_conflicts=True)
+        return imported.count() - before
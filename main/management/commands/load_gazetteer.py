@@ -0,0 +1,43 @@
+"""Load places into the offline gazetteer used to geocode trip locations.
+
+Without arguments the bundled extract (``main/data/gazetteer_au.csv``) is
+reloaded.  ``--geonames AU.txt`` additionally loads a GeoNames country
+dump.  The table is replaced in one transaction.
+"""
+from __future__ import annotations
+
+import itertools
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from main import gazetteer
+from main.management.commands.import_drupal import chunks
+from main.models import GazetteerPlace
+
+
+class Command(BaseCommand):
+    help = "Reload the offline gazetteer from the bundled extract and optionally a GeoNames dump."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--geonames", type=Path, help="GeoNames dump to load as well, e.g. AU.txt.")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per INSERT (default 5000).")
+
+    def handle(self, *args, **options) -> None:
+        rows = gazetteer.read_bundled()
+        if options["geonames"]:
+            if not options["geonames"].exists():
+                raise CommandError(f"{options['geonames']} does not exist")
+            rows = itertools.chain(rows, gazetteer.read_geonames(options["geonames"]))
+        started = time.perf_counter()
+        loaded = 0
+        with transaction.atomic():
+            GazetteerPlace.objects.all().delete()
+            for batch in chunks(rows, options["batch_size"]):
+                GazetteerPlace.objects.bulk_create(GazetteerPlace(**row) for row in batch)
+                loaded += len(batch)
+        gazetteer.clear_cache()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"Loaded {loaded} place names in {elapsed:.2f}s")
@@ -0,0 +1,112 @@
+"""Nightly membership expiry processing.
+
+Finds members whose membership expires within ``--days`` days (status
+``expiring``) or has already expired (status ``expired``), updates their
+``UserProfile.membership_status`` and enqueues a reminder
+:class:`~main.models.Notification` for each member whose status changed.
+
+Profiles are walked in primary-key order one chunk at a time, so memory
+use is bounded by ``--batch-size`` regardless of how many members there
+are.  Each chunk costs one ``SELECT``, one ``UPDATE ... WHERE id IN (...)``
+per status and one bulk ``INSERT`` of notifications; ``save()`` is never
+called, so the profile signal handlers are not triggered.
+"""
+from __future__ import annotations
+
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main.models import Notification, UserProfile
+
+REMINDER_SUBJECTS = {
+    "expiring": "Your ANUMC membership expires on {expiry:%d/%m/%Y}",
+    "expired": "Your ANUMC membership expired on {expiry:%d/%m/%Y}",
+}
+
+
+class Command(BaseCommand):
+    help = "Mark expiring/expired memberships and enqueue reminder notifications."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--days", type=int, default=30, help="Reminder window in days (default 30).")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Profiles per chunk (default 1000).")
+        parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing.")
+
+    def handle(self, *args, **options) -> None:
+        started = time.perf_counter()
+        today = date.today()
+        stats = process_memberships(
+            today,
+            days=options["days"],
+            batch_size=options["batch_size"],
+            dry_run=options["dry_run"],
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"Scanned {stats['scanned']} profiles in {stats['batches']} batches: "
+            f"{stats['expiring']} expiring, {stats['expired']} expired, {stats['renewed']} renewed, "
+            f"{stats['notifications']} reminders enqueued in {elapsed:.2f}s"
+            + (" (dry run)" if options["dry_run"] else "")
+        )
+
+
+def process_memberships(today: date, *, days: int = 30, batch_size: int = 1000, dry_run: bool = False) -> dict:
+    """Update membership statuses relative to ``today``; return counters."""
+    cutoff = today + timedelta(days=days)
+    # Only rows whose status would actually change are candidates; the
+    # range on membership_expiry_date uses its index.
+    candidates = (
+        UserProfile.objects.filter(membership_expiry_date__lte=cutoff)
+        .exclude(membership_status="expired")
+        .order_by("pk")
+    )
+    stats = {"scanned": 0, "batches": 0, "expiring": 0, "expired": 0, "notifications": 0}
+    # Members who have renewed since the last run go back to active in a
+    # single UPDATE.
+    renewed = UserProfile.objects.filter(membership_expiry_date__gt=cutoff).exclude(membership_status="active")
+    stats["renewed"] = renewed.count() if dry_run else renewed.update(membership_status="active")
+    last_pk = 0
+    while True:
+        chunk = list(
+            candidates.filter(pk__gt=last_pk).values_list(
+                "pk", "user_id", "email", "membership_expiry_date", "membership_status"
+            )[:batch_size]
+        )
+        if not chunk:
+            break
+        last_pk = chunk[-1][0]
+        stats["scanned"] += len(chunk)
+        stats["batches"] += 1
+
+        changes: dict[str, list] = {"expiring": [], "expired": []}
+        for row in chunk:
+            new_status = "expired" if row[3] < today else "expiring"
+            if row[4] != new_status:
+                changes[new_status].append(row)
+        stats["expiring"] += len(changes["expiring"])
+        stats["expired"] += len(changes["expired"])
+        if dry_run:
+            continue
+
+        with transaction.atomic():
+            notifications = []
+            for status, rows in changes.items():
+                if not rows:
+                    continue
+                UserProfile.objects.filter(pk__in=[row[0] for row in rows]).update(membership_status=status)
+                notifications.extend(
+                    Notification(
+                        user_id=user_id,
+                        email=email,
+                        kind=f"membership_{status}",
+                        subject=REMINDER_SUBJECTS[status].format(expiry=expiry),
+                    )
+                    for _, user_id, email, expiry, _ in rows
+                    if email
+                )
+            Notification.objects.bulk_create(notifications, batch_size=batch_size)
+        stats["notifications"] += len(notifications)
+    return stats
@@ -0,0 +1,76 @@
+"""Recompute every event's ``participant_count`` from its sign-ups.
+
+The counter is maintained incrementally with ``F()`` updates, but bulk
+imports, admin edits or raw SQL can leave it out of line with the actual
+``EventSignup`` rows.  This command counts the real participants of every
+event with one grouped aggregate, writes corrections for the events that
+drifted with batched ``bulk_update`` statements and prints a drift report.
+Places recorded on the legacy site without sign-up rows
+(``legacy_participants``) count as participants.
+
+Sign-ups keep moving the counter while this runs, so each batch of drifted
+events is locked with ``select_for_update`` and recounted before it is
+written; an ``F()`` increment therefore either lands before the recount
+or waits for the correction to commit.
+"""
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from main.models import Event
+
+
+def reconcile_capacity(*, dry_run: bool = False, batch_size: int = 500) -> list[tuple[int, str, int, int]]:
+    """Fix drifted counters; return ``(pk, title, stored, actual)`` per fix."""
+    drifted = _drifted(Event.objects.all())
+    if dry_run:
+        return drifted
+    fixed = []
+    for start in range(0, len(drifted), batch_size):
+        pks = [pk for pk, _, _, _ in drifted[start:start + batch_size]]
+        with transaction.atomic():
+            list(Event.objects.select_for_update().filter(pk__in=pks).order_by("pk").values_list("pk"))
+            batch = _drifted(Event.objects.filter(pk__in=pks))
+            now = timezone.now()
+            Event.objects.bulk_update(
+                [Event(pk=pk, participant_count=actual, updated_at=now) for pk, _, _, actual in batch],
+                ["participant_count", "updated_at"],
+            )
+        fixed += batch
+    return fixed
+
+
+def _drifted(events) -> list[tuple[int, str, int, int]]:
+    return [
+        (pk, title, stored, actual)
+        for pk, title, stored, actual in events.with_actual_participants()
+        .order_by()
+        .values_list("pk", "title", "participant_count", "actual_participants")
+        .iterator()
+        if stored != actual
+    ]
+
+
+class Command(BaseCommand):
+    help = "Recompute event participant counters from sign-ups and report drift."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--dry-run", action="store_true", help="Report drift without fixing it.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Events per UPDATE (default 500).")
+        parser.add_argument("--limit", type=int, default=20, help="Drifted events to list (default 20).")
+
+    def handle(self, *args, **options) -> None:
+        started = time.perf_counter()
+        drifted = reconcile_capacity(dry_run=options["dry_run"], batch_size=options["batch_size"])
+        elapsed = time.perf_counter() - started
+        for pk, title, stored, actual in drifted[: options["limit"]]:
+            self.stdout.write(f"  #{pk} {title}: counter {stored}, actual {actual} ({actual - stored:+d})")
+        if len(drifted) > options["limit"]:
+            self.stdout.write(f"  ... and {len(drifted) - options['limit']} more")
+        total = sum(abs(actual - stored) for _, _, stored, actual in drifted)
+        verb = "Found" if options["dry_run"] else "Corrected"
+        self.stdout.write(f"{verb} {len(drifted)} drifted events (total drift {total}) in {elapsed:.2f}s")
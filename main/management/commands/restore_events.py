@@ -0,0 +1,24 @@
+"""Move archived trips back into the live ``Event`` table by slug."""
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.archive import SlugTaken, restore_event
+from main.models import ArchivedEvent
+
+
+class Command(BaseCommand):
+    help = "Restore archived events (and their sign-ups) by slug."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("slugs", nargs="+", help="Slugs of the archived events to restore.")
+
+    def handle(self, *args, **options) -> None:
+        for slug in options["slugs"]:
+            try:
+                event = restore_event(slug)
+            except ArchivedEvent.DoesNotExist:
+                raise CommandError(f"No archived event with slug {slug!r}")
+            except SlugTaken:
+                raise CommandError(f"A live event already uses the slug {slug!r}")
+            self.stdout.write(f"Restored {event.title} ({slug})")
@@ -0,0 +1,46 @@
+"""Warm up caches and lazily loaded state before serving traffic.
+
+Run after a deploy (or from the worker hook in ``gunicorn.conf.py``) so
+the first real requests don't pay for imports, URL resolution, template
+compilation, database connections and empty caches.  See
+:mod:`main.warmup`.
+"""
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from main.warmup import profile_imports, warm_up
+
+
+class Command(BaseCommand):
+    help = "Pre-import views, compile templates, resolve URLs, connect to the database and prime caches."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--host", help="Host name used for the primed requests (default: from ALLOWED_HOSTS).")
+        parser.add_argument("--events", type=int, default=20, help="Upcoming event pages to prime (default 20).")
+        parser.add_argument(
+            "--profile-imports",
+            type=int,
+            nargs="?",
+            const=25,
+            metavar="N",
+            help="Instead, report the N slowest module imports at start-up (default 25).",
+        )
+
+    def handle(self, *args, **options) -> None:
+        if options["profile_imports"]:
+            self.report_imports(options["profile_imports"])
+            return
+        total = 0.0
+        for step, count, seconds in warm_up(host=options["host"], events=options["events"]):
+            total += seconds
+            self.stdout.write(f"{step:<10} {count:>5} in {seconds * 1000:8.1f} ms")
+        self.stdout.write(f"Warmed up in {total * 1000:.1f} ms")
+
+    def report_imports(self, limit: int) -> None:
+        rows = profile_imports()
+        total = sum(self_us for _, self_us, _ in rows)
+        self.stdout.write(f"{'self ms':>8} {'cumul. ms':>10}  module")
+        for module, self_us, cumulative_us in rows[:limit]:
+            self.stdout.write(f"{self_us / 1000:8.1f} {cumulative_us / 1000:10.1f}  {module}")
+        self.stdout.write(f"{len(rows)} modules imported in {total / 1000:.1f} ms")
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='announcement',
+            name='expire_at',
+            field=models.DateTimeField(blank=True, help_text='When to stop showing the announcement; leave blank to show indefinitely', null=True),
+        ),
+        migrations.AddField(
+            model_name='announcement',
+            name='publish_at',
+            field=models.DateTimeField(blank=True, help_text='When to start showing the announcement; leave blank to show immediately', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(fields=['display_on_home', 'publish_at', 'expire_at'], name='announcement_window_idx'),
+        ),
+    ]
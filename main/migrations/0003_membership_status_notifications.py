@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0002_announcement_schedule'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='membership_status',
+            field=models.CharField(choices=[('active', 'Active'), ('expiring', 'Expiring soon'), ('expired', 'Expired')], default='active', help_text='Maintained nightly by the process_memberships command', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='membership_expiry_date',
+            field=models.DateField(blank=True, db_index=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254)),
+                ('kind', models.CharField(choices=[('membership_expiring', 'Membership expiring'), ('membership_expired', 'Membership expired')], max_length=30)),
+                ('subject', models.CharField(max_length=200)),
+                ('body', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['sent_at', 'created_at'], name='notification_pending_idx')],
+            },
+        ),
+    ]
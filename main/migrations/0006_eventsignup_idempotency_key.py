@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:16
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0005_event_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventsignup',
+            name='idempotency_key',
+            field=models.UUIDField(default=uuid.uuid4, editable=False),
+        ),
+    ]
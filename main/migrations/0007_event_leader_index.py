@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0006_eventsignup_idempotency_key'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['created_by', 'start_datetime'], name='event_leader_start_idx'),
+        ),
+    ]
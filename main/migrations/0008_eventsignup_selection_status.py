@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_event_leader_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventsignup',
+            name='selection_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('accepted', 'Accepted'), ('rejected', 'Rejected')], default='pending', help_text='Leader\'s decision for "Trip Leader Picks" trips', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='kind',
+            field=models.CharField(choices=[('membership_expiring', 'Membership expiring'), ('membership_expired', 'Membership expired'), ('selection_accepted', 'Trip place offered'), ('selection_rejected', 'Trip place not offered')], max_length=30),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:23
+
+from django.db import migrations, models
+
+
+def copy_legacy_capacity(apps, schema_editor):
+    """Fold the legacy spots_total into trip_capacity and seed the counter."""
+    Event = apps.get_model("main", "Event")
+    Event.objects.filter(trip_capacity__lte=0, spots_total__gt=0).update(trip_capacity=models.F("spots_total"))
+    occupied = models.Q(registration_method="fcfs") | models.Q(signups__selection_status="accepted")
+    # Legacy trips recorded their occupancy as spots_total - spots_available,
+    # often without sign-up rows; keep whichever figure is higher.
+    counts = (
+        Event.objects.annotate(actual=models.Count("signups", filter=occupied))
+        .filter(models.Q(actual__gt=0) | models.Q(spots_total__gt=models.F("spots_available")))
+    )
+    updated = []
+    for event in counts.only("pk", "spots_total", "spots_available").iterator():
+        event.participant_count = max(event.actual, event.spots_total - event.spots_available, 0)
+        updated.append(event)
+    Event.objects.bulk_update(updated, ["participant_count"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0008_eventsignup_selection_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='participant_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(copy_legacy_capacity, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='event',
+            name='spots_available',
+        ),
+        migrations.RemoveField(
+            model_name='event',
+            name='spots_total',
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='trip_capacity',
+            field=models.IntegerField(default=-1, help_text='Maximum number of participants; -1 for unlimited'),
+        ),
+    ]
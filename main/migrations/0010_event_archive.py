@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_consolidate_capacity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField(unique=True)),
+                ('slug', models.SlugField(unique=True)),
+                ('title', models.CharField(max_length=200)),
+                ('start_datetime', models.DateTimeField()),
+                ('end_datetime', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('data', models.TextField(help_text='The serialised Event row')),
+            ],
+            options={
+                'ordering': ['start_datetime'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedEventSignup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField(unique=True)),
+                ('email', models.EmailField(max_length=254)),
+                ('user_id', models.BigIntegerField(blank=True, db_index=True, null=True)),
+                ('data', models.TextField(help_text='The serialised EventSignup row')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='signups', to='main.archivedevent')),
+            ],
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_event_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('is_snapshot', models.BooleanField(default=False)),
+                ('comment', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('payload', models.BinaryField()),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='main.event')),
+            ],
+            options={
+                'ordering': ['event', 'number'],
+                'constraints': [models.UniqueConstraint(fields=('event', 'number'), name='eventrevision_event_number_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0011_event_revision'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GearItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(help_text='Label on the item, e.g. TENT-012', max_length=30, unique=True)),
+                ('name', models.CharField(max_length=200)),
+                ('kind', models.CharField(choices=[('tent', 'Tent'), ('pack', 'Pack'), ('sleeping_bag', 'Sleeping bag'), ('sleeping_mat', 'Sleeping mat'), ('stove', 'Stove'), ('harness', 'Harness'), ('helmet', 'Helmet'), ('rope', 'Rope'), ('kayak', 'Kayak'), ('skis', 'Skis'), ('other', 'Other')], max_length=20)),
+                ('active', models.BooleanField(default=True, help_text='Untick for gear that is retired or under repair')),
+                ('last_booked_at', models.DateTimeField(blank=True, editable=False, null=True)),
+            ],
+            options={
+                'ordering': ['kind', 'code'],
+                'indexes': [models.Index(fields=['kind', 'active'], name='gearitem_kind_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='HireBooking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hirer_name', models.CharField(max_length=200)),
+                ('email', models.EmailField(max_length=254)),
+                ('pickup_date', models.DateField()),
+                ('return_date', models.DateField()),
+                ('status', models.CharField(choices=[('booked', 'Booked'), ('out', 'Picked up'), ('returned', 'Returned'), ('cancelled', 'Cancelled')], default='booked', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='hires', to='main.gearitem')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='gear_hires', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['pickup_date'],
+                'indexes': [models.Index(fields=['item', 'return_date', 'pickup_date'], name='hire_item_interval_idx'), models.Index(fields=['pickup_date'], name='hire_pickup_idx'), models.Index(fields=['return_date'], name='hire_return_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,95 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:34
+
+import csv
+import re
+import unicodedata
+from pathlib import Path
+
+from django.db import migrations, models
+
+BUNDLED_GAZETTEER = Path(__file__).resolve().parent.parent / "data" / "gazetteer_au.csv"
+
+
+# Frozen copies of main.gazetteer.normalise and read_bundled as they were
+# when this migration was written, so later changes to the app can't
+# break it.
+def _normalise(text):
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    text = re.sub(r"[^a-z0-9]+", " ", text.lower())
+    return " ".join(text.split())
+
+
+def _read_bundled(path):
+    with open(path, newline="", encoding="utf-8") as fh:
+        for row in csv.DictReader(fh):
+            names = [row["name"]] + [name for name in row["alternate_names"].split("|") if name]
+            for name in names:
+                yield {
+                    "name": row["name"],
+                    "search_name": _normalise(name),
+                    "latitude": float(row["latitude"]),
+                    "longitude": float(row["longitude"]),
+                    "admin1": row["admin1"],
+                    "population": int(row["population"] or 0),
+                }
+
+
+def load_bundled_gazetteer(apps, schema_editor):
+    """Load the places shipped in main/data/gazetteer_au.csv."""
+    if not BUNDLED_GAZETTEER.exists():
+        # The data moved on; ``load_gazetteer`` fills the table instead.
+        return
+    GazetteerPlace = apps.get_model("main", "GazetteerPlace")
+    GazetteerPlace.objects.bulk_create(GazetteerPlace(**row) for row in _read_bundled(BUNDLED_GAZETTEER))
+
+
+def unload_bundled_gazetteer(apps, schema_editor):
+    apps.get_model("main", "GazetteerPlace").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0012_gear_hire'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GazetteerPlace',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('search_name', models.CharField(db_index=True, help_text='Normalised name matched by the geocoder', max_length=200)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('admin1', models.CharField(blank=True, max_length=20, verbose_name='state')),
+                ('population', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='meeting_latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='meeting_longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(load_bundled_gazetteer, unload_bundled_gazetteer),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:49
+
+import main.uploads
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0013_event_geocoding'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='event',
+            name='image',
+            field=models.ImageField(blank=True, help_text='Optional image illustrating the event.', null=True, storage=main.uploads.ContentAddressedStorage(), upload_to=main.uploads.event_image_path),
+        ),
+    ]
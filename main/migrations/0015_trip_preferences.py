@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0014_event_image_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='preferred_categories',
+            field=models.JSONField(blank=True, default=list, help_text='Event categories the member most wants to hear about'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='preferred_difficulty',
+            field=models.CharField(blank=True, choices=[('easy', 'Easy'), ('moderate', 'Moderate'), ('hard', 'Hard')], help_text='Difficulty the member usually looks for; blank for no preference', max_length=20),
+        ),
+    ]
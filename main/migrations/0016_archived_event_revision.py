@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0015_trip_preferences'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedEventRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('is_snapshot', models.BooleanField(default=False)),
+                ('comment', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField()),
+                ('payload', models.BinaryField()),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='main.archivedevent')),
+            ],
+            options={
+                'ordering': ['event', 'number'],
+            },
+        ),
+    ]
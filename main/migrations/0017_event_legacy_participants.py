@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:02
+
+from django.db import migrations, models
+
+
+def keep_legacy_occupancy(apps, schema_editor):
+    """Record the places 0009 seeded from the legacy spot counts.
+
+    Migration 0009 set ``participant_count`` to the larger of the sign-up
+    rows and the legacy occupancy; whatever exceeds the rows came from the
+    legacy site, so it is kept as an offset that reconciling preserves.
+    """
+    Event = apps.get_model("main", "Event")
+    occupied = models.Q(registration_method="fcfs") | models.Q(signups__selection_status="accepted")
+    events = (
+        Event.objects.annotate(actual=models.Count("signups", filter=occupied))
+        .filter(participant_count__gt=models.F("actual"))
+    )
+    updated = []
+    for event in events.only("pk", "participant_count").iterator():
+        event.legacy_participants = event.participant_count - event.actual
+        updated.append(event)
+    Event.objects.bulk_update(updated, ["legacy_participants"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0016_archived_event_revision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='legacy_participants',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(keep_legacy_occupancy, migrations.RunPython.noop),
+    ]
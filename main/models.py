@@ -1,29 +1,186 @@
 """Database models for the ANUMC site."""
 from __future__ import annotations
 
-from django.db import models
+import math
+import uuid
+
+from django.db import connections, models
+from django.db.models import sql
+from django.db.models.constants import OnConflict
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib.auth.models import User
 from django.conf import settings
 
+from .uploads import event_image_path, image_storage
+
+
+class AnnouncementQuerySet(models.QuerySet):
+    """Query helpers for scheduled announcements."""
+
+    def live(self, now):
+        """Announcements shown on the home page at ``now``.
+
+        An announcement is live when it is flagged for the home page, its
+        ``publish_at`` (if any) has passed and its ``expire_at`` (if any)
+        has not yet been reached.
+        """
+        return self.filter(
+            models.Q(publish_at__isnull=True) | models.Q(publish_at__lte=now),
+            models.Q(expire_at__isnull=True) | models.Q(expire_at__gt=now),
+            display_on_home=True,
+        )
+
+    def next_boundary(self, now):
+        """Return the next ``publish_at``/``expire_at`` after ``now``.
+
+        This is the next moment at which the set of live announcements can
+        change without anyone editing them, or ``None`` when nothing is
+        scheduled.  Computed with a single aggregate query.
+        """
+        bounds = self.filter(display_on_home=True).aggregate(
+            next_publish=models.Min("publish_at", filter=models.Q(publish_at__gt=now)),
+            next_expire=models.Min("expire_at", filter=models.Q(expire_at__gt=now)),
+        )
+        candidates = [value for value in bounds.values() if value is not None]
+        return min(candidates) if candidates else None
+
 
 class Announcement(models.Model):
-    """A short message displayed on the home page."""
+    """A short message displayed on the home page.
+
+    Announcements may optionally be scheduled with ``publish_at`` and
+    ``expire_at`` so editors don't need to toggle ``display_on_home`` by
+    hand.
+    """
 
     title = models.CharField(max_length=200)
     body = models.TextField(help_text="Announcement text to be displayed")
     display_on_home = models.BooleanField(default=True)
+    publish_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When to start showing the announcement; leave blank to show immediately",
+    )
+    expire_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When to stop showing the announcement; leave blank to show indefinitely",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = AnnouncementQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
         verbose_name = "Announcement"
         verbose_name_plural = "Announcements"
+        indexes = [
+            models.Index(
+                fields=["display_on_home", "publish_at", "expire_at"],
+                name="announcement_window_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.title
 
 
+# Sign-ups that take up a place on their trip: all of them on first come
+# first served trips, only accepted ones when the leader picks.  Expressed
+# relative to Event.
+OCCUPIES_PLACE = models.Q(registration_method="fcfs") | models.Q(signups__selection_status="accepted")
+
+
+class EventQuerySet(models.QuerySet):
+    """Query helpers for events."""
+
+    def with_signup_stats(self):
+        """Annotate sign-up counts, remaining capacity and pending counts.
+
+        Everything is computed in the same grouped query as the events
+        themselves:
+
+        * ``signup_count`` – number of sign-ups;
+        * ``spots_remaining`` – places left according to the maintained
+          ``participant_count``, or ``None`` for unlimited trips;
+        * ``pending_count`` – sign-ups awaiting the leader's decision on
+          "Trip Leader Picks" trips (zero for first-come-first-served).
+        """
+        return self.annotate(
+            signup_count=models.Count("signups"),
+            spots_remaining=models.Case(
+                models.When(trip_capacity__gt=0, then=models.F("trip_capacity") - models.F("participant_count")),
+                default=None,
+                output_field=models.IntegerField(),
+            ),
+            pending_count=models.Count(
+                "signups",
+                filter=models.Q(registration_method="picky", signups__selection_status="pending"),
+            ),
+        )
+
+    def adjust_participant_count(self, delta: int) -> int:
+        """Atomically add ``delta`` to ``participant_count`` with one UPDATE.
+
+        Also bumps ``updated_at`` so cached copies of the event page are
+        revalidated.
+        """
+        return self.update(
+            participant_count=models.F("participant_count") + delta,
+            updated_at=timezone.now(),
+        )
+
+    def with_places_left(self):
+        """Events that can take another participant (or are unlimited)."""
+        return self.filter(models.Q(trip_capacity__lte=0) | models.Q(participant_count__lt=models.F("trip_capacity")))
+
+    def with_actual_participants(self):
+        """Annotate ``actual_participants``: the sign-up rows plus legacy places."""
+        return self.annotate(
+            actual_participants=models.Count("signups", filter=OCCUPIES_PLACE) + models.F("legacy_participants")
+        )
+
+    def within_bbox(self, south: float, west: float, north: float, east: float):
+        """Events whose trip location lies inside the bounding box.
+
+        The geohash cells covering the box are matched by prefix through
+        the ``geohash`` index first, so only events in those cells are
+        compared against the exact coordinates; see :mod:`main.geo`.
+        """
+        from . import geo
+
+        in_cells = models.Q()
+        for cell in geo.covering_cells(south, west, north, east):
+            # A prefix match written as a range, which every backend can
+            # answer from the index (SQLite won't for LIKE).
+            in_cells |= models.Q(geohash__gte=cell, geohash__lt=cell + geo.PREFIX_END)
+        return self.filter(in_cells).filter(
+            latitude__range=(south, north), longitude__range=(west, east)
+        )
+
+    def within_radius(self, latitude: float, longitude: float, km: float):
+        """Events within ``km`` of a point, annotated with ``distance_km``.
+
+        The great-circle distance is only computed for the events inside
+        the circle's bounding box (see :meth:`within_bbox`).
+        """
+        from django.db.models.functions import ACos, Cos, Least, Radians, Sin
+
+        from . import geo
+
+        lat, lon = math.radians(latitude), math.radians(longitude)
+        cosine = (
+            Sin(Radians("latitude")) * math.sin(lat)
+            + Cos(Radians("latitude")) * math.cos(lat) * Cos(Radians("longitude") - lon)
+        )
+        return (
+            self.within_bbox(*geo.radius_bbox(latitude, longitude, km))
+            .annotate(distance_km=geo.EARTH_RADIUS_KM * ACos(Least(cosine, models.Value(1.0))))
+            .filter(distance_km__lte=km)
+        )
+
+
 class Event(models.Model):
     """A club trip or event.
 
@@ -33,23 +190,26 @@ class Event(models.Model):
     requirements).
     """
 
+    CATEGORY_CHOICES = [
+        ("climbing", "Climbing"),
+        ("kayaking", "Kayaking"),
+        ("skiing", "Skiing"),
+        ("hiking", "Hiking"),
+        ("social", "Social"),
+        ("general", "General"),
+    ]
+
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     category = models.CharField(
         max_length=50,
-        choices=[
-            ("climbing", "Climbing"),
-            ("kayaking", "Kayaking"),
-            ("skiing", "Skiing"),
-            ("hiking", "Hiking"),
-            ("social", "Social"),
-            ("general", "General"),
-        ],
+        choices=CATEGORY_CHOICES,
         default="general",
         help_text="Category of the event used for styling and filtering.",
     )
     image = models.ImageField(
-        upload_to="events/",
+        upload_to=event_image_path,
+        storage=image_storage,
         blank=True,
         null=True,
         help_text="Optional image illustrating the event.",
@@ -84,10 +244,25 @@ class Event(models.Model):
     )
     trip_capacity = models.IntegerField(
         default=-1,
-        help_text="Maximum number of participants for FCFS trips; leave blank or -1 for unlimited or picky trips",
+        help_text="Maximum number of participants; -1 for unlimited",
     )
+    # Denormalised number of places taken: every sign-up on first come
+    # first served trips, accepted sign-ups on "Trip Leader Picks" trips.
+    # Maintained with F() updates; ``reconcile_capacity`` repairs drift.
+    participant_count = models.PositiveIntegerField(default=0, editable=False)
+    # Places taken on the legacy site with no sign-up rows behind them;
+    # included in ``participant_count`` and in the reconciled count.
+    legacy_participants = models.PositiveIntegerField(default=0, editable=False)
     # Trip location (where the activity occurs)
     trip_location = models.CharField(max_length=200)
+    # Coordinates geocoded from trip_location and meeting_location against
+    # the offline gazetteer (see main/gazetteer.py); ``geohash`` indexes
+    # the trip coordinates for radius and bounding-box search.
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
+    geohash = models.CharField(max_length=12, blank=True, db_index=True, editable=False)
+    meeting_latitude = models.FloatField(null=True, blank=True, editable=False)
+    meeting_longitude = models.FloatField(null=True, blank=True, editable=False)
     # Start and end date/time of the actual trip
     start_datetime = models.DateTimeField()
     end_datetime = models.DateTimeField()
@@ -143,9 +318,12 @@ class Event(models.Model):
     # Legacy fields for backward compatibility
     fitness_required = models.CharField(max_length=200, blank=True)
     experience_required = models.CharField(max_length=200, blank=True)
-    spots_total = models.PositiveIntegerField(default=0)
-    spots_available = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped on every save; used to validate cached copies of the public page.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Node id on the legacy Drupal site, set by the import_drupal command.
+    drupal_nid = models.PositiveIntegerField(null=True, blank=True, unique=True, editable=False)
 
     # The user who created this event.  Allows trip leaders to manage their own events.
     created_by = models.ForeignKey(
@@ -156,6 +334,8 @@ class Event(models.Model):
         related_name="events_created",
     )
 
+    objects = EventQuerySet.as_manager()
+
     class Meta:
         # Order upcoming events by their start date/time.  Use the
         # start_datetime field added below instead of the removed
@@ -163,6 +343,10 @@ class Event(models.Model):
         ordering = ["start_datetime"]
         verbose_name = "Event"
         verbose_name_plural = "Events"
+        indexes = [
+            # Serves the leader dashboard: a leader's trips by date.
+            models.Index(fields=["created_by", "start_datetime"], name="event_leader_start_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.title
@@ -170,15 +354,90 @@ class Event(models.Model):
     def get_absolute_url(self) -> str:
         return reverse("event-detail", args=[self.slug])
 
+    @property
+    def has_capacity_limit(self) -> bool:
+        return self.trip_capacity > 0
+
+    @property
+    def spots_left(self) -> int | None:
+        """Places still available, or ``None`` for unlimited trips."""
+        if not self.has_capacity_limit:
+            return None
+        return max(self.trip_capacity - self.participant_count, 0)
+
     @property
     def is_full(self) -> bool:
         """Return True when the event is at capacity.
 
-        An event is considered full when the number of available spots
-        reaches zero and a non‑zero total capacity has been defined.
-        Trips with unlimited capacity (spots_total=0) are never full.
+        An event is considered full when its maintained participant count
+        reaches ``trip_capacity``.  Trips with unlimited capacity
+        (``trip_capacity`` of -1) are never full.  No sign-up rows are
+        counted.
         """
-        return self.spots_available == 0 and self.spots_total > 0
+        return self.has_capacity_limit and self.participant_count >= self.trip_capacity
+
+    def geocode(self) -> None:
+        """Set the coordinates from the location fields (no save)."""
+        from . import gazetteer
+
+        self.set_coordinates(*gazetteer.geocode_many([self.trip_location, self.meeting_location]))
+
+    def set_coordinates(self, trip: tuple[float, float] | None, meeting: tuple[float, float] | None) -> None:
+        from . import geo
+
+        self.latitude, self.longitude = trip or (None, None)
+        self.geohash = geo.encode(*trip) if trip else ""
+        self.meeting_latitude, self.meeting_longitude = meeting or (None, None)
+
+
+class EventRevision(models.Model):
+    """One edit of an :class:`Event`, stored as a compressed field diff.
+
+    See :mod:`main.revisions` for the payload format and
+    :func:`main.revisions.reconstruct` to rebuild a past version.
+    """
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="revisions")
+    number = models.PositiveIntegerField()
+    is_snapshot = models.BooleanField(default=False)
+    comment = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    payload = models.BinaryField()
+
+    class Meta:
+        ordering = ["event", "number"]
+        constraints = [
+            models.UniqueConstraint(fields=["event", "number"], name="eventrevision_event_number_uniq"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.event_id} r{self.number}"
+
+
+class EventSignupQuerySet(models.QuerySet):
+    """Query helpers for event sign-ups."""
+
+    def insert_or_get(self, signup: "EventSignup") -> tuple["EventSignup", bool]:
+        """Insert ``signup`` unless the same email already signed up.
+
+        Uses ``INSERT ... ON CONFLICT DO NOTHING`` (``INSERT IGNORE`` on
+        MariaDB) against the ``(event, email)`` unique constraint, so a
+        duplicate submission never raises ``IntegrityError``; the row is
+        then fetched with one indexed select.  Whether this call created it
+        is taken from the insert's row count: retries of one form share an
+        ``idempotency_key``, so the key can't tell them apart.  Returns the
+        sign-up and whether it was created.
+        """
+        opts = self.model._meta
+        fields = [field for field in opts.concrete_fields if not field.generated and field is not opts.auto_field]
+        query = sql.InsertQuery(self.model, on_conflict=OnConflict.IGNORE)
+        query.insert_values(fields, [signup])
+        created = False
+        with connections[self.db].cursor() as cursor:
+            for statement, params in query.get_compiler(using=self.db).as_sql():
+                cursor.execute(statement, params)
+                created = cursor.rowcount == 1
+        return self.get(event_id=signup.event_id, email=signup.email), created
 
 
 class EventSignup(models.Model):
@@ -208,6 +467,24 @@ class EventSignup(models.Model):
         blank=True,
         related_name="event_signups",
     )
+    # Registration id on the legacy Drupal site, set by the import_drupal command.
+    drupal_id = models.PositiveIntegerField(null=True, blank=True, unique=True, editable=False)
+    SELECTION_STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("accepted", "Accepted"),
+        ("rejected", "Rejected"),
+    ]
+    selection_status = models.CharField(
+        max_length=10,
+        choices=SELECTION_STATUS_CHOICES,
+        default="pending",
+        help_text="Leader's decision for \"Trip Leader Picks\" trips",
+    )
+    # Identifies the form submission that created this sign-up, so retried
+    # submissions can be recognised.
+    idempotency_key = models.UUIDField(default=uuid.uuid4, editable=False)
+
+    objects = EventSignupQuerySet.as_manager()
 
     class Meta:
         unique_together = ("event", "email")
@@ -216,6 +493,103 @@ class EventSignup(models.Model):
     def __str__(self) -> str:
         return f"{self.full_name} – {self.event.title}"
 
+    def occupies_place(self, event: Event | None = None) -> bool:
+        """Whether this sign-up takes one of the trip's places."""
+        event = event or self.event
+        return event.registration_method == "fcfs" or self.selection_status == "accepted"
+
+
+class ArchivedEvent(models.Model):
+    """A finished trip moved out of the hot ``Event`` table.
+
+    The ``archive_events`` command moves old events here together with
+    their sign-ups so the tables every request touches stay small.  The
+    full row is kept as serialised JSON in ``data``; only the columns
+    needed to find an archived trip are stored separately.  Archived trip
+    pages are still served by slug, and ``restore_events`` moves a trip
+    back.
+    """
+
+    original_id = models.BigIntegerField(unique=True)
+    slug = models.SlugField(unique=True)
+    title = models.CharField(max_length=200)
+    start_datetime = models.DateTimeField()
+    end_datetime = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    data = models.TextField(help_text="The serialised Event row")
+
+    class Meta:
+        ordering = ["start_datetime"]
+
+    def __str__(self) -> str:
+        return self.title
+
+    def to_event(self) -> Event:
+        """Rebuild the (unsaved) ``Event`` from the archived row."""
+        return _deserialize(self.data)
+
+
+class ArchivedEventSignup(models.Model):
+    """A sign-up belonging to an :class:`ArchivedEvent`."""
+
+    original_id = models.BigIntegerField(unique=True)
+    event = models.ForeignKey(ArchivedEvent, on_delete=models.CASCADE, related_name="signups")
+    email = models.EmailField()
+    user_id = models.BigIntegerField(null=True, blank=True, db_index=True)
+    data = models.TextField(help_text="The serialised EventSignup row")
+
+    def to_signup(self) -> EventSignup:
+        return _deserialize(self.data)
+
+
+class ArchivedEventRevision(models.Model):
+    """An :class:`EventRevision` of an :class:`ArchivedEvent`, kept as is."""
+
+    event = models.ForeignKey(ArchivedEvent, on_delete=models.CASCADE, related_name="revisions")
+    number = models.PositiveIntegerField()
+    is_snapshot = models.BooleanField(default=False)
+    comment = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+    payload = models.BinaryField()
+
+    class Meta:
+        ordering = ["event", "number"]
+
+    def to_revision(self, event_id: int) -> EventRevision:
+        return EventRevision(
+            event_id=event_id,
+            number=self.number,
+            is_snapshot=self.is_snapshot,
+            comment=self.comment,
+            created_at=self.created_at,
+            payload=self.payload,
+        )
+
+
+def _deserialize(data: str):
+    from django.core import serializers
+    # Fields removed from the model since the row was archived are dropped.
+    (obj,) = serializers.deserialize("json", data, ignorenonexistent=True)
+    return obj.object
+
+
+class GazetteerPlace(models.Model):
+    """A named place in the offline gazetteer used for geocoding.
+
+    One row per name: alternate names of a place are separate rows with
+    the same coordinates.  See :mod:`main.gazetteer`.
+    """
+
+    name = models.CharField(max_length=200)
+    search_name = models.CharField(max_length=200, db_index=True, help_text="Normalised name matched by the geocoder")
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    admin1 = models.CharField("state", max_length=20, blank=True)
+    population = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.admin1})" if self.admin1 else self.name
+
 
 class UserProfile(models.Model):
     """Additional information for a user.
@@ -226,13 +600,167 @@ class UserProfile(models.Model):
     registered (see signals.py).
     """
 
+    MEMBERSHIP_STATUS_CHOICES = [
+        ("active", "Active"),
+        ("expiring", "Expiring soon"),
+        ("expired", "Expired"),
+    ]
+
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="profile")
     full_name = models.CharField(max_length=200)
     email = models.EmailField()
     emergency_contact = models.CharField(max_length=200, blank=True)
     membership_signup_date = models.DateField(auto_now_add=True)
-    membership_expiry_date = models.DateField(null=True, blank=True)
+    membership_expiry_date = models.DateField(null=True, blank=True, db_index=True)
     membership_refresh_date = models.DateField(null=True, blank=True)
+    membership_status = models.CharField(
+        max_length=10,
+        choices=MEMBERSHIP_STATUS_CHOICES,
+        default="active",
+        help_text="Maintained nightly by the process_memberships command",
+    )
+    # User id on the legacy Drupal site, set by the import_drupal command.
+    drupal_uid = models.PositiveIntegerField(null=True, blank=True, unique=True, editable=False)
+    # Trip preferences, used to order the home page for this member (see feed.py).
+    preferred_categories = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Event categories the member most wants to hear about",
+    )
+    preferred_difficulty = models.CharField(
+        max_length=20,
+        blank=True,
+        choices=[choice for choice in Event.DIFFICULTY_CHOICES if choice[0] != "none"],
+        help_text="Difficulty the member usually looks for; blank for no preference",
+    )
+
+    def __str__(self) -> str:
+        return self.full_name
+
+
+class ImportCheckpoint(models.Model):
+    """Progress marker for a resumable data import.
+
+    ``source`` identifies one input file of an import (e.g.
+    ``drupal:nodes:events.csv``) and ``rows_done`` counts the rows already
+    committed from it, so an interrupted import can skip straight past them.
+    """
+
+    source = models.CharField(max_length=255, unique=True)
+    rows_done = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.source} @ {self.rows_done}"
+
+
+class Notification(models.Model):
+    """A queued notification waiting to be delivered.
+
+    Features that need to tell members something (membership reminders,
+    trip selection results) enqueue rows here in bulk rather than sending
+    email inline; a separate delivery job marks them ``sent_at``.
+    """
+
+    KIND_CHOICES = [
+        ("membership_expiring", "Membership expiring"),
+        ("membership_expired", "Membership expired"),
+        ("selection_accepted", "Trip place offered"),
+        ("selection_rejected", "Trip place not offered"),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="notifications",
+    )
+    email = models.EmailField()
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    subject = models.CharField(max_length=200)
+    body = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [models.Index(fields=["sent_at", "created_at"], name="notification_pending_idx")]
+
+    def __str__(self) -> str:
+        return f"{self.get_kind_display()} – {self.email}"
+
+
+class GearItem(models.Model):
+    """A piece of hire gear held by the Gear Store."""
+
+    KIND_CHOICES = [
+        ("tent", "Tent"),
+        ("pack", "Pack"),
+        ("sleeping_bag", "Sleeping bag"),
+        ("sleeping_mat", "Sleeping mat"),
+        ("stove", "Stove"),
+        ("harness", "Harness"),
+        ("helmet", "Helmet"),
+        ("rope", "Rope"),
+        ("kayak", "Kayak"),
+        ("skis", "Skis"),
+        ("other", "Other"),
+    ]
+
+    code = models.CharField(max_length=30, unique=True, help_text="Label on the item, e.g. TENT-012")
+    name = models.CharField(max_length=200)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    active = models.BooleanField(default=True, help_text="Untick for gear that is retired or under repair")
+    # Stamped by every booking; the UPDATE also serialises concurrent
+    # bookings of the item (see main/gear.py).
+    last_booked_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        ordering = ["kind", "code"]
+        indexes = [models.Index(fields=["kind", "active"], name="gearitem_kind_idx")]
+
+    def __str__(self) -> str:
+        return f"{self.code} {self.name}"
+
+
+class HireBooking(models.Model):
+    """A hire of one :class:`GearItem` from pickup to return, inclusive."""
+
+    STATUS_CHOICES = [
+        ("booked", "Booked"),
+        ("out", "Picked up"),
+        ("returned", "Returned"),
+        ("cancelled", "Cancelled"),
+    ]
+    #: Statuses in which the booking holds the item.
+    HOLDING_STATUSES = ("booked", "out")
+
+    item = models.ForeignKey(GearItem, on_delete=models.PROTECT, related_name="hires")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="gear_hires",
+    )
+    hirer_name = models.CharField(max_length=200)
+    email = models.EmailField()
+    pickup_date = models.DateField()
+    return_date = models.DateField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="booked")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["pickup_date"]
+        indexes = [
+            # Serves the overlap check: one item's hires ending on or after
+            # the requested pickup date.
+            models.Index(fields=["item", "return_date", "pickup_date"], name="hire_item_interval_idx"),
+            # Serve the daily pickup and return manifest.
+            models.Index(fields=["pickup_date"], name="hire_pickup_idx"),
+            models.Index(fields=["return_date"], name="hire_return_idx"),
+        ]
 
     def __str__(self) -> str:
-        return self.full_name
\ No newline at end of file
+        return f"{self.item.code} {self.pickup_date} – {self.return_date}"
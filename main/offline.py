@@ -0,0 +1,152 @@
+"""Server side of the offline-first service worker.
+
+The service worker (``templates/main/sw.js``, served at ``/sw.js``) keeps
+copies of the static assets, the content pages, upcoming event pages and
+a leader's own rosters so they still open at a trailhead with no
+reception.  It learns what to cache from :func:`manifest`, served as JSON
+at ``/offline-manifest.json``, which lists every cacheable URL together
+with its current ETag so the worker only re-downloads pages and rosters
+that changed.  Pages ask the worker to sync on every load, but it fetches
+the manifest at most once every few minutes.
+
+Pages and rosters are cached for whoever was logged in.  The manifest
+names that member with :func:`user_marker`, and the worker empties those
+caches when the marker changes (logout, or another member logging in on
+a shared device) and on any request to the login or logout URL.
+
+Caches are named after :func:`cache_version`, a hash of the worker script
+and the precached assets, so every deploy that changes either replaces the
+caches installed by the previous one.
+"""
+from __future__ import annotations
+
+import hashlib
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.db.models import Max
+from django.template.loader import get_template
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+from django.utils.http import quote_etag
+
+from .models import Event
+
+#: Static files every page needs, precached when the worker installs.
+PRECACHE_STATIC = ["css/anumc.css"]
+
+#: Named URLs of the static content pages.
+CONTENT_PAGES = [
+    "home",
+    "benefits",
+    "activities",
+    "history",
+    "ethics",
+    "location-hours",
+    "rates-rules",
+    "faq",
+    "signing-up",
+    "member-protection",
+]
+
+#: Content pages that differ per member.  The worker fetches them from the
+#: network first, so a saved preference or another login shows at once,
+#: and falls back to the cached copy only when offline.
+NETWORK_FIRST_PAGES = ["home"]
+
+#: How far ahead upcoming event pages are kept offline.
+EVENT_WINDOW = timedelta(days=60)
+
+
+@lru_cache(maxsize=None)
+def cache_version() -> str:
+    """Version tag for the worker's caches; changes on every deploy.
+
+    ``SERVICE_WORKER_VERSION`` (e.g. the release id) wins when set;
+    otherwise the worker template and precached files are hashed.
+    """
+    version = getattr(settings, "SERVICE_WORKER_VERSION", "")
+    if version:
+        return version
+    digest = hashlib.sha256(get_template("main/sw.js").template.source.encode())
+    for name in PRECACHE_STATIC:
+        path = finders.find(name)
+        if path:
+            with open(path, "rb") as fh:
+                digest.update(fh.read())
+    return digest.hexdigest()[:12]
+
+
+def event_page_etag(slug: str, updated_at) -> str:
+    """ETag of the public event page; see ``views.event_etag``."""
+    return f"{slug}-{updated_at.timestamp()}"
+
+
+def roster_etag(slug: str, updated_at, signup_count: int, last_signup: int | None, *, leader: bool = True) -> str:
+    """ETag of an event's member fragment; see ``views.member_fragment_etag``.
+
+    Sign-ups that take no place leave ``updated_at`` alone, so their count
+    and the newest one are part of the tag.
+    """
+    return f"{slug}-{updated_at.timestamp()}-{signup_count}-{last_signup or 0}-{'leader' if leader else 'member'}"
+
+
+def leader_trips(user):
+    """The trips ``user`` leads, with what their rosters' ETags are made of."""
+    return (
+        user.events_created.with_signup_stats()
+        .annotate(last_signup=Max("signups__pk"))
+        .order_by("start_datetime", "pk")
+        .values_list("slug", "end_datetime", "updated_at", "signup_count", "pending_count", "last_signup")
+    )
+
+
+def my_trips_etag(trips) -> str:
+    """ETag of the leader dashboard, from the rows of :func:`leader_trips`."""
+    rows = [(slug, updated_at.timestamp(), count, pending, last) for slug, _, updated_at, count, pending, last in trips]
+    return hashlib.md5(repr(rows).encode()).hexdigest()
+
+
+def user_marker(user) -> str | None:
+    """Opaque tag of the logged-in member the worker caches pages for."""
+    if not user.is_authenticated:
+        return None
+    return salted_hmac("main.offline.user_marker", str(user.pk)).hexdigest()[:16]
+
+
+def manifest(user, now=None) -> dict:
+    """Return the URLs the worker should keep offline for ``user``."""
+    now = timezone.now() if now is None else now
+    events = (
+        Event.objects.filter(start_datetime__gte=now - timedelta(days=1), start_datetime__lte=now + EVENT_WINDOW)
+        .order_by("start_datetime")
+        .values_list("slug", "updated_at")
+    )
+    pages = [{"url": reverse(name), "etag": None} for name in CONTENT_PAGES]
+    pages += [
+        {"url": reverse("event-detail", args=[slug]), "etag": quote_etag(event_page_etag(slug, updated_at))}
+        for slug, updated_at in events
+    ]
+    rosters = []
+    if user.is_authenticated:
+        trips = list(leader_trips(user))
+        rosters = [{"url": reverse("my-trips"), "etag": quote_etag(my_trips_etag(trips))}]
+        rosters += [
+            {
+                "url": reverse("event-member-fragment", args=[slug]),
+                "etag": quote_etag(roster_etag(slug, updated_at, count, last)),
+            }
+            for slug, end, updated_at, count, _, last in trips
+            if end >= now - timedelta(days=1)
+        ]
+    return {
+        "version": cache_version(),
+        "user": user_marker(user),
+        "precache": [static(name) for name in PRECACHE_STATIC],
+        "pages": pages,
+        "rosters": rosters,
+    }
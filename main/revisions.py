@@ -0,0 +1,207 @@
+"""Compact revision history for events.
+
+Every save of an :class:`~main.models.Event` records an
+:class:`~main.models.EventRevision` (see ``signals.record_event_revision``).
+Rather than a full copy of the row, a revision stores only the fields that
+changed since the previous revision.  Long text fields such as
+``description`` are stored as a line-based delta when that is smaller than
+the new value, and the whole payload is zlib-compressed.
+
+Rebuilding a version means replaying deltas forward from a full snapshot,
+so every ``SNAPSHOT_INTERVAL``-th revision stores all fields.  That bounds
+:func:`reconstruct` to one query fetching at most ``SNAPSHOT_INTERVAL``
+revisions, however long the history grows.
+
+Payload format (before compression)::
+
+    {"f": {attname: value, ...},                 # full values
+     "d": {attname: [[i1, i2, "text"], ...]}}    # text deltas
+
+A delta replaces lines ``i1:i2`` of the previous value with ``text``.
+"""
+from __future__ import annotations
+
+import json
+import zlib
+from difflib import SequenceMatcher
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, models, transaction
+
+#: Every this many revisions a full snapshot is stored.
+SNAPSHOT_INTERVAL = 20
+
+#: Text values shorter than this are stored whole rather than as a delta.
+MIN_DELTA_LENGTH = 200
+
+#: Tries at numbering a revision when concurrent saves take the same number.
+RECORD_ATTEMPTS = 3
+
+
+def tracked_fields(model) -> list[models.Field]:
+    """Fields whose edits are recorded: everything a user can edit.
+
+    ``comment`` describes the edit itself, so it is kept on the revision
+    rather than diffed.
+    """
+    return [
+        field
+        for field in model._meta.concrete_fields
+        if field.editable and not field.primary_key and field.name != "comment"
+    ]
+
+
+def field_state(instance) -> dict:
+    """Return the tracked field values of ``instance`` as JSON-ready data."""
+    state = {}
+    for field in tracked_fields(type(instance)):
+        value = field.value_from_object(instance)
+        if isinstance(field, models.FileField):
+            value = value.name if value else ""
+        state[field.attname] = json.loads(json.dumps(value, cls=DjangoJSONEncoder))
+    return state
+
+
+def text_delta(old: str, new: str) -> list[list]:
+    """Return the line edits turning ``old`` into ``new``."""
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    return [
+        [i1, i2, "".join(new_lines[j1:j2])]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def apply_delta(old: str, delta: list[list]) -> str:
+    lines = old.splitlines(keepends=True)
+    # Apply from the end so earlier line numbers stay valid.
+    for i1, i2, text in reversed(delta):
+        lines[i1:i2] = [text]
+    return "".join(lines)
+
+
+def diff_state(old: dict, new: dict) -> dict:
+    """Return the payload recording the change from ``old`` to ``new``."""
+    full, deltas = {}, {}
+    for name, value in new.items():
+        previous = old.get(name)
+        if name in old and previous == value:
+            continue
+        if isinstance(previous, str) and isinstance(value, str) and len(value) >= MIN_DELTA_LENGTH:
+            delta = text_delta(previous, value)
+            if len(json.dumps(delta)) < len(json.dumps(value)):
+                deltas[name] = delta
+                continue
+        full[name] = value
+    payload = {}
+    if full:
+        payload["f"] = full
+    if deltas:
+        payload["d"] = deltas
+    return payload
+
+
+def apply_payload(state: dict, payload: dict) -> dict:
+    state = {**state, **payload.get("f", {})}
+    for name, delta in payload.get("d", {}).items():
+        state[name] = apply_delta(state[name], delta)
+    return state
+
+
+def pack(payload: dict) -> bytes:
+    return zlib.compress(json.dumps(payload, separators=(",", ":")).encode(), 9)
+
+
+def unpack(data: bytes) -> dict:
+    return json.loads(zlib.decompress(bytes(data)))
+
+
+def state_at(revisions) -> dict:
+    """Replay ``revisions`` (oldest first, starting at a snapshot)."""
+    state: dict = {}
+    for revision in revisions:
+        payload = unpack(revision.payload)
+        state = payload["f"] if revision.is_snapshot else apply_payload(state, payload)
+    return state
+
+
+def _chain(event_id: int, number: int | None = None) -> list:
+    """Fetch the revisions needed to rebuild ``number`` (default: latest).
+
+    A snapshot is stored at least every ``SNAPSHOT_INTERVAL`` revisions, so
+    the last ``SNAPSHOT_INTERVAL`` revisions up to ``number`` always
+    include one.
+    """
+    from .models import EventRevision
+
+    revisions = EventRevision.objects.filter(event_id=event_id)
+    if number is not None:
+        revisions = revisions.filter(number__lte=number)
+    recent = list(revisions.order_by("-number")[:SNAPSHOT_INTERVAL])
+    for index, revision in enumerate(recent):
+        if revision.is_snapshot:
+            return recent[index::-1]
+    return []
+
+
+def record_revision(event, *, comment: str = "", created: bool = False):
+    """Record the current state of ``event``; return the new revision.
+
+    Returns ``None`` when no tracked field changed since the last revision.
+    Pass ``created=True`` for a new event to skip looking up its history.
+    """
+    from .models import EventRevision
+
+    state = field_state(event)
+
+    def create(chain: list):
+        if chain:
+            payload = diff_state(state_at(chain), state)
+            if not payload:
+                return None
+        number = chain[-1].number + 1 if chain else 1
+        is_snapshot = (number - 1) % SNAPSHOT_INTERVAL == 0
+        if is_snapshot:
+            payload = {"f": state}
+        return EventRevision.objects.create(
+            event_id=event.pk,
+            number=number,
+            is_snapshot=is_snapshot,
+            comment=comment,
+            payload=pack(payload),
+        )
+
+    if created:
+        # Nobody else can be numbering revisions of a brand new event.
+        return create([])
+    for attempt in range(RECORD_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                return create(_chain(event.pk))
+        except IntegrityError:
+            # A concurrent save took the number; diff against its revision.
+            if attempt == RECORD_ATTEMPTS - 1:
+                raise
+
+
+def reconstruct(event, number: int):
+    """Return an unsaved copy of ``event`` as it was at revision ``number``.
+
+    Raises :class:`~main.models.EventRevision.DoesNotExist` if there is no
+    such revision.
+    """
+    from .models import EventRevision
+
+    chain = _chain(event.pk, number)
+    if not chain or chain[-1].number != number:
+        raise EventRevision.DoesNotExist(f"Event {event.pk} has no revision {number}")
+    model = type(event)
+    fields = {field.attname: field for field in tracked_fields(model)}
+    version = model(pk=event.pk)
+    for name, value in state_at(chain).items():
+        if name in fields:
+            setattr(version, name, fields[name].to_python(value))
+    version.comment = chain[-1].comment
+    return version
@@ -0,0 +1,67 @@
+"""Bulk accept/reject of sign-ups for "Trip Leader Picks" trips.
+
+A leader's decision for any number of sign-ups is applied in one
+transaction with a fixed number of statements: the event row is locked,
+the sign-ups change status with a single ``UPDATE ... WHERE id IN (...)``,
+the event's ``participant_count`` moves with a single ``F()`` update and the
+participants' notifications are inserted as one batch.
+"""
+from __future__ import annotations
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .models import Event, EventSignup, Notification
+
+NOTIFICATION_SUBJECTS = {
+    "accepted": "You have a place on {title}",
+    "rejected": "Sorry, you weren't selected for {title}",
+}
+
+
+def set_selection(event: Event, signup_ids, status: str) -> int:
+    """Mark the given sign-ups of ``event`` as ``status``.
+
+    ``status`` is ``"accepted"`` or ``"rejected"``.  Sign-ups already in
+    that state are left alone.  Raises :class:`ValidationError` if
+    accepting them would exceed the event's capacity.  Returns the number
+    of sign-ups whose status changed.
+    """
+    if status not in NOTIFICATION_SUBJECTS:
+        raise ValueError(f"Unsupported selection status {status!r}")
+    with transaction.atomic():
+        # Lock the event so concurrent decisions see each other's changes
+        # to the remaining places.
+        locked = (
+            Event.objects.select_for_update()
+            .only("registration_method", "trip_capacity", "participant_count")
+            .get(pk=event.pk)
+        )
+        changing = list(
+            EventSignup.objects.filter(event=event, pk__in=signup_ids)
+            .exclude(selection_status=status)
+            .values_list("pk", "selection_status", "email", "user_id")
+        )
+        if not changing:
+            return 0
+        previously_accepted = sum(1 for _, old, _, _ in changing if old == "accepted")
+        taken = len(changing) - previously_accepted if status == "accepted" else -previously_accepted
+        if locked.registration_method != "picky":
+            # Every sign-up already holds a place on first come first
+            # served trips.
+            taken = 0
+        if locked.has_capacity_limit and taken > locked.spots_left:
+            raise ValidationError(
+                f"Only {locked.spots_left} places are left; "
+                f"cannot accept {taken} more participants."
+            )
+        if taken:
+            Event.objects.filter(pk=event.pk).adjust_participant_count(taken)
+
+        EventSignup.objects.filter(pk__in=[pk for pk, _, _, _ in changing]).update(selection_status=status)
+        subject = NOTIFICATION_SUBJECTS[status].format(title=event.title)
+        Notification.objects.bulk_create(
+            Notification(user_id=user_id, email=email, kind=f"selection_{status}", subject=subject)
+            for _, _, email, user_id in changing
+        )
+    return len(changing)
@@ -1,11 +1,17 @@
-"""Signals for automatically creating and updating user profiles."""
+"""Signals for automatically creating and updating user profiles.
+
+Also invalidates cached home-page fragments when their source rows change.
+"""
 from __future__ import annotations
 
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
+from django.utils import timezone
 
-from .models import UserProfile
+from . import caching, feed, revisions
+from .models import Announcement, Event, EventSignup, UserProfile
 
 
 @receiver(post_save, sender=User)
@@ -23,4 +29,81 @@ def create_or_update_user_profile(sender, instance: User, created: bool, **kwarg
         profile, _ = UserProfile.objects.get_or_create(user=instance)
         profile.full_name = instance.get_full_name() or instance.username
         profile.email = instance.email
-        profile.save()
\ No newline at end of file
+        profile.save()
+
+
+@receiver(post_save, sender=Announcement)
+@receiver(post_delete, sender=Announcement)
+def invalidate_announcements(sender, **kwargs: object) -> None:
+    """Drop the cached home-page announcements after any edit."""
+    caching.invalidate_home_announcements()
+
+
+@receiver(post_delete, sender=EventSignup)
+def release_place(sender, instance: EventSignup, origin=None, **kwargs: object) -> None:
+    """Give a deleted sign-up's place back with a single UPDATE.
+
+    Accepted sign-ups always held a place; others only on first come first
+    served trips.  The condition is evaluated in the UPDATE itself so
+    cascading deletes don't fetch the event once per sign-up.  Sign-ups
+    deleted because their event is being deleted are skipped.
+    """
+    if isinstance(origin, Event) or getattr(origin, "model", None) is Event:
+        return
+    events = Event.objects.filter(pk=instance.event_id, participant_count__gt=0)
+    if instance.selection_status != "accepted":
+        events = events.filter(registration_method="fcfs")
+    events.adjust_participant_count(-1)
+
+
+@receiver(post_save, sender=Event)
+def record_event_revision(sender, instance: Event, created: bool, raw: bool = False, **kwargs: object) -> None:
+    """Keep a compact history of every edit; see :mod:`main.revisions`."""
+    if not raw:
+        revisions.record_revision(instance, comment=instance.comment, created=created)
+
+
+@receiver(pre_save, sender=Event)
+def geocode_event(sender, instance: Event, raw: bool = False, **kwargs: object) -> None:
+    """Locate the event from its free-text locations before saving.
+
+    Lookups are cached in-process, so this rarely needs a query.
+    """
+    if not raw:
+        instance.geocode()
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def update_feeds(sender, instance: Event, raw: bool = False, **kwargs: object) -> None:
+    """Queue the event's new state for members' home-page rankings.
+
+    This runs on commit, so a ranking rebuilt in the meantime can't read
+    the old row and still be marked as up to date.
+    """
+    if raw:
+        return
+    deleted = "created" not in kwargs
+    if deleted and instance.end_datetime < timezone.now():
+        # Finished trips (e.g. archived ones) are in no ranking.
+        return
+    values = (instance.pk, instance.category, instance.difficulty_level, instance.end_datetime)
+    transaction.on_commit(lambda: feed.event_changed(*values, deleted=deleted))
+
+
+@receiver(post_save, sender=UserProfile)
+def reset_feed_for_profile(sender, instance: UserProfile, **kwargs: object) -> None:
+    """Preferences may have changed; rebuild the member's ranking."""
+    feed.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=EventSignup)
+@receiver(post_delete, sender=EventSignup)
+def reset_feed_for_signup(sender, instance: EventSignup, **kwargs: object) -> None:
+    """Sign-up history feeds the ranking; rebuild it for this member.
+
+    Sign-ups made through the site are inserted without signals, and
+    ``EventSignupView`` drops the ranking itself.
+    """
+    if instance.user_id:
+        feed.invalidate(instance.user_id)
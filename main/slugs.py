@@ -0,0 +1,86 @@
+"""Collision-free slug allocation for events.
+
+Recurring trips such as "Sunday arvo kayak" reuse the same title every
+week, so a plain ``slugify(title)`` collides with the unique constraint on
+``Event.slug``.  The helpers here pick the next free numeric suffix
+(``sunday-arvo-kayak-2``, ``-3`` ...) using a single indexed prefix query
+and retry a bounded number of times when a concurrent creator claims the
+same slug between the lookup and the insert.
+"""
+from __future__ import annotations
+
+import re
+
+from django.db import IntegrityError, transaction
+from django.utils.text import slugify
+
+#: Slug used when ``slugify`` reduces a title to an empty string (for
+#: example a title made only of punctuation or non-Latin characters).
+FALLBACK_SLUG = "event"
+
+#: How many times to retry the insert after losing a race for a slug.
+MAX_SLUG_ATTEMPTS = 5
+
+
+def allocate_slug(model, title: str, *, exclude_pk=None) -> str:
+    """Return a slug for ``title`` that is not yet used by ``model``.
+
+    Only one query is issued: every slug beginning with the base slug is
+    fetched through the unique index (``slug LIKE 'base%'``) and the
+    highest numeric suffix is incremented.  For events, slugs held by
+    archived trips are included in the same query.  The base is truncated so the
+    suffixed slug still fits within the field's ``max_length``.
+    """
+    max_length = model._meta.get_field("slug").max_length
+    base = slugify(title) or FALLBACK_SLUG
+    # Leave room for a "-NNNNNN" suffix.
+    base = base[: max_length - 7].strip("-") or FALLBACK_SLUG
+
+    taken = model._default_manager.filter(slug__startswith=base)
+    if exclude_pk is not None:
+        taken = taken.exclude(pk=exclude_pk)
+    taken = taken.order_by().values_list("slug", flat=True)
+    archived = _archived_slugs(model, base)
+    if archived is not None:
+        # Archived trips keep their slug so old links still resolve.
+        taken = taken.union(archived, all=True)
+    existing = set(taken)
+    if base not in existing:
+        return base
+
+    pattern = re.compile(rf"^{re.escape(base)}-(\d+)$")
+    highest = 1
+    for slug in existing:
+        match = pattern.match(slug)
+        if match:
+            highest = max(highest, int(match.group(1)))
+    return f"{base}-{highest + 1}"
+
+
+def _archived_slugs(model, base: str):
+    from .models import ArchivedEvent, Event
+
+    if model is not Event:
+        return None
+    return ArchivedEvent.objects.filter(slug__startswith=base).order_by().values_list("slug", flat=True)
+
+
+def save_with_unique_slug(instance, title: str | None = None, *, attempts: int = MAX_SLUG_ATTEMPTS):
+    """Allocate a slug for ``instance`` and save it, retrying on collisions.
+
+    Each attempt runs inside its own savepoint so that an
+    ``IntegrityError`` raised by a concurrent insert of the same slug can
+    be rolled back without aborting the caller's transaction.  The error
+    is re-raised once ``attempts`` is exhausted.
+    """
+    title = instance.title if title is None else title
+    for attempt in range(attempts):
+        instance.slug = allocate_slug(type(instance), title, exclude_pk=instance.pk)
+        try:
+            with transaction.atomic():
+                instance.save()
+        except IntegrityError:
+            if attempt == attempts - 1:
+                raise
+            continue
+        return instance
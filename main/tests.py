@@ -9,13 +9,47 @@ be added for forms, permissions and other business logic.
 """
 from __future__ import annotations
 
+import os
+import time
+import unittest
 from datetime import date, timedelta
-from django.test import TestCase
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from .models import Announcement, Event
 from .forms import EventForm, EventSignupForm
 
+# Benchmarks are slow and print timings rather than asserting on them, so
+# they only run when explicitly requested:
+#     ANUMC_BENCHMARKS=1 python manage.py test main
+benchmark = unittest.skipUnless(
+    os.environ.get("ANUMC_BENCHMARKS") == "1",
+    "set ANUMC_BENCHMARKS=1 to run benchmarks",
+)
+
+
+def sample_events(count: int) -> list[Event]:
+    """Build ``count`` unsaved events for rendering tests and benchmarks."""
+    from datetime import datetime
+    start = datetime(2025, 10, 4, 8, 0)
+    return [
+        Event(
+            title=f"Trip {i}",
+            slug=f"trip-{i}",
+            category="hiking",
+            description="A long walk in Namadgi with plenty of hills.\n\n" * 5,
+            start_datetime=start + timedelta(days=i),
+            end_datetime=start + timedelta(days=i, hours=10),
+            fitness_required="Moderate",
+            trip_location="Namadgi",
+            trip_capacity=10,
+            participant_count=10 - i % 11,
+        )
+        for i in range(count)
+    ]
+
 
 class HomePageTests(TestCase):
     def setUp(self) -> None:
@@ -32,8 +66,8 @@ class HomePageTests(TestCase):
             start_datetime=datetime.combine(today + timedelta(days=1), datetime.min.time()),
             end_datetime=datetime.combine(today + timedelta(days=1), datetime.min.time()),
             fitness_required="Suitable for beginners and most fitness levels",
-            spots_total=10,
-            spots_available=5,
+            trip_capacity=10,
+            participant_count=5,
         )
         Event.objects.create(
             title="Climbing trip to Snake Rock",
@@ -43,8 +77,8 @@ class HomePageTests(TestCase):
             start_datetime=datetime.combine(today + timedelta(days=2), datetime.min.time()),
             end_datetime=datetime.combine(today + timedelta(days=2), datetime.min.time()),
             fitness_required="Moderate fitness but no prior experience",
-            spots_total=20,
-            spots_available=0,
+            trip_capacity=20,
+            participant_count=20,
         )
 
     def test_home_page_status_code(self) -> None:
@@ -80,11 +114,13 @@ class EventModelTest(TestCase):
             description="Description",
             start_datetime=datetime.now(),
             end_datetime=datetime.now(),
-            spots_total=3,
-            spots_available=0,
+            trip_capacity=3,
+            participant_count=3,
         )
         self.assertTrue(event.is_full)
-        event.spots_available = 1
+        event.participant_count = 2
+        self.assertFalse(event.is_full)
+        event.trip_capacity = -1
         self.assertFalse(event.is_full)
 
 
@@ -182,4 +218,2211 @@ class EventSignupViewTest(TestCase):
         self.assertEqual(response.status_code, 302)
         self.assertEqual(self.event.signups.count(), 1)
         signup = self.event.signups.first()
-        self.assertEqual(signup.full_name, "Alice Example")
\ No newline at end of file
+        self.assertEqual(signup.full_name, "Alice Example")
+
+
+class SlugAllocationTests(TestCase):
+    """Tests for collision-free slug allocation on recurring titles."""
+
+    def _event(self, title: str) -> Event:
+        from datetime import datetime
+        return Event(
+            title=title,
+            category="kayaking",
+            description="Weekly paddle.",
+            start_datetime=datetime.now(),
+            end_datetime=datetime.now(),
+            trip_location="Lake Burley Griffin",
+        )
+
+    def test_form_allocates_suffix_for_duplicate_title(self) -> None:
+        from datetime import datetime
+        data = {
+            "title": "Sunday arvo kayak",
+            "description": "Weekly paddle.",
+            "registration_method": "fcfs",
+            "trip_capacity": -1,
+            "category": "kayaking",
+            "trip_location": "Lake Burley Griffin",
+            "start_datetime": datetime(2025, 9, 21, 14, 0),
+            "end_datetime": datetime(2025, 9, 21, 17, 0),
+            "difficulty_level": "easy",
+            "approval_status": "approved",
+            "contact_details": "Jane Doe jane@example.com",
+        }
+        first = EventForm(data=data)
+        second = EventForm(data=data)
+        self.assertTrue(first.is_valid(), first.errors)
+        self.assertTrue(second.is_valid(), second.errors)
+        self.assertEqual(first.save().slug, "sunday-arvo-kayak")
+        self.assertEqual(second.save().slug, "sunday-arvo-kayak-2")
+
+    def test_empty_slugify_result_uses_fallback(self) -> None:
+        from .slugs import save_with_unique_slug
+        first = save_with_unique_slug(self._event("!!!"))
+        second = save_with_unique_slug(self._event("攀岩"))
+        self.assertEqual(first.slug, "event")
+        self.assertEqual(second.slug, "event-2")
+
+    def test_long_titles_fit_slug_field(self) -> None:
+        from .slugs import save_with_unique_slug
+        title = "A very long trip title " * 10
+        first = save_with_unique_slug(self._event(title))
+        second = save_with_unique_slug(self._event(title))
+        self.assertLessEqual(len(second.slug), 50)
+        self.assertNotEqual(first.slug, second.slug)
+
+    def test_retries_when_concurrent_creator_claims_slug(self) -> None:
+        from unittest import mock
+        from . import slugs
+        existing = self._event("Wednesday climbing night")
+        existing.slug = "wednesday-climbing-night"
+        existing.save()
+        # Simulate losing the race: the first lookup returns a stale answer.
+        real = slugs.allocate_slug
+        stale = iter(["wednesday-climbing-night"])
+        with mock.patch.object(
+            slugs, "allocate_slug",
+            side_effect=lambda *a, **kw: next(stale, None) or real(*a, **kw),
+        ):
+            event = slugs.save_with_unique_slug(self._event("Wednesday climbing night"))
+        self.assertEqual(event.slug, "wednesday-climbing-night-2")
+
+    def test_thousand_same_titled_events_use_linear_queries(self) -> None:
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .slugs import save_with_unique_slug
+        count = 1000
+        with CaptureQueriesContext(connection) as ctx:
+            for _ in range(count):
+                save_with_unique_slug(self._event("Sunday arvo kayak"))
+        # One prefix lookup and one insert per event, plus the savepoint
+        # statements wrapping each insert and the first revision's insert.
+        self.assertLessEqual(len(ctx.captured_queries), 5 * count)
+        slugs_seen = set(Event.objects.values_list("slug", flat=True))
+        self.assertEqual(len(slugs_seen), count)
+        self.assertIn("sunday-arvo-kayak-1000", slugs_seen)
+
+
+@unittest.skipUnless("jinja2" in __import__("django.template").template.engines, "Jinja2 not installed")
+class Jinja2TemplateTests(SimpleTestCase):
+    """The Jinja2 templates must render the same markup as the Django ones."""
+
+    def _render_both(self, name: str, context: dict) -> tuple[str, str]:
+        from django.template import engines
+        django_html = engines["django"].get_template(name).render(context)
+        jinja_html = engines["jinja2"].get_template(name).render(context)
+        return " ".join(django_html.split()), " ".join(jinja_html.split())
+
+    def test_home_page_matches_django_engine(self) -> None:
+        context = {
+            "events": sample_events(3),
+            "announcements": [Announcement(title="Notice", body="It's open.")],
+        }
+        django_html, jinja_html = self._render_both("main/home.html", context)
+        self.assertEqual(django_html, jinja_html)
+
+    def test_event_detail_matches_django_engine(self) -> None:
+        event = sample_events(1)[0]
+        event.description = "First <b>line</b>\nsecond line\n\nNew paragraph"
+        context = {"event": event, "show_signups": False, "signups": None}
+        django_html, jinja_html = self._render_both("main/event_detail.html", context)
+        self.assertEqual(django_html, jinja_html)
+
+
+@benchmark
+class TemplateRenderBenchmark(SimpleTestCase):
+    """Render the home page with 100 event cards under each engine."""
+
+    def test_home_page_render(self) -> None:
+        from django.template import engines
+        context = {"events": sample_events(100), "announcements": []}
+        iterations = 50
+        for name in ("django", "jinja2"):
+            if name not in engines:
+                continue
+            template = engines[name].get_template("main/home.html")
+            template.render(context)  # warm up
+            started = time.perf_counter()
+            for _ in range(iterations):
+                template.render(context)
+            elapsed = (time.perf_counter() - started) / iterations
+            print(f"\n{name}: {elapsed * 1000:.2f} ms per home page render (100 cards)")
+
+
+class ScheduledAnnouncementTests(TestCase):
+    """Tests for announcement publish/expire windows and their cache TTL."""
+
+    def setUp(self) -> None:
+        from datetime import datetime
+        from django.core.cache import cache
+        cache.clear()
+        self.now = datetime(2025, 9, 20, 12, 0)
+
+    def test_live_filters_on_window(self) -> None:
+        Announcement.objects.create(title="Always", body="x")
+        Announcement.objects.create(title="Future", body="x", publish_at=self.now + timedelta(hours=1))
+        Announcement.objects.create(title="Expired", body="x", expire_at=self.now - timedelta(hours=1))
+        Announcement.objects.create(
+            title="Current", body="x",
+            publish_at=self.now - timedelta(hours=1), expire_at=self.now + timedelta(hours=1),
+        )
+        Announcement.objects.create(title="Hidden", body="x", display_on_home=False)
+        titles = set(Announcement.objects.live(self.now).values_list("title", flat=True))
+        self.assertEqual(titles, {"Always", "Current"})
+
+    def test_ttl_runs_until_next_boundary(self) -> None:
+        from .caching import HOME_ANNOUNCEMENTS_MAX_TTL, announcements_ttl
+        # Nothing scheduled: other workers still pick up edits eventually.
+        self.assertEqual(announcements_ttl(self.now), HOME_ANNOUNCEMENTS_MAX_TTL)
+        Announcement.objects.create(title="Soon", body="x", publish_at=self.now + timedelta(minutes=30))
+        self.assertEqual(announcements_ttl(self.now), HOME_ANNOUNCEMENTS_MAX_TTL)
+        Announcement.objects.create(title="Ending", body="x", expire_at=self.now + timedelta(minutes=2))
+        Announcement.objects.create(
+            title="Hidden", body="x", display_on_home=False, expire_at=self.now + timedelta(minutes=1),
+        )
+        self.assertEqual(announcements_ttl(self.now), 120)
+
+    def test_shared_cache_keeps_announcements_until_invalidated(self) -> None:
+        from .caching import announcements_ttl
+        redis = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://"}}
+        with self.settings(CACHES=redis):
+            self.assertIsNone(announcements_ttl(self.now))
+        Announcement.objects.create(title="Later", body="x", publish_at=self.now + timedelta(hours=3))
+        with self.settings(CACHES=redis):
+            self.assertEqual(announcements_ttl(self.now), 3 * 60 * 60)
+
+    def test_home_announcements_cached_and_invalidated_on_edit(self) -> None:
+        from .caching import home_announcements
+        ann = Announcement.objects.create(title="Track closed", body="x")
+        self.assertEqual([a.title for a in home_announcements()], ["Track closed"])
+        with self.assertNumQueries(0):
+            home_announcements()
+        ann.display_on_home = False
+        ann.save()
+        self.assertEqual(home_announcements(), [])
+
+    def test_home_page_hides_unpublished_announcement(self) -> None:
+        from datetime import datetime
+        Announcement.objects.create(
+            title="Ski season opens", body="Lodge bookings open soon.",
+            publish_at=datetime.now() + timedelta(days=1),
+        )
+        response = self.client.get(reverse("home"))
+        self.assertNotContains(response, "Ski season opens")
+
+
+class ProcessMembershipsTests(TestCase):
+    """Tests for the nightly membership expiry command."""
+
+    def _make_profiles(self, expiries: list) -> list:
+        from django.contrib.auth.models import User
+        from .models import UserProfile
+        users = User.objects.bulk_create(
+            User(username=f"member{i}", email=f"member{i}@example.com") for i in range(len(expiries))
+        )
+        return UserProfile.objects.bulk_create(
+            UserProfile(user=user, full_name=user.username, email=user.email, membership_expiry_date=expiry)
+            for user, expiry in zip(users, expiries)
+        )
+
+    def test_statuses_and_reminders(self) -> None:
+        from .management.commands.process_memberships import process_memberships
+        from .models import Notification, UserProfile
+        today = date(2025, 9, 20)
+        self._make_profiles([
+            today - timedelta(days=1),   # expired
+            today + timedelta(days=5),   # expiring
+            today + timedelta(days=90),  # active
+            None,                        # no membership recorded
+        ])
+        stats = process_memberships(today, days=30, batch_size=2)
+        self.assertEqual((stats["expired"], stats["expiring"], stats["notifications"]), (1, 1, 2))
+        statuses = dict(UserProfile.objects.values_list("user__username", "membership_status"))
+        self.assertEqual(statuses, {
+            "member0": "expired", "member1": "expiring", "member2": "active", "member3": "active",
+        })
+        self.assertEqual(
+            set(Notification.objects.values_list("kind", flat=True)),
+            {"membership_expired", "membership_expiring"},
+        )
+        # A second run is a no-op: no duplicate reminders.
+        stats = process_memberships(today, days=30, batch_size=2)
+        self.assertEqual(stats["notifications"], 0)
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_renewed_member_returns_to_active(self) -> None:
+        from .management.commands.process_memberships import process_memberships
+        from .models import UserProfile
+        today = date(2025, 9, 20)
+        (profile,) = self._make_profiles([today + timedelta(days=5)])
+        process_memberships(today)
+        UserProfile.objects.filter(pk=profile.pk).update(membership_expiry_date=today + timedelta(days=365))
+        stats = process_memberships(today)
+        self.assertEqual(stats["renewed"], 1)
+        self.assertEqual(UserProfile.objects.get(pk=profile.pk).membership_status, "active")
+
+    def test_query_count_is_bounded_per_chunk(self) -> None:
+        from .management.commands.process_memberships import process_memberships
+        today = date(2025, 9, 20)
+        self._make_profiles([today + timedelta(days=i % 40 - 10) for i in range(100)])
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        # renewals + per chunk (select, up to two updates, insert, savepoint
+        # pair) + final empty select.
+        with CaptureQueriesContext(connection) as ctx:
+            stats = process_memberships(today, days=30, batch_size=10)
+        self.assertEqual(stats["batches"], 10)
+        self.assertLessEqual(len(ctx.captured_queries), 1 + 10 * 6 + 1)
+
+    def test_command_reports_timings(self) -> None:
+        from io import StringIO
+        from django.core.management import call_command
+        out = StringIO()
+        call_command("process_memberships", "--dry-run", stdout=out)
+        self.assertIn("Scanned 0 profiles", out.getvalue())
+
+
+@benchmark
+class ProcessMembershipsBenchmark(TestCase):
+    def test_hundred_thousand_profiles(self) -> None:
+        import tracemalloc
+        from .management.commands.process_memberships import process_memberships
+        today = date(2025, 9, 20)
+        count = 100_000
+        ProcessMembershipsTests._make_profiles(self, [today + timedelta(days=i % 400 - 200) for i in range(count)])
+        tracemalloc.start()
+        started = time.perf_counter()
+        stats = process_memberships(today, days=30, batch_size=2000)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"\n{count} profiles: {elapsed:.2f}s, peak {peak / 1e6:.1f} MB, {stats}")
+
+
+def write_drupal_export(directory, users: int, nodes: int, registrations: int) -> dict:
+    """Write a synthetic Drupal export (CSV users, JSON nodes, JSON-lines registrations)."""
+    import csv
+    import json
+    from pathlib import Path
+    directory = Path(directory)
+    paths = {
+        "users": directory / "users.csv",
+        "nodes": directory / "nodes.json",
+        "registrations": directory / "registrations.jsonl",
+    }
+    with open(paths["users"], "w", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["uid", "name", "mail", "full_name", "created", "membership_expiry"])
+        for uid in range(1, users + 1):
+            writer.writerow([uid, f"user{uid}", f"user{uid}@example.com", f"User {uid}", 1500000000, "2026-03-01"])
+    with open(paths["nodes"], "w") as fh:
+        fh.write("[\n")
+        for nid in range(1, nodes + 1):
+            node = {
+                "nid": nid, "type": "trip", "title": f"Weekend walk {nid}", "body": "Bring water.",
+                "uid": nid % users + 1, "start": 1700000000 + nid * 86400, "end": 1700003600 + nid * 86400,
+                "location": "Namadgi", "category": "Hiking", "capacity": "12", "status": 1,
+            }
+            fh.write(("," if nid > 1 else "") + json.dumps(node) + "\n")
+        fh.write("]\n")
+    with open(paths["registrations"], "w") as fh:
+        for rid in range(1, registrations + 1):
+            uid = rid % users + 1
+            fh.write(json.dumps({
+                "registration_id": rid, "nid": rid % nodes + 1, "uid": uid,
+                "mail": f"user{uid}-{rid}@example.com", "full_name": f"User {uid}",
+            }) + "\n")
+    return paths
+
+
+class ImportDrupalTests(TestCase):
+    """Tests for the streaming, resumable Drupal importer."""
+
+    def setUp(self) -> None:
+        import tempfile
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.paths = write_drupal_export(self.tmp.name, users=5, nodes=4, registrations=12)
+
+    def _import(self, *extra: str) -> str:
+        from io import StringIO
+        from django.core.management import call_command
+        out = StringIO()
+        call_command(
+            "import_drupal",
+            "--users", str(self.paths["users"]),
+            "--nodes", str(self.paths["nodes"]),
+            "--registrations", str(self.paths["registrations"]),
+            "--batch-size", "3",
+            *extra,
+            stdout=out,
+        )
+        return out.getvalue()
+
+    def test_imports_users_events_and_signups(self) -> None:
+        from django.contrib.auth.models import User
+        from .models import EventSignup, UserProfile
+        output = self._import()
+        self.assertIn("rows/s", output)
+        self.assertEqual(User.objects.count(), 5)
+        # Profiles are created explicitly, exactly one per user.
+        self.assertEqual(UserProfile.objects.count(), 5)
+        self.assertFalse(User.objects.get(username="user1").has_usable_password())
+        event = Event.objects.get(drupal_nid=2)
+        self.assertEqual(event.category, "hiking")
+        self.assertEqual(event.trip_capacity, 12)
+        self.assertEqual(event.approval_status, "approved")
+        self.assertEqual(event.created_by.profile.drupal_uid, 3)
+        self.assertEqual(EventSignup.objects.count(), 12)
+        self.assertEqual(EventSignup.objects.get(drupal_id=1).event.drupal_nid, 2)
+
+    def test_rerun_is_idempotent(self) -> None:
+        from .models import EventSignup
+        self._import()
+        self._import("--restart")
+        self.assertEqual(Event.objects.count(), 4)
+        self.assertEqual(EventSignup.objects.count(), 12)
+
+    def test_resumes_from_checkpoint(self) -> None:
+        from .models import EventSignup, ImportCheckpoint
+        self._import()
+        checkpoint = ImportCheckpoint.objects.get(source="drupal:registrations:registrations.jsonl")
+        self.assertEqual(checkpoint.rows_done, 12)
+        # Pretend the run died after the first batch of registrations.
+        EventSignup.objects.filter(drupal_id__gt=3).delete()
+        checkpoint.rows_done = 3
+        checkpoint.save()
+        output = self._import()
+        self.assertIn("registrations: read 9 rows", output)
+        self.assertEqual(EventSignup.objects.count(), 12)
+
+    def test_batches_commit_independently(self) -> None:
+        from unittest import mock
+        from .models import ImportCheckpoint
+        from .management.commands.import_drupal import Command
+        real = Command.import_registrations
+        calls = []
+
+        def flaky(command, batch):
+            calls.append(batch)
+            if len(calls) == 2:
+                raise RuntimeError("worker killed")
+            return real(command, batch)
+
+        with mock.patch.object(Command, "import_registrations", flaky):
+            with self.assertRaises(RuntimeError):
+                self._import()
+        # Users, events and the first registration batch were kept.
+        self.assertEqual(Event.objects.count(), 4)
+        checkpoint = ImportCheckpoint.objects.get(source="drupal:registrations:registrations.jsonl")
+        self.assertEqual(checkpoint.rows_done, 3)
+
+    def test_created_counts_skip_conflicts(self) -> None:
+        from .models import EventSignup
+        self._import()
+        EventSignup.objects.filter(drupal_id__gt=9).delete()
+        output = self._import("--restart")
+        self.assertIn("registrations: read 12 rows, created 3 ", output)
+        self.assertIn("users: read 5 rows, created 0 ", output)
+
+    def test_taken_usernames_and_slugs_get_suffixes(self) -> None:
+        from datetime import datetime
+        from django.contrib.auth.models import User
+        # Squatters on the first and the fallback name, and on the slug.
+        User.objects.create_user(username="user1", email="squatter@example.com")
+        User.objects.create_user(username="user1-d1", email="squatter@example.com")
+        squatter = Event.objects.create(
+            title="Squatter", slug="weekend-walk-2-2", description="x", trip_location="x",
+            start_datetime=datetime(2025, 1, 1), end_datetime=datetime(2025, 1, 1),
+        )
+        self._import()
+        self.assertEqual(User.objects.get(profile__drupal_uid=1).username, "user1-d1-2")
+        self.assertEqual(Event.objects.get(drupal_nid=2).slug, "weekend-walk-2-2-2")
+        self.assertEqual(Event.objects.get(drupal_nid=3).slug, "weekend-walk-3-3")
+        self.assertEqual(Event.objects.get(pk=squatter.pk).slug, "weekend-walk-2-2")
+
+    def test_dry_run_rolls_back(self) -> None:
+        from django.contrib.auth.models import User
+        from .models import ImportCheckpoint
+        output = self._import("--dry-run")
+        self.assertIn("Dry run", output)
+        self.assertEqual(User.objects.count(), 0)
+        self.assertEqual(Event.objects.count(), 0)
+        self.assertEqual(ImportCheckpoint.objects.count(), 0)
+
+
+@benchmark
+class ImportDrupalBenchmark(TestCase):
+    def test_million_row_import(self) -> None:
+        import tempfile
+        import tracemalloc
+        from io import StringIO
+        from django.core.management import call_command
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = write_drupal_export(tmp, users=50_000, nodes=150_000, registrations=800_000)
+            tracemalloc.start()
+            started = time.perf_counter()
+            out = StringIO()
+            call_command(
+                "import_drupal",
+                "--users", str(paths["users"]),
+                "--nodes", str(paths["nodes"]),
+                "--registrations", str(paths["registrations"]),
+                stdout=out,
+            )
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        print(f"\n{out.getvalue()}1M rows in {elapsed:.1f}s ({1_000_000 / elapsed:.0f} rows/s), "
+              f"peak {peak / 1e6:.1f} MB")
+
+
+@override_settings(THROTTLE_RATES={
+    "event-signup": {"user": "3/min", "ip": "5/min", "event": "1000/min"},
+    "signup": {"ip": "2/hour"},
+})
+class ThrottleTests(TestCase):
+    """Tests for token-bucket throttling of signup POSTs."""
+
+    def setUp(self) -> None:
+        from datetime import datetime
+        from django.core.cache import cache
+        cache.clear()
+        self.event = Event.objects.create(
+            title="Ski trip release",
+            slug="ski-trip-release",
+            description="Popular trip.",
+            start_datetime=datetime.now(),
+            end_datetime=datetime.now(),
+            trip_location="Perisher",
+        )
+        self.url = reverse("event-signup", kwargs={"slug": self.event.slug})
+
+    def _client_for(self, username: str, ip: str):
+        from django.contrib.auth.models import User
+        from django.test import Client
+        client = Client(REMOTE_ADDR=ip)
+        client.force_login(User.objects.create_user(username=username, email=f"{username}@example.com"))
+        return client
+
+    def _signup(self, client, email: str):
+        return client.post(self.url, {"full_name": "Someone", "email": email})
+
+    def test_rejects_with_retry_after_once_bucket_is_empty(self) -> None:
+        client = self._client_for("eager", "10.0.0.1")
+        statuses = [self._signup(client, f"eager{i}@example.com").status_code for i in range(4)]
+        self.assertEqual(statuses, [302, 302, 302, 429])
+        response = self._signup(client, "eager9@example.com")
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response["Retry-After"]), 1)
+
+    def test_bucket_refills_continuously(self) -> None:
+        from .throttling import Rate, TokenBucket
+        bucket = TokenBucket("unit", Rate.parse("4/min"))
+        start = 600.0  # the start of a refill window
+        self.assertEqual([bucket.take(start)[0] for _ in range(5)], [True] * 4 + [False])
+        # Half-way through the next window half of the old tokens are back.
+        self.assertEqual([bucket.take(start + 90)[0] for _ in range(3)], [True, True, False])
+
+    def test_get_requests_are_not_throttled(self) -> None:
+        client = self._client_for("browser", "10.0.0.2")
+        for _ in range(10):
+            self.assertEqual(client.get(self.url).status_code, 200)
+
+    def test_registration_throttled_per_ip_before_hashing(self) -> None:
+        from unittest import mock
+        from django.test import Client
+        client = Client(REMOTE_ADDR="10.0.0.3")
+        client.post(reverse("signup"), {})
+        client.post(reverse("signup"), {})
+        with mock.patch("main.forms.UserRegistrationForm.save") as save:
+            response = client.post(reverse("signup"), {})
+        self.assertEqual(response.status_code, 429)
+        save.assert_not_called()
+
+    def test_client_ip_behind_trusted_proxies(self) -> None:
+        from django.test import RequestFactory
+        from .throttling import client_ip
+        request = RequestFactory().post("/", REMOTE_ADDR="127.0.0.1", HTTP_X_FORWARDED_FOR="6.6.6.6, 198.51.100.7")
+        self.assertEqual(client_ip(request), "127.0.0.1")
+        with self.settings(THROTTLE_TRUSTED_PROXIES=1):
+            # The client can forge the left of the header, not the right.
+            self.assertEqual(client_ip(request), "198.51.100.7")
+            self.assertEqual(client_ip(RequestFactory().post("/", REMOTE_ADDR="127.0.0.1")), "127.0.0.1")
+        with self.settings(THROTTLE_TRUSTED_PROXIES=2):
+            self.assertEqual(client_ip(request), "6.6.6.6")
+        with self.settings(THROTTLE_TRUSTED_PROXIES=1, THROTTLE_PROXY_HEADER="HTTP_X_REAL_IP"):
+            request.META["HTTP_X_REAL_IP"] = "192.0.2.1"
+            self.assertEqual(client_ip(request), "192.0.2.1")
+
+    @override_settings(THROTTLE_TRUSTED_PROXIES=1)
+    def test_visitors_behind_proxy_get_own_buckets(self) -> None:
+        from django.test import Client
+        for i in range(5):
+            client = Client(REMOTE_ADDR="127.0.0.1", HTTP_X_FORWARDED_FOR=f"10.2.0.{i}")
+            client.post(reverse("signup"), {})
+            self.assertNotEqual(client.post(reverse("signup"), {}).status_code, 429)
+
+    def test_legitimate_signups_flow_during_flood(self) -> None:
+        from .models import EventSignup
+        attacker = self._client_for("bot", "203.0.113.9")
+        members = [self._client_for(f"member{i}", f"10.1.0.{i}") for i in range(20)]
+        flood = {302: 0, 429: 0}
+        legit = []
+        for i in range(200):
+            flood[self._signup(attacker, f"bot{i}@example.com").status_code] += 1
+            if i % 10 == 0:
+                member = members[i // 10]
+                legit.append(self._signup(member, f"member{i // 10}@example.com").status_code)
+        for i, member in enumerate(members[len(legit):], start=len(legit)):
+            legit.append(self._signup(member, f"member{i}@example.com").status_code)
+        self.assertEqual(legit, [302] * 20)
+        self.assertLessEqual(flood[302], 6)
+        self.assertGreaterEqual(flood[429], 194)
+        self.assertEqual(EventSignup.objects.filter(email__startswith="member").count(), 20)
+
+
+class EventPageCachingTests(TestCase):
+    """The public event page is shareable; member details stay private."""
+
+    def setUp(self) -> None:
+        from datetime import datetime
+        from django.contrib.auth.models import User
+        self.leader = User.objects.create_user(username="leader", email="leader@example.com")
+        self.member = User.objects.create_user(username="member", email="member@example.com")
+        self.event = Event.objects.create(
+            title="Snake Rock climb",
+            slug="snake-rock-climb",
+            description="Top roping.",
+            start_datetime=datetime.now(),
+            end_datetime=datetime.now(),
+            trip_location="Snake Rock",
+            contact_details="Call Jane on 0400 000 000",
+            created_by=self.leader,
+        )
+        self.event.signups.create(full_name="Alice Example", email="alice@example.com")
+        self.fragment_url = reverse("event-member-fragment", kwargs={"slug": self.event.slug})
+
+    def test_public_page_is_shared_cacheable(self) -> None:
+        self.client.force_login(self.member)
+        response = self.client.get(self.event.get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("public", response["Cache-Control"])
+        self.assertIn("ETag", response)
+        self.assertNotIn("Cookie", response.get("Vary", ""))
+        self.assertNotContains(response, "0400 000 000")
+        self.assertNotContains(response, "Alice Example")
+        self.assertContains(response, self.fragment_url)
+
+    def test_unchanged_page_revalidates_without_rendering(self) -> None:
+        response = self.client.get(self.event.get_absolute_url())
+        with self.assertNumQueries(1):
+            cached = self.client.get(self.event.get_absolute_url(), HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(cached.status_code, 304)
+        self.event.title = "Snake Rock climb (moved)"
+        self.event.save()
+        fresh = self.client.get(self.event.get_absolute_url(), HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(fresh.status_code, 200)
+
+    def test_fragment_empty_for_anonymous(self) -> None:
+        with self.assertNumQueries(0):
+            response = self.client.get(self.fragment_url)
+        self.assertEqual(response.status_code, 204)
+
+    def test_fragment_shows_contact_details_to_members(self) -> None:
+        self.client.force_login(self.member)
+        response = self.client.get(self.fragment_url)
+        self.assertContains(response, "0400 000 000")
+        self.assertNotContains(response, "Alice Example")
+        self.assertIn("private", response["Cache-Control"])
+
+    def test_fragment_shows_roster_to_leader(self) -> None:
+        self.client.force_login(self.leader)
+        response = self.client.get(self.fragment_url)
+        self.assertContains(response, "Alice Example (alice@example.com)")
+
+
+@override_settings(THROTTLE_RATES={})
+class IdempotentSignupTests(TestCase):
+    """Retried or duplicate sign-up submissions never error."""
+
+    def setUp(self) -> None:
+        from datetime import datetime
+        from django.contrib.auth.models import User
+        from django.core.cache import cache
+        cache.clear()
+        self.event = Event.objects.create(
+            title="Sunday arvo kayak",
+            slug="sunday-arvo-kayak",
+            description="Paddle.",
+            start_datetime=datetime.now(),
+            end_datetime=datetime.now(),
+            trip_location="Lake Burley Griffin",
+        )
+        self.user = User.objects.create_user(username="paddler", email="paddler@example.com")
+        self.client.force_login(self.user)
+        self.url = reverse("event-signup", kwargs={"slug": self.event.slug})
+
+    def test_form_renders_idempotency_key(self) -> None:
+        response = self.client.get(self.url)
+        self.assertContains(response, 'name="idempotency_key"')
+
+    def test_retry_with_same_key_is_answered_from_cache(self) -> None:
+        import uuid
+        data = {"full_name": "Pat Paddler", "email": "pat@example.com", "idempotency_key": str(uuid.uuid4())}
+        first = self.client.post(self.url, data)
+        # Retries only pay for the session/user lookup, not the sign-up.
+        with self.assertNumQueries(2):
+            retry = self.client.post(self.url, data)
+        self.assertEqual(retry.status_code, 302)
+        self.assertEqual(retry["Location"], first["Location"])
+        self.assertEqual(self.event.signups.count(), 1)
+
+    def test_retries_missing_the_cache_take_one_place(self) -> None:
+        import uuid
+        from django.core.cache import cache
+        data = {"full_name": "Pat Paddler", "email": "pat@example.com", "idempotency_key": str(uuid.uuid4())}
+        for _ in range(3):
+            # As if each retry reached a worker with its own cache.
+            cache.clear()
+            self.assertEqual(self.client.post(self.url, data).status_code, 302)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participant_count, 1)
+
+    def test_duplicate_email_with_new_key_returns_existing(self) -> None:
+        from .models import EventSignup
+        data = {"full_name": "Pat Paddler", "email": "pat@example.com"}
+        self.assertEqual(self.client.post(self.url, data).status_code, 302)
+        self.assertEqual(self.client.post(self.url, data).status_code, 302)
+        self.assertEqual(self.event.signups.count(), 1)
+        signup, created = EventSignup.objects.insert_or_get(
+            EventSignup(event=self.event, full_name="Pat", email="pat@example.com")
+        )
+        self.assertFalse(created)
+        self.assertEqual(signup.full_name, "Pat Paddler")
+
+
+@override_settings(THROTTLE_RATES={})
+class ConcurrentSignupTests(TransactionTestCase):
+    """The same user submitting 20 times in parallel gets one sign-up."""
+
+    def test_parallel_submissions(self) -> None:
+        import threading
+        import uuid
+        from datetime import datetime
+        from django.contrib.auth.models import User
+        from django.db import connection
+        from django.test import Client
+        event = Event.objects.create(
+            title="Ski trip", slug="ski-trip", description="Snow.",
+            start_datetime=datetime.now(), end_datetime=datetime.now(), trip_location="Perisher",
+        )
+        user = User.objects.create_user(username="skier", email="skier@example.com")
+        url = reverse("event-signup", kwargs={"slug": event.slug})
+        data = {"full_name": "Sam Skier", "email": "sam@example.com", "idempotency_key": str(uuid.uuid4())}
+        barrier = threading.Barrier(20, timeout=30)
+        statuses: list[int] = []
+
+        def submit(client) -> None:
+            barrier.wait()
+            try:
+                statuses.append(client.post(url, data).status_code)
+            finally:
+                connection.close()
+
+        clients = []
+        for _ in range(20):
+            client = Client()
+            client.force_login(user)
+            clients.append(client)
+        threads = [threading.Thread(target=submit, args=(client,)) for client in clients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(statuses, [302] * 20)
+        self.assertEqual(event.signups.count(), 1)
+        event.refresh_from_db()
+        self.assertEqual(event.participant_count, 1)
+
+
+class DashboardTests(TestCase):
+    """Tests for the leader dashboard and participants' sign-up list."""
+
+    def setUp(self) -> None:
+        from django.contrib.auth.models import User
+        self.leader = User.objects.create_user(username="leader", email="leader@example.com")
+        self.participant = User.objects.create_user(username="walker", email="walker@example.com")
+
+    def _trip(self, n: int, **kwargs) -> Event:
+        from datetime import datetime
+        return Event.objects.create(
+            title=f"Trip {n}", slug=f"trip-{n}", description="Walk.",
+            start_datetime=datetime(2025, 10, 1) + timedelta(days=n),
+            end_datetime=datetime(2025, 10, 1) + timedelta(days=n),
+            trip_location="Namadgi", created_by=self.leader, **kwargs,
+        )
+
+    def _fill(self, event: Event, count: int) -> None:
+        from .models import EventSignup
+        EventSignup.objects.bulk_create(
+            EventSignup(event=event, full_name=f"P{i}", email=f"p{i}@example.com") for i in range(count)
+        )
+        if event.registration_method == "fcfs":
+            Event.objects.filter(pk=event.pk).adjust_participant_count(count)
+
+    def test_dashboard_counts(self) -> None:
+        fcfs = self._trip(1, trip_capacity=10)
+        picky = self._trip(2, registration_method="picky")
+        self._fill(fcfs, 3)
+        self._fill(picky, 4)
+        self.client.force_login(self.leader)
+        response = self.client.get(reverse("my-trips"))
+        events = {e.pk: e for e in response.context["events"]}
+        self.assertEqual((events[fcfs.pk].signup_count, events[fcfs.pk].spots_remaining), (3, 7))
+        self.assertEqual(events[fcfs.pk].pending_count, 0)
+        self.assertIsNone(events[picky.pk].spots_remaining)
+        self.assertEqual(events[picky.pk].pending_count, 4)
+        self.assertContains(response, "Unlimited")
+
+    def test_dashboard_query_count_is_constant(self) -> None:
+        self.client.force_login(self.leader)
+        self._trip(0)
+        with CaptureQueriesContext(connection) as one_trip:
+            self.client.get(reverse("my-trips"))
+        for n in range(1, 25):
+            self._fill(self._trip(n, trip_capacity=20), n % 5)
+        with CaptureQueriesContext(connection) as many_trips:
+            response = self.client.get(reverse("my-trips"))
+        self.assertEqual(len(response.context["events"]), 25)
+        self.assertEqual(len(one_trip.captured_queries), len(many_trips.captured_queries))
+
+    def test_my_signups_lists_participants_trips(self) -> None:
+        from .models import EventSignup
+        trips = [self._trip(n) for n in range(5)]
+        for trip in trips[:3]:
+            EventSignup.objects.create(event=trip, full_name="Walker", email="walker@example.com", user=self.participant)
+        self.client.force_login(self.participant)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("my-signups"))
+        self.assertEqual([s.event.title for s in response.context["signups"]], ["Trip 0", "Trip 1", "Trip 2"])
+        self.assertContains(response, "Trip 2")
+        # session + user + one joined query for the sign-ups
+        self.assertEqual(len(ctx.captured_queries), 3)
+
+    def test_requires_login(self) -> None:
+        self.assertEqual(self.client.get(reverse("my-trips")).status_code, 302)
+
+
+class SignupSelectionTests(TestCase):
+    """Tests for bulk accept/reject on "Trip Leader Picks" trips."""
+
+    def setUp(self) -> None:
+        from datetime import datetime
+        from django.contrib.auth.models import User
+        from .models import EventSignup
+        self.leader = User.objects.create_user(username="leader", email="leader@example.com")
+        self.event = Event.objects.create(
+            title="Ski tour", slug="ski-tour", description="Backcountry.",
+            start_datetime=datetime.now(), end_datetime=datetime.now(), trip_location="Main Range",
+            registration_method="picky", trip_capacity=40, created_by=self.leader,
+        )
+        EventSignup.objects.bulk_create(
+            EventSignup(event=self.event, full_name=f"Skier {i}", email=f"skier{i}@example.com") for i in range(50)
+        )
+        self.ids = list(self.event.signups.values_list("pk", flat=True))
+        self.url = reverse("event-selection", kwargs={"slug": self.event.slug})
+
+    def test_accept_and_reject_adjust_capacity(self) -> None:
+        from .models import Notification
+        from .selection import set_selection
+        self.assertEqual(set_selection(self.event, self.ids[:30], "accepted"), 30)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.spots_left, 10)
+        # Rejecting accepted participants gives their places back.
+        set_selection(self.event, self.ids[:5], "rejected")
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.spots_left, 15)
+        self.assertEqual(self.event.signups.filter(selection_status="accepted").count(), 25)
+        self.assertEqual(Notification.objects.filter(kind="selection_accepted").count(), 30)
+        self.assertEqual(Notification.objects.filter(kind="selection_rejected").count(), 5)
+
+    def test_over_capacity_is_rejected_atomically(self) -> None:
+        from django.core.exceptions import ValidationError
+        from .selection import set_selection
+        with self.assertRaises(ValidationError):
+            set_selection(self.event, self.ids[:41], "accepted")
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.spots_left, 40)
+        self.assertFalse(self.event.signups.filter(selection_status="accepted").exists())
+
+    def test_leader_bulk_action_view(self) -> None:
+        self.client.force_login(self.leader)
+        self.assertContains(self.client.get(self.url), "Skier 49")
+        response = self.client.post(self.url, {"action": "accepted", "signups": self.ids[:10]})
+        self.assertRedirects(response, self.url)
+        self.assertEqual(self.event.signups.filter(selection_status="accepted").count(), 10)
+        response = self.client.post(self.url, {"action": "accepted", "signups": self.ids[10:]})
+        self.assertContains(response, "Only 30 places are left")
+
+    def test_other_members_cannot_select(self) -> None:
+        from django.contrib.auth.models import User
+        self.client.force_login(User.objects.create_user(username="nosy"))
+        self.assertEqual(self.client.post(self.url, {"action": "accepted", "signups": self.ids}).status_code, 403)
+
+    def test_query_count_independent_of_selection_size(self) -> None:
+        from .selection import set_selection
+        with CaptureQueriesContext(connection) as few:
+            set_selection(self.event, self.ids[:2], "accepted")
+        with CaptureQueriesContext(connection) as many:
+            set_selection(self.event, self.ids[2:40], "accepted")
+        self.assertEqual(len(few.captured_queries), len(many.captured_queries))
+
+
+@benchmark
+class SignupSelectionBenchmark(TestCase):
+    def test_500_signup_event(self) -> None:
+        from datetime import datetime
+        from .models import EventSignup
+        from .selection import set_selection
+        event = Event.objects.create(
+            title="Big trip", slug="big-trip", description="x", start_datetime=datetime.now(),
+            end_datetime=datetime.now(), trip_location="x", registration_method="picky",
+            trip_capacity=500,
+        )
+        EventSignup.objects.bulk_create(
+            EventSignup(event=event, full_name=f"P{i}", email=f"p{i}@example.com") for i in range(500)
+        )
+        ids = list(event.signups.values_list("pk", flat=True))
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            set_selection(event, ids[:400], "accepted")
+            set_selection(event, ids[400:], "rejected")
+            elapsed = time.perf_counter() - started
+        print(f"\n500 sign-ups decided in {elapsed * 1000:.1f} ms with {len(ctx.captured_queries)} queries")
+
+
+class CapacityCounterTests(TestCase):
+    """The participant counter follows sign-ups and can be reconciled."""
+
+    def setUp(self) -> None:
+        from datetime import datetime
+        from django.contrib.auth.models import User
+        from django.core.cache import cache
+        cache.clear()
+        self.event = Event.objects.create(
+            title="Kayak", slug="kayak", description="Paddle.", start_datetime=datetime.now(),
+            end_datetime=datetime.now(), trip_location="Lake", trip_capacity=2,
+        )
+        self.user = User.objects.create_user(username="paddler", email="paddler@example.com")
+        self.url = reverse("event-signup", kwargs={"slug": self.event.slug})
+
+    @override_settings(THROTTLE_RATES={})
+    def test_signup_and_delete_maintain_counter(self) -> None:
+        self.client.force_login(self.user)
+        self.client.post(self.url, {"full_name": "A", "email": "a@example.com"})
+        self.client.post(self.url, {"full_name": "A", "email": "a@example.com"})  # duplicate
+        self.client.post(self.url, {"full_name": "B", "email": "b@example.com"})
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participant_count, 2)
+        self.assertTrue(self.event.is_full)
+        self.assertNotContains(self.client.get(self.event.get_absolute_url()), "Sign up</a>")
+        self.event.signups.get(email="a@example.com").delete()
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.participant_count, self.event.spots_left), (1, 1))
+
+    @override_settings(THROTTLE_RATES={})
+    def test_full_trip_refuses_signups(self) -> None:
+        Event.objects.filter(pk=self.event.pk).update(participant_count=2)
+        self.client.force_login(self.user)
+        response = self.client.post(self.url, {"full_name": "C", "email": "c@example.com"})
+        self.assertContains(response, "Sorry, this trip is full.")
+        self.assertFalse(self.event.signups.exists())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participant_count, 2)
+
+    def test_is_full_reads_counter_without_queries(self) -> None:
+        event = Event.objects.get(pk=self.event.pk)
+        with self.assertNumQueries(0):
+            self.assertFalse(event.is_full)
+            self.assertEqual(event.spots_left, 2)
+
+    def test_reconcile_fixes_drift_in_bulk(self) -> None:
+        from datetime import datetime
+        from io import StringIO
+        from django.core.management import call_command
+        from .models import EventSignup
+        picky = Event.objects.create(
+            title="Ski", slug="ski", description="Snow.", start_datetime=datetime.now(),
+            end_datetime=datetime.now(), trip_location="Perisher", registration_method="picky",
+            participant_count=7,
+        )
+        EventSignup.objects.bulk_create([
+            EventSignup(event=self.event, full_name="A", email="a@example.com"),
+            EventSignup(event=picky, full_name="B", email="b@example.com", selection_status="accepted"),
+            EventSignup(event=picky, full_name="C", email="c@example.com"),
+        ])
+        out = StringIO()
+        call_command("reconcile_capacity", "--dry-run", stdout=out)
+        self.assertIn("Found 2 drifted events (total drift 7)", out.getvalue())
+        with CaptureQueriesContext(connection) as ctx:
+            call_command("reconcile_capacity", stdout=StringIO())
+        # one aggregate, then per batch: lock, recount and one bulk UPDATE
+        # (inside a savepoint)
+        self.assertLessEqual(len(ctx.captured_queries), 6)
+        counts = dict(Event.objects.values_list("slug", "participant_count"))
+        self.assertEqual(counts, {"kayak": 1, "ski": 1})
+        out = StringIO()
+        call_command("reconcile_capacity", stdout=out)
+        self.assertIn("Corrected 0 drifted events", out.getvalue())
+
+    def test_reconcile_keeps_legacy_places(self) -> None:
+        from io import StringIO
+        from django.core.management import call_command
+        from .models import EventSignup
+        # A legacy trip full with two places taken and one sign-up row.
+        Event.objects.filter(pk=self.event.pk).update(legacy_participants=1, participant_count=2)
+        EventSignup.objects.create(event=self.event, full_name="A", email="a@example.com")
+        out = StringIO()
+        call_command("reconcile_capacity", stdout=out)
+        self.assertIn("Corrected 0 drifted events", out.getvalue())
+        self.event.refresh_from_db()
+        self.assertTrue(self.event.is_full)
+
+    def test_reconcile_recounts_after_locking(self) -> None:
+        from unittest import mock
+        from .management.commands import reconcile_capacity as command
+        from .models import EventSignup
+        EventSignup.objects.create(event=self.event, full_name="A", email="a@example.com")
+        Event.objects.filter(pk=self.event.pk).update(participant_count=0)
+        real = command._drifted
+        calls = []
+
+        def racing(events):
+            calls.append(events)
+            if len(calls) == 2:
+                # A sign-up commits between the scan and the correction.
+                EventSignup.objects.create(event=self.event, full_name="B", email="b@example.com")
+                Event.objects.filter(pk=self.event.pk).adjust_participant_count(1)
+            return real(events)
+
+        with mock.patch.object(command, "_drifted", racing):
+            fixed = command.reconcile_capacity()
+        self.assertEqual([actual for _, _, _, actual in fixed], [2])
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participant_count, 2)
+
+
+class ArchiveTests(TestCase):
+    """Finished trips move to the archive, stay readable and can come back."""
+
+    def setUp(self) -> None:
+        from datetime import datetime
+        from .models import EventSignup
+        now = datetime.now()
+        self.old = Event.objects.create(
+            title="Old trip", slug="old-trip", description="Long ago.",
+            start_datetime=now - timedelta(days=400), end_datetime=now - timedelta(days=399),
+            trip_location="Namadgi", trip_capacity=5,
+        )
+        self.recent = Event.objects.create(
+            title="Recent trip", slug="recent-trip", description="Last week.",
+            start_datetime=now - timedelta(days=8), end_datetime=now - timedelta(days=7),
+            trip_location="Namadgi",
+        )
+        EventSignup.objects.create(event=self.old, full_name="A", email="a@example.com")
+        EventSignup.objects.create(event=self.old, full_name="B", email="b@example.com")
+        Event.objects.filter(pk=self.old.pk).adjust_participant_count(2)
+
+    def _archive(self, *args: str) -> str:
+        from io import StringIO
+        from django.core.management import call_command
+        out = StringIO()
+        call_command("archive_events", "--months", "6", *args, stdout=out)
+        return out.getvalue()
+
+    def test_archive_moves_old_events_and_signups(self) -> None:
+        from .models import ArchivedEvent, ArchivedEventSignup, EventSignup
+        self.assertIn("Would archive 1 events", self._archive("--dry-run"))
+        self.assertTrue(Event.objects.filter(pk=self.old.pk).exists())
+        self.assertIn("Archived 1 events", self._archive("--batch-size", "1"))
+        self.assertEqual(list(Event.objects.values_list("slug", flat=True)), ["recent-trip"])
+        self.assertFalse(EventSignup.objects.exists())
+        archived = ArchivedEvent.objects.get(slug="old-trip")
+        self.assertEqual(archived.original_id, self.old.pk)
+        self.assertEqual(ArchivedEventSignup.objects.filter(event=archived).count(), 2)
+
+    def test_archived_page_is_served_read_only(self) -> None:
+        self._archive()
+        response = self.client.get(reverse("event-detail", kwargs={"slug": "old-trip"}))
+        self.assertContains(response, "Old trip")
+        self.assertContains(response, "archived")
+        self.assertNotContains(response, "Sign up</a>")
+        self.assertNotContains(response, "member-details\"")
+        self.assertTrue(response.has_header("ETag"))
+        missing = self.client.get(reverse("event-detail", kwargs={"slug": "no-such-trip"}))
+        self.assertEqual(missing.status_code, 404)
+
+    def test_archived_slugs_are_not_reused(self) -> None:
+        from .slugs import allocate_slug
+        self._archive()
+        self.assertEqual(allocate_slug(Event, "Old trip"), "old-trip-2")
+
+    def test_restore_brings_event_back(self) -> None:
+        from io import StringIO
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+        from .models import ArchivedEvent
+        self._archive()
+        call_command("restore_events", "old-trip", stdout=StringIO())
+        event = Event.objects.get(slug="old-trip")
+        self.assertEqual((event.pk, event.participant_count), (self.old.pk, 2))
+        self.assertEqual(
+            sorted(event.signups.values_list("email", flat=True)), ["a@example.com", "b@example.com"]
+        )
+        self.assertFalse(ArchivedEvent.objects.exists())
+        with self.assertRaises(CommandError):
+            call_command("restore_events", "old-trip", stdout=StringIO())
+
+    def test_restore_survives_removed_fields_and_deleted_users(self) -> None:
+        import json
+        from django.contrib.auth.models import User
+        from .archive import restore_event
+        from .models import ArchivedEvent, EventSignup
+        leaver = User.objects.create_user(username="leaver", email="leaver@example.com")
+        Event.objects.filter(pk=self.old.pk).update(created_by=leaver)
+        EventSignup.objects.filter(event=self.old, email="a@example.com").update(user=leaver)
+        self._archive()
+        leaver.delete()
+        archived = ArchivedEvent.objects.get(slug="old-trip")
+        # An archive taken while Event still had a since-removed column.
+        data = json.loads(archived.data)
+        data[0]["fields"]["spots_total"] = 12
+        archived.data = json.dumps(data)
+        archived.save()
+        event = restore_event("old-trip")
+        self.assertIsNone(event.created_by_id)
+        self.assertEqual(list(event.signups.values_list("user_id", flat=True)), [None, None])
+
+    def test_archiving_keeps_other_counters(self) -> None:
+        from .models import EventSignup
+        EventSignup.objects.create(event=self.recent, full_name="C", email="c@example.com")
+        Event.objects.filter(pk=self.recent.pk).adjust_participant_count(1)
+        self._archive()
+        self.recent.refresh_from_db()
+        self.assertEqual(self.recent.participant_count, 1)
+
+    def test_revision_history_is_archived_and_restored(self) -> None:
+        from datetime import datetime
+        from .archive import restore_event
+        from .models import ArchivedEventRevision, EventRevision
+        from .revisions import reconstruct
+        self.old.title = "Old trip, renamed"
+        self.old.save()
+        EventRevision.objects.filter(event=self.old).update(created_at=datetime(2024, 1, 1))
+        self._archive()
+        self.assertFalse(EventRevision.objects.filter(event_id=self.old.pk).exists())
+        self.assertEqual(ArchivedEventRevision.objects.count(), 2)
+        event = restore_event("old-trip")
+        self.assertEqual(list(event.revisions.values_list("number", "created_at")), [
+            (1, datetime(2024, 1, 1)), (2, datetime(2024, 1, 1)),
+        ])
+        self.assertEqual(reconstruct(event, 1).title, "Old trip")
+        self.assertFalse(ArchivedEventRevision.objects.exists())
+
+
+@benchmark
+class ArchiveBenchmark(TestCase):
+    """Hot views before and after archiving a large history of trips."""
+
+    def test_hot_views_before_and_after(self) -> None:
+        from datetime import datetime
+        from io import StringIO
+        from django.contrib.auth.models import User
+        from django.core.management import call_command
+        from .models import EventSignup
+        leader = User.objects.create_user(username="leader", email="leader@example.com")
+        now = datetime.now()
+        events = [
+            Event(
+                title=f"Trip {i}", slug=f"trip-{i}", description="Walk.", trip_location="Namadgi",
+                start_datetime=now + timedelta(days=i - 9800), end_datetime=now + timedelta(days=i - 9800),
+                created_by=leader,
+            )
+            for i in range(10000)
+        ]
+        Event.objects.bulk_create(events, batch_size=1000)
+        EventSignup.objects.bulk_create(
+            (
+                EventSignup(event_id=pk, full_name=f"P{j}", email=f"p{j}@example.com")
+                for pk in Event.objects.values_list("pk", flat=True)
+                for j in range(5)
+            ),
+            batch_size=2000,
+        )
+        self.client.force_login(leader)
+        urls = [reverse("home"), reverse("event-detail", kwargs={"slug": "trip-9900"}), reverse("my-trips")]
+
+        def measure() -> list[float]:
+            timings = []
+            for url in urls:
+                started = time.perf_counter()
+                for _ in range(5):
+                    self.client.get(url)
+                timings.append((time.perf_counter() - started) / 5 * 1000)
+            return timings
+
+        before = measure()
+        started = time.perf_counter()
+        call_command("archive_events", "--months", "6", stdout=StringIO())
+        archived_in = time.perf_counter() - started
+        after = measure()
+        print(f"\nArchived {10000 - Event.objects.count()} of 10000 events in {archived_in:.1f}s")
+        for url, b, a in zip(urls, before, after):
+            print(f"  {url}: {b:.1f} ms -> {a:.1f} ms")
+
+
+class EventRevisionTests(TestCase):
+    """Edits are recorded as compact diffs and any version can be rebuilt."""
+
+    def setUp(self) -> None:
+        from datetime import datetime
+        self.paragraphs = [f"Paragraph {i}: a long walk with plenty of hills and views.\n" for i in range(40)]
+        self.event = Event.objects.create(
+            title="Gibraltar Peak", slug="gibraltar-peak", description="".join(self.paragraphs),
+            start_datetime=datetime(2025, 10, 4, 8), end_datetime=datetime(2025, 10, 4, 16),
+            trip_location="Namadgi", trip_capacity=10,
+        )
+
+    def _edit(self, n: int) -> None:
+        self.paragraphs[n % 40] = f"Paragraph {n % 40}: edited in revision {n}.\n"
+        self.event.description = "".join(self.paragraphs)
+        self.event.trip_capacity = 10 + n
+        self.event.comment = f"Edit {n}"
+        self.event.save()
+
+    def test_every_version_can_be_reconstructed(self) -> None:
+        from .revisions import reconstruct
+        versions = {1: (self.event.description, 10)}
+        for n in range(2, 46):
+            self._edit(n)
+            versions[n] = (self.event.description, self.event.trip_capacity)
+        for number, (description, capacity) in versions.items():
+            with self.assertNumQueries(1):
+                version = reconstruct(self.event, number)
+            self.assertEqual((version.description, version.trip_capacity), (description, capacity))
+            self.assertEqual(version.title, "Gibraltar Peak")
+        self.assertEqual(reconstruct(self.event, 7).comment, "Edit 7")
+
+    def test_revisions_store_compact_diffs(self) -> None:
+        from .revisions import SNAPSHOT_INTERVAL, unpack
+        for n in range(2, 2 * SNAPSHOT_INTERVAL + 2):
+            self._edit(n)
+        revisions = list(self.event.revisions.all())
+        self.assertEqual(
+            [r.number for r in revisions if r.is_snapshot], [1, SNAPSHOT_INTERVAL + 1, 2 * SNAPSHOT_INTERVAL + 1]
+        )
+        payload = unpack(revisions[1].payload)
+        self.assertEqual(set(payload["f"]), {"trip_capacity"})
+        self.assertEqual(set(payload["d"]), {"description"})
+        self.assertLess(len(revisions[1].payload), len(self.event.description) // 4)
+
+    def test_save_without_changes_records_nothing(self) -> None:
+        from .revisions import reconstruct
+        from .models import EventRevision
+        self.event.save()
+        self.assertEqual(self.event.revisions.count(), 1)
+        with self.assertRaises(EventRevision.DoesNotExist):
+            reconstruct(self.event, 2)
+
+    def test_concurrent_save_takes_the_next_number(self) -> None:
+        from unittest import mock
+        from . import revisions
+        stale = revisions._chain(self.event.pk)
+        # Another save records revision 2 after this one read the history.
+        self._edit(2)
+        self.event.trip_capacity = 99
+        with mock.patch.object(revisions, "_chain", side_effect=[stale, revisions._chain(self.event.pk)]):
+            revision = revisions.record_revision(self.event)
+        self.assertEqual(revision.number, 3)
+        self.assertEqual(revisions.reconstruct(self.event, 3).trip_capacity, 99)
+
+
+@benchmark
+class EventRevisionBenchmark(TestCase):
+    def test_200_revisions(self) -> None:
+        from datetime import datetime
+        from .revisions import reconstruct
+        paragraphs = [f"Paragraph {i}: " + "a long walk with plenty of hills and views. " * 6 + "\n" for i in range(60)]
+        event = Event.objects.create(
+            title="Big trip", slug="big-trip", description="".join(paragraphs),
+            start_datetime=datetime(2025, 10, 4), end_datetime=datetime(2025, 10, 4), trip_location="x",
+        )
+        for n in range(1, 200):
+            paragraphs[n % 60] = f"Paragraph {n % 60}: rewritten in edit {n}.\n"
+            event.description = "".join(paragraphs)
+            event.save()
+        stored = [len(r.payload) for r in event.revisions.all()]
+        started = time.perf_counter()
+        for number in range(1, 201):
+            reconstruct(event, number)
+        elapsed = (time.perf_counter() - started) / 200
+        print(
+            f"\n200 revisions of a {len(event.description)} character description: "
+            f"{sum(stored) / len(stored):.0f} bytes per revision on average "
+            f"(snapshots {max(stored)} bytes), reconstruction {elapsed * 1000:.2f} ms"
+        )
+
+
+class OfflineSupportTests(TestCase):
+    """The service worker and the manifest of URLs it keeps offline."""
+
+    def setUp(self) -> None:
+        from datetime import datetime
+        from django.contrib.auth.models import User
+        self.leader = User.objects.create_user(username="leader", email="leader@example.com")
+        soon = datetime.now() + timedelta(days=3)
+        self.trip = Event.objects.create(
+            title="Booroomba Rocks", slug="booroomba-rocks", description="Climb.", start_datetime=soon,
+            end_datetime=soon, trip_location="Namadgi", created_by=self.leader,
+        )
+        Event.objects.create(
+            title="Someone else's", slug="other-trip", description="Walk.", start_datetime=soon,
+            end_datetime=soon, trip_location="Namadgi",
+        )
+
+    def test_worker_is_served_from_root_with_version(self) -> None:
+        from .offline import cache_version
+        response = self.client.get(reverse("service-worker"))
+        self.assertEqual(response["Content-Type"], "application/javascript")
+        self.assertIn("no-cache", response["Cache-Control"])
+        self.assertContains(response, f"const VERSION = '{cache_version()}'")
+        self.assertContains(response, '"/about/benefits/"')
+        # The personalised home page is never served stale.
+        self.assertContains(response, 'const NETWORK_FIRST_PATHS = ["/"];')
+        self.assertContains(self.client.get(reverse("home")), "serviceWorker.register('/sw.js')")
+
+    @override_settings(SERVICE_WORKER_VERSION="release-42")
+    def test_release_setting_versions_caches(self) -> None:
+        from .offline import cache_version
+        cache_version.cache_clear()
+        self.addCleanup(cache_version.cache_clear)
+        self.assertEqual(self.client.get(reverse("offline-manifest")).json()["version"], "release-42")
+
+    def test_manifest_lists_pages_with_etags(self) -> None:
+        response = self.client.get(reverse("offline-manifest"))
+        self.assertIn("private", response["Cache-Control"])
+        manifest = response.json()
+        self.assertEqual(manifest["precache"], ["/static/css/anumc.css"])
+        self.assertEqual(manifest["rosters"], [])
+        self.assertIsNone(manifest["user"])
+        pages = {page["url"]: page["etag"] for page in manifest["pages"]}
+        self.assertIn(reverse("rates-rules"), pages)
+        page = self.client.get(self.trip.get_absolute_url())
+        self.assertEqual(pages[self.trip.get_absolute_url()], page["ETag"])
+
+    def test_leader_gets_own_rosters(self) -> None:
+        self.client.force_login(self.leader)
+        manifest = self.client.get(reverse("offline-manifest")).json()
+        self.assertEqual(
+            [roster["url"] for roster in manifest["rosters"]],
+            [reverse("my-trips"), reverse("event-member-fragment", args=["booroomba-rocks"])],
+        )
+        # Rosters carry the ETag their pages are served with, so the
+        # worker only downloads the ones that changed.
+        for roster in manifest["rosters"]:
+            page = self.client.get(roster["url"])
+            self.assertEqual(page["ETag"], roster["etag"])
+            self.assertEqual(self.client.get(roster["url"], HTTP_IF_NONE_MATCH=page["ETag"]).status_code, 304)
+        fragment = manifest["rosters"][1]
+        Event.objects.get(slug="booroomba-rocks").signups.create(full_name="Pat", email="pat@example.com")
+        self.assertNotEqual(self.client.get(fragment["url"])["ETag"], fragment["etag"])
+        changed = self.client.get(reverse("offline-manifest")).json()["rosters"]
+        self.assertNotEqual(changed, manifest["rosters"])
+        # The worker drops pages and rosters when this marker changes.
+        from django.contrib.auth.models import User
+        from .offline import user_marker
+        self.assertEqual(manifest["user"], user_marker(self.leader))
+        self.assertNotIn(str(self.leader.pk), manifest["user"])
+        other = User.objects.create_user(username="other", email="other@example.com")
+        self.assertNotEqual(user_marker(other), manifest["user"])
+        worker = self.client.get(reverse("service-worker"))
+        self.assertContains(worker, "const LOGIN_PATH = '/accounts/login/'")
+        self.assertContains(worker, "const LOGOUT_PATH = '/accounts/logout/'")
+        self.assertContains(worker, "const SYNC_INTERVAL = ")
+
+
+class GearHireTests(TestCase):
+    """Availability, booking and the daily manifest of the Gear Store."""
+
+    def setUp(self) -> None:
+        from .models import GearItem
+        self.tents = [GearItem.objects.create(code=f"TENT-{i}", name="2-person tent", kind="tent") for i in range(3)]
+        GearItem.objects.create(code="TENT-9", name="Broken tent", kind="tent", active=False)
+        GearItem.objects.create(code="PACK-1", name="65L pack", kind="pack")
+
+    def _book(self, item, start: date, end: date):
+        from .gear import book_item
+        return book_item(item, start, end, hirer_name="Alex", email="alex@example.com")
+
+    def test_availability_excludes_overlapping_hires(self) -> None:
+        from .gear import available_items
+        self._book(self.tents[0], date(2025, 10, 3), date(2025, 10, 5))
+        returned = self._book(self.tents[1], date(2025, 10, 3), date(2025, 10, 5))
+        returned.status = "returned"
+        returned.save()
+        with self.assertNumQueries(1):
+            free = [item.code for item in available_items("tent", date(2025, 10, 5), date(2025, 10, 7))]
+        self.assertEqual(free, ["TENT-1", "TENT-2"])
+        free = available_items("tent", date(2025, 10, 6), date(2025, 10, 7))
+        self.assertEqual(free.count(), 3)
+
+    def test_double_booking_is_refused(self) -> None:
+        from django.core.exceptions import ValidationError
+        from .gear import book_any
+        self._book(self.tents[0], date(2025, 10, 3), date(2025, 10, 5))
+        with self.assertRaises(ValidationError):
+            self._book(self.tents[0], date(2025, 10, 1), date(2025, 10, 3))
+        with self.assertRaises(ValidationError):
+            self._book(self.tents[1], date(2025, 10, 5), date(2025, 10, 3))
+        hires = [book_any("tent", date(2025, 10, 4), date(2025, 10, 4), hirer_name="B", email="b@example.com") for _ in range(2)]
+        self.assertEqual([h.item.code for h in hires], ["TENT-1", "TENT-2"])
+        with self.assertRaisesMessage(ValidationError, "No tent is free"):
+            book_any("tent", date(2025, 10, 4), date(2025, 10, 4), hirer_name="C", email="c@example.com")
+
+    def test_daily_manifest(self) -> None:
+        from io import StringIO
+        from django.core.management import call_command
+        self._book(self.tents[0], date(2025, 10, 3), date(2025, 10, 5))
+        out_hire = self._book(self.tents[1], date(2025, 10, 1), date(2025, 10, 3))
+        out_hire.status = "out"
+        out_hire.save()
+        out = StringIO()
+        call_command("gear_manifest", "--date", "2025-10-03", stdout=out)
+        self.assertIn("Pickups for Fri 03 Oct 2025: 1\n  TENT-0", out.getvalue())
+        self.assertIn("Returns for Fri 03 Oct 2025: 1\n  TENT-1", out.getvalue())
+
+
+class ConcurrentGearBookingTests(TransactionTestCase):
+    """Simultaneous bookings of the last free item: exactly one wins."""
+
+    def test_parallel_bookings(self) -> None:
+        import threading
+        from django.core.exceptions import ValidationError
+        from django.db import connection
+        from .gear import book_any
+        from .models import GearItem, HireBooking
+        GearItem.objects.create(code="KAYAK-1", name="Sea kayak", kind="kayak")
+        barrier = threading.Barrier(10, timeout=30)
+        outcomes: list[str] = []
+
+        def book(n: int) -> None:
+            barrier.wait()
+            try:
+                book_any("kayak", date(2025, 12, 1), date(2025, 12, 3), hirer_name=f"H{n}", email=f"h{n}@example.com")
+                outcomes.append("booked")
+            except ValidationError:
+                outcomes.append("refused")
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=book, args=(n,)) for n in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(outcomes), ["booked"] + ["refused"] * 9)
+        self.assertEqual(HireBooking.objects.count(), 1)
+
+
+@benchmark
+class GearAvailabilityBenchmark(TestCase):
+    def test_2000_items_100k_hires(self) -> None:
+        import random
+        from .gear import available_items
+        from .models import GearItem, HireBooking
+        kinds = [kind for kind, _ in GearItem.KIND_CHOICES]
+        GearItem.objects.bulk_create(
+            GearItem(code=f"G-{i}", name=f"Item {i}", kind=kinds[i % len(kinds)]) for i in range(2000)
+        )
+        item_ids = list(GearItem.objects.values_list("pk", flat=True))
+        rng = random.Random(1)
+        start = date(2020, 1, 1)
+
+        def hire(n: int) -> HireBooking:
+            pickup = start + timedelta(days=rng.randrange(2190))
+            return HireBooking(
+                item_id=rng.choice(item_ids), hirer_name=f"H{n}", email=f"h{n}@example.com",
+                pickup_date=pickup, return_date=pickup + timedelta(days=rng.randrange(1, 8)),
+                status="returned" if pickup < date(2025, 6, 1) else "booked",
+            )
+
+        HireBooking.objects.bulk_create((hire(n) for n in range(100_000)), batch_size=5000)
+        started = time.perf_counter()
+        for n in range(200):
+            pickup = date(2025, 6, 1) + timedelta(days=n % 150)
+            len(available_items(kinds[n % len(kinds)], pickup, pickup + timedelta(days=3)))
+        elapsed = (time.perf_counter() - started) / 200
+        print(f"\nAvailability over 2000 items / 100k hires: {elapsed * 1000:.2f} ms per lookup")
+
+
+class GeocodingTests(TestCase):
+    """Trip locations are geocoded offline and searchable by distance."""
+
+    def setUp(self) -> None:
+        from .gazetteer import clear_cache
+        clear_cache()
+
+    def _trip(self, slug: str, location: str, **kwargs) -> Event:
+        from datetime import datetime
+        return Event.objects.create(
+            title=slug, slug=slug, description="Trip.", start_datetime=datetime(2025, 10, 4),
+            end_datetime=datetime(2025, 10, 4), trip_location=location, **kwargs,
+        )
+
+    def test_geohash_encoding(self) -> None:
+        from .geo import covering_cells, encode
+        self.assertEqual(encode(57.64911, 10.40744, 11), "u4pruydqqvj")
+        cells = covering_cells(-36.0, 148.5, -35.0, 149.5)
+        self.assertLessEqual(len(cells), 16)
+        self.assertTrue(any(encode(-35.2809, 149.13).startswith(cell) for cell in cells))
+
+    def test_geocode_free_text(self) -> None:
+        from .gazetteer import geocode
+        self.assertEqual(geocode("Booroomba Rocks car park, Namadgi NP"), (-35.5617, 148.9969))
+        self.assertEqual(geocode("Meet at ANU Union Court"), (-35.2809, 149.13))
+        self.assertEqual(geocode("Falls Creek"), (-36.865, 147.28))
+        self.assertIsNone(geocode("Somewhere nice"))
+        with self.assertNumQueries(0):
+            geocode("Booroomba Rocks car park, Namadgi NP")
+
+    def test_save_stores_coordinates(self) -> None:
+        event = self._trip("climb", "Booroomba Rocks", meeting_location="Canberra")
+        self.assertEqual((event.latitude, event.longitude), (-35.5617, 148.9969))
+        self.assertEqual(len(event.geohash), 6)
+        self.assertEqual(event.meeting_latitude, -35.2809)
+        event.trip_location = "Who knows"
+        event.save()
+        self.assertEqual((event.latitude, event.geohash), (None, ""))
+
+    def test_radius_and_bbox_search(self) -> None:
+        from .geo import haversine_km
+        self._trip("namadgi", "Namadgi National Park")
+        self._trip("perisher", "Perisher Valley")
+        self._trip("arapiles", "Mt Arapiles")
+        self._trip("unknown", "TBA")
+        with CaptureQueriesContext(connection) as ctx:
+            near = list(Event.objects.within_radius(-35.2809, 149.13, 150).order_by("distance_km"))
+        self.assertEqual([e.slug for e in near], ["namadgi", "perisher"])
+        self.assertAlmostEqual(near[0].distance_km, haversine_km(-35.2809, 149.13, -35.667, 148.95), places=3)
+        self.assertIn('"geohash" >=', ctx.captured_queries[0]["sql"])
+        boxed = Event.objects.within_bbox(-37.0, 141.0, -36.0, 142.0)
+        self.assertEqual([e.slug for e in boxed], ["arapiles"])
+        response = self.client.get(reverse("home"), {"near": "Canberra", "km": "100"})
+        self.assertEqual([e.slug for e in response.context["events"]], ["namadgi"])
+        default = self.client.get(reverse("home"), {"near": "Canberra"}).context["events"]
+        for km in ("nan", "inf", "-inf", "lots"):
+            response = self.client.get(reverse("home"), {"near": "Canberra", "km": km})
+            self.assertEqual(list(response.context["events"]), list(default))
+        # Long place names are cut short before geocoding.
+        from unittest import mock
+        from . import gazetteer
+        with mock.patch.object(gazetteer, "geocode", return_value=None) as geocode:
+            self.client.get(reverse("home"), {"near": "Canberra " * 5000})
+        self.assertEqual(len(geocode.call_args.args[0]), 100)
+
+    def test_batch_geocoding_command(self) -> None:
+        from datetime import datetime
+        from io import StringIO
+        from django.core.management import call_command
+        from .geo import encode
+        Event.objects.bulk_create([
+            Event(title=f"T{i}", slug=f"t-{i}", description="x", start_datetime=datetime(2025, 10, 4),
+                  end_datetime=datetime(2025, 10, 4), trip_location=location)
+            for i, location in enumerate(["Thredbo", "Cotter Dam", "Nowhere in particular"])
+        ])
+        out = StringIO()
+        call_command("geocode_events", "--batch-size", "2", stdout=out)
+        self.assertIn("Geocoded 2 of 3 events", out.getvalue())
+        self.assertEqual(Event.objects.get(slug="t-0").geohash, encode(-36.505, 148.306))
+
+
+@benchmark
+class GeoSearchBenchmark(TestCase):
+    def test_100k_events(self) -> None:
+        import random
+        from datetime import datetime
+        from io import StringIO
+        from django.core.management import call_command
+        from .gazetteer import clear_cache
+        from .models import GazetteerPlace
+        clear_cache()
+        rng = random.Random(1)
+        places = list(GazetteerPlace.objects.values_list("name", flat=True).distinct())
+        Event.objects.bulk_create(
+            (
+                Event(
+                    title=f"Trip {i}", slug=f"trip-{i}", description="x", start_datetime=datetime(2025, 10, 4),
+                    end_datetime=datetime(2025, 10, 4),
+                    trip_location=f"{rng.choice(places)} car park" if i % 10 else "Secret spot",
+                    meeting_location="ANU Union Court",
+                )
+                for i in range(100_000)
+            ),
+            batch_size=5000,
+        )
+        started = time.perf_counter()
+        call_command("geocode_events", stdout=StringIO())
+        geocoded_in = time.perf_counter() - started
+
+        # Spread the points across the continent so the search has to
+        # discriminate.
+        events = list(Event.objects.exclude(latitude=None).only("pk"))
+        for event in events:
+            event.set_coordinates((rng.uniform(-43, -11), rng.uniform(113, 154)), None)
+        Event.objects.bulk_update(events, ["latitude", "longitude", "geohash"], batch_size=5000)
+
+        from django.db.models.functions import ACos, Cos, Least, Radians, Sin
+        from django.db.models import Value
+        import math
+        lat, lon = math.radians(-35.2809), math.radians(149.13)
+        full_scan = Event.objects.exclude(latitude=None).annotate(
+            distance_km=6371.0088 * ACos(Least(
+                Sin(Radians("latitude")) * math.sin(lat)
+                + Cos(Radians("latitude")) * math.cos(lat) * Cos(Radians("longitude") - lon),
+                Value(1.0),
+            ))
+        ).filter(distance_km__lte=150)
+
+        timings = {}
+        for label, query in (
+            ("geohash index", lambda: Event.objects.within_radius(-35.2809, 149.13, 150)),
+            ("full scan", lambda: full_scan.all()),
+        ):
+            started = time.perf_counter()
+            for _ in range(5):
+                found = query().count()
+            timings[label] = ((time.perf_counter() - started) / 5 * 1000, found)
+        print(f"\nBatch geocoded 100k events in {geocoded_in:.1f}s")
+        for label, (ms, found) in timings.items():
+            print(f"  150 km of Canberra, {label}: {ms:.1f} ms ({found} events)")
+
+
+class CompressionTests(TestCase):
+    """Responses are compressed per Accept-Encoding and variants cached."""
+
+    def setUp(self) -> None:
+        from datetime import datetime
+        from django.core.cache import cache
+        cache.clear()
+        self.event = Event.objects.create(
+            title="Mount Gingera", slug="mount-gingera", description="A long walk.\n\n" * 40,
+            start_datetime=datetime(2025, 10, 4), end_datetime=datetime(2025, 10, 4), trip_location="Namadgi",
+        )
+
+    def test_negotiation(self) -> None:
+        from .compression import available_encodings, negotiate
+        preferred = available_encodings()[0]
+        self.assertEqual(negotiate("gzip, deflate, br"), preferred)
+        self.assertEqual(negotiate("br;q=0.5, gzip"), "gzip")
+        self.assertEqual(negotiate("br;q=0, gzip;q=0.1"), "gzip")
+        self.assertEqual(negotiate("*"), preferred)
+        self.assertIsNone(negotiate("identity"))
+        self.assertIsNone(negotiate(""))
+
+    def test_html_is_compressed(self) -> None:
+        import gzip
+        from .compression import brotli
+        url = self.event.get_absolute_url()
+        plain = self.client.get(url)
+        self.assertFalse(plain.has_header("Content-Encoding"))
+        self.assertIn("Accept-Encoding", plain["Vary"])
+        zipped = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(zipped["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(zipped.content), plain.content)
+        self.assertEqual(zipped["ETag"], "W/" + plain["ETag"])
+        self.assertEqual(int(zipped["Content-Length"]), len(zipped.content))
+        if brotli is not None:
+            br = self.client.get(url, HTTP_ACCEPT_ENCODING="br, gzip")
+            self.assertEqual(brotli.decompress(br.content), plain.content)
+            self.assertLess(len(br.content), len(plain.content) // 3)
+        revalidated = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=zipped["ETag"])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_compressed_variant_is_reused(self) -> None:
+        from unittest import mock
+        from . import compression
+        url = self.event.get_absolute_url()
+        with mock.patch.object(compression, "compress", wraps=compression.compress) as compress:
+            first = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip").content
+            second = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip").content
+            self.assertEqual(compress.call_count, 1)
+            self.assertEqual(first, second)
+            self.event.description = "Changed."
+            self.event.save()
+            self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+            self.assertEqual(compress.call_count, 2)
+            # Pages without an ETag (or private ones) are never cached.
+            self.client.get(reverse("home"), HTTP_ACCEPT_ENCODING="gzip")
+            self.client.get(reverse("home"), HTTP_ACCEPT_ENCODING="gzip")
+            self.assertEqual(compress.call_count, 4)
+
+    def test_cache_key_follows_the_body(self) -> None:
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+        from .compression import _cache_key
+        request = RequestFactory().get("/events/mount-gingera/")
+        keys = set()
+        for body in ("Snake Rock", "Gingera!!!", "Snake Rock"):
+            response = HttpResponse(body)
+            response["ETag"] = '"same"'
+            keys.add(_cache_key(request, response, "gzip", 6))
+        # Same length, same ETag, different body: different key.
+        self.assertEqual(len(keys), 2)
+
+    def test_pages_with_csrf_tokens_are_padded_gzip(self) -> None:
+        import gzip
+        from unittest import mock
+        from django.http import HttpResponse
+        from django.middleware.csrf import get_token
+        from django.test import RequestFactory
+        from . import compression
+        html = "<form>" + "Sign up for the trip. " * 50 + "{token}</form>"
+
+        def view(request):
+            response = HttpResponse(html.format(token=get_token(request)))
+            response["ETag"] = '"form"'
+            return response
+
+        middleware = compression.CompressionMiddleware(view)
+        lengths = set()
+        with mock.patch.object(compression.cache, "set") as cache_set:
+            for _ in range(20):
+                response = middleware(RequestFactory().get("/", HTTP_ACCEPT_ENCODING="br, gzip"))
+                self.assertEqual(response["Content-Encoding"], "gzip")
+                self.assertTrue(gzip.decompress(response.content).startswith(b"<form>Sign up"))
+                lengths.add(len(response.content))
+            cache_set.assert_not_called()
+        self.assertGreater(len(lengths), 1)
+
+    def test_streaming_responses_are_compressed_incrementally(self) -> None:
+        import zlib
+        from django.http import HttpResponse, StreamingHttpResponse
+        from django.test import RequestFactory
+        from . import compression
+        from .compression import CompressionMiddleware
+        rows = [f"{i},Trip {i},Namadgi\n".encode() for i in range(500)]
+        middleware = CompressionMiddleware(lambda request: StreamingHttpResponse(iter(rows), content_type="text/csv"))
+        response = middleware(RequestFactory().get("/export.csv", HTTP_ACCEPT_ENCODING="gzip"))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        chunks = list(response.streaming_content)
+        self.assertGreater(len(chunks), 100)
+        self.assertEqual(zlib.decompress(b"".join(chunks), 31), b"".join(rows))
+        padded = compression.compress_stream(iter(rows), "gzip", 6, max_random_bytes=100)
+        self.assertEqual(zlib.decompress(b"".join(padded), 31), b"".join(rows))
+        small = CompressionMiddleware(lambda request: HttpResponse("tiny"))
+        self.assertFalse(small(RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip")).has_header("Content-Encoding"))
+
+
+@benchmark
+class CompressionBenchmark(TestCase):
+    def test_levels(self) -> None:
+        from .compression import available_encodings, compress
+        Event.objects.bulk_create(sample_events(50))
+        html = self.client.get(reverse("home")).content
+        print(f"\nHome page with 50 events: {len(html)} bytes uncompressed")
+        for encoding, levels in (("gzip", (1, 6, 9)), ("br", (1, 5, 9, 11))):
+            if encoding not in available_encodings():
+                continue
+            for level in levels:
+                started = time.process_time()
+                for _ in range(20):
+                    body = compress(html, encoding, level)
+                cpu = (time.process_time() - started) / 20 * 1000
+                print(f"  {encoding:>4} level {level:>2}: {len(body):>6} bytes, {cpu:.2f} ms CPU per response")
+
+
+class WarmupTests(TestCase):
+    """The warm-up command touches every lazily initialised layer."""
+
+    def test_warmup_command(self) -> None:
+        from io import StringIO
+        from django.core.cache import cache
+        from django.core.management import call_command
+        from datetime import datetime
+        cache.clear()
+        Event.objects.create(
+            title="Gingera", slug="gingera", description="Walk.", trip_location="Namadgi",
+            start_datetime=datetime.now() + timedelta(days=2), end_datetime=datetime.now() + timedelta(days=2),
+        )
+        out = StringIO()
+        call_command("warmup", stdout=out)
+        lines = dict(line.split(None, 1) for line in out.getvalue().splitlines()[:5])
+        self.assertEqual(list(lines), ["imports", "urls", "templates", "databases", "caches"])
+        self.assertGreaterEqual(int(lines["templates"].split()[0]), 20)
+        # home + one event page, once per encoding
+        from .compression import available_encodings
+        self.assertEqual(int(lines["caches"].split()[0]), 2 * len(available_encodings()))
+        from .caching import HOME_ANNOUNCEMENTS_KEY
+        self.assertIsNotNone(cache.get(HOME_ANNOUNCEMENTS_KEY))
+
+    def test_warmed_connections_are_kept_for_requests(self) -> None:
+        from django.db import connections
+        # With CONN_MAX_AGE = 0 the first request would close the
+        # connection opened by the "databases" step.
+        for connection in connections.all():
+            self.assertGreater(connection.settings_dict["CONN_MAX_AGE"], 0)
+            self.assertTrue(connection.settings_dict["CONN_HEALTH_CHECKS"])
+
+    def test_gunicorn_hook_survives_failing_steps(self) -> None:
+        import runpy
+        from unittest import mock
+        from django.conf import settings
+        from django.db import OperationalError
+        from . import warmup
+        hooks = runpy.run_path(str(settings.BASE_DIR / "gunicorn.conf.py"))
+        worker = mock.Mock()
+        with mock.patch.object(warmup, "open_connections", side_effect=OperationalError("database is down")):
+            hooks["post_worker_init"](worker)
+        worker.log.exception.assert_called_once_with("warm-up %s failed; continuing", "databases")
+        steps = [call.args[1] for call in worker.log.info.call_args_list]
+        self.assertEqual(steps, ["imports", "urls", "templates", "caches"])
+        with mock.patch.object(warmup, "open_connections", side_effect=OperationalError("database is down")):
+            with self.assertRaises(OperationalError):
+                warmup.warm_up()
+
+    def test_every_named_url_resolves(self) -> None:
+        from . import urls
+        from .warmup import resolve_urls
+        self.assertEqual(resolve_urls(), sum(1 for p in urls.urlpatterns if p.name))
+
+
+@benchmark
+class FirstRequestBenchmark(SimpleTestCase):
+    """First-request latency of a fresh interpreter, cold and warmed up."""
+
+    SCRIPT = """
+import os, sys, time, django
+os.environ["DJANGO_SETTINGS_MODULE"] = "anumc_website.settings"
+django.setup()
+from django.db import connections
+connections["default"].settings_dict["NAME"] = sys.argv[1]
+if sys.argv[2] == "setup":
+    from datetime import datetime, timedelta
+    from django.core.management import call_command
+    call_command("migrate", verbosity=0)
+    from main.models import Event
+    Event.objects.create(title="Trip", slug="trip", description="Walk.", trip_location="Namadgi",
+                         start_datetime=datetime.now() + timedelta(days=1), end_datetime=datetime.now() + timedelta(days=1))
+    sys.exit()
+if sys.argv[2] == "warm":
+    from main.warmup import warm_up
+    warm_up(host="localhost")
+from django.test import Client
+client = Client(HTTP_HOST="localhost")
+for url in ("/", "/events/trip/", "/about/history/"):
+    started = time.perf_counter()
+    client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+    print(f"{url} {(time.perf_counter() - started) * 1000:.1f}")
+"""
+
+    def test_cold_vs_warm(self) -> None:
+        import subprocess
+        import sys
+        import tempfile
+        from django.conf import settings
+        with tempfile.TemporaryDirectory() as tmp:
+            db = os.path.join(tmp, "db.sqlite3")
+
+            def run(mode: str) -> str:
+                return subprocess.run(
+                    [sys.executable, "-c", self.SCRIPT, db, mode], capture_output=True, text=True,
+                    cwd=settings.BASE_DIR, check=True,
+                ).stdout
+
+            run("setup")
+            results = {mode: [run(mode) for _ in range(3)] for mode in ("cold", "warm")}
+        print()
+        for mode, runs in results.items():
+            timings: dict[str, list[float]] = {}
+            for output in runs:
+                for line in output.splitlines():
+                    url, ms = line.split()
+                    timings.setdefault(url, []).append(float(ms))
+            summary = ", ".join(f"{url} {min(ms):.1f} ms" for url, ms in timings.items())
+            print(f"  first requests, {mode}: {summary}")
+
+
+def image_bytes(fmt: str = "PNG", size: tuple[int, int] = (64, 48), colour: str = "teal") -> bytes:
+    from io import BytesIO
+    from PIL import Image
+    buffer = BytesIO()
+    Image.new("RGB", size, colour).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+def png_header(width: int, height: int) -> bytes:
+    """The first bytes of a PNG declaring ``width`` × ``height`` pixels."""
+    import struct
+    import zlib
+    ihdr = b"IHDR" + struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + ihdr + struct.pack(">I", zlib.crc32(ihdr))
+
+
+class EventImageUploadTests(TestCase):
+    """Event images are checked while streaming and stored by content."""
+
+    def setUp(self) -> None:
+        import shutil
+        import tempfile
+        from django.contrib.auth.models import User
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        self.media = media
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client.force_login(User.objects.create_user(username="leader", email="leader@example.com"))
+
+    def post(self, name: str, content: bytes, title: str = "Tinderry Peak"):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        data = {
+            "title": title,
+            "description": "Day walk.",
+            "image": SimpleUploadedFile(name, content),
+            "registration_method": "fcfs",
+            "trip_capacity": 8,
+            "category": "hiking",
+            "trip_location": "Tinderry Nature Reserve",
+            "start_datetime": "2025-11-08T07:00",
+            "end_datetime": "2025-11-08T18:00",
+            "difficulty_level": "moderate",
+            "approval_status": "approved",
+            "contact_details": "leader@example.com",
+        }
+        return self.client.post(reverse("event-create"), data)
+
+    def stored_files(self) -> list[str]:
+        return sorted(
+            os.path.relpath(os.path.join(root, name), self.media)
+            for root, _, names in os.walk(self.media)
+            for name in names
+        )
+
+    def test_image_is_stored_under_its_hash(self) -> None:
+        import hashlib
+        content = image_bytes("JPEG")
+        response = self.post("IMG_0001.JPG", content)
+        self.assertEqual(response.status_code, 302)
+        digest = hashlib.sha256(content).hexdigest()
+        self.assertEqual(Event.objects.get().image.name, f"events/{digest[:2]}/{digest}.jpg")
+        self.assertEqual(self.stored_files(), [f"events/{digest[:2]}/{digest}.jpg"])
+
+    def test_duplicate_uploads_share_one_file(self) -> None:
+        content = image_bytes()
+        self.post("poster.png", content, title="Tinderry Peak")
+        self.post("poster-copy.png", content, title="Tinderry Peak again")
+        self.post("other.png", image_bytes(colour="orange"), title="Mount Gingera")
+        first, second, third = Event.objects.order_by("pk")
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertNotEqual(first.image.name, third.image.name)
+        self.assertEqual(len(self.stored_files()), 2)
+
+    def test_oversize_dimensions_are_refused_from_the_header(self) -> None:
+        # Valid header, garbage body: refused before Pillow would see it.
+        response = self.post("huge.png", png_header(30000, 20000) + b"\0" * 100_000)
+        self.assertEqual(response.status_code, 200)
+        self.assertFormError(
+            response.context["form"], "image",
+            "The image is 30000 × 20000 pixels; the most allowed is 12000 pixels a side and 50 megapixels.",
+        )
+        self.assertFalse(Event.objects.exists())
+        self.assertEqual(self.stored_files(), [])
+
+    def test_non_image_is_refused(self) -> None:
+        response = self.post("notes.png", b"These are not the pixels you are looking for." * 10)
+        self.assertFormError(response.context["form"], "image", "Upload a JPEG, PNG, GIF or WebP image.")
+        self.assertFalse(Event.objects.exists())
+
+    @override_settings(EVENT_IMAGE_MAX_BYTES=4096)
+    def test_size_limit_is_enforced_while_streaming(self) -> None:
+        from io import BytesIO
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from django.http.multipartparser import MultiPartParser
+        from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+        from .uploads import EventImageUploadHandler
+        body = encode_multipart(BOUNDARY, {"image": SimpleUploadedFile("big.png", png_header(100, 100) + b"\0" * 20_000)})
+        handler = EventImageUploadHandler()
+        received = []
+        receive = handler.receive_data_chunk
+        handler.receive_data_chunk = lambda data, start: received.append(len(data)) or receive(data, start)
+        handler.chunk_size = 1024
+        meta = {"CONTENT_TYPE": MULTIPART_CONTENT, "CONTENT_LENGTH": str(len(body))}
+        post, files = MultiPartParser(meta, BytesIO(body), [handler]).parse()
+        self.assertNotIn("image", files)
+        self.assertEqual(handler.errors, {"image": "The image must be no larger than 4.0\xa0KB."})
+        # The handler stopped being fed just past the limit.
+        self.assertLessEqual(sum(received), 4096 + 1024)
+
+    def test_formats_and_dimensions_are_read_from_headers(self) -> None:
+        from .uploads import NotAnImage, sniff
+        for fmt in ("JPEG", "PNG", "GIF", "WEBP"):
+            with self.subTest(fmt=fmt):
+                self.assertEqual(sniff(image_bytes(fmt, (321, 123))), (fmt.lower(), 321, 123))
+                self.assertIsNone(sniff(image_bytes(fmt)[:3]))
+        with self.assertRaises(NotAnImage):
+            sniff(b"<html><body>hello</body></html>")
+
+
+class ImageUploadMemoryTests(SimpleTestCase):
+    """Concurrent 50 MB uploads stream through a small, fixed amount of memory."""
+
+    SIZE = 50 * 2**20
+    CONCURRENCY = 4
+
+    def stream(self, boundary: str, header: bytes):
+        """A file-like multipart body, generated as it is read."""
+
+        def parts():
+            yield (
+                f'--{boundary}\r\nContent-Disposition: form-data; name="title"\r\n\r\nPoster\r\n'
+                f'--{boundary}\r\nContent-Disposition: form-data; name="image"; filename="poster.png"\r\n'
+                f"Content-Type: image/png\r\n\r\n"
+            ).encode() + header
+            block = b"\x5a" * 2**16
+            remaining = self.SIZE - len(header)
+            while remaining:
+                yield block[:remaining] if remaining < len(block) else block
+                remaining -= min(remaining, len(block))
+            yield f"\r\n--{boundary}--\r\n".encode()
+
+        class Body:
+            def __init__(self) -> None:
+                self.parts, self.pending = parts(), b""
+
+            def read(self, size: int = -1) -> bytes:
+                if not self.pending:
+                    self.pending = next(self.parts, b"")
+                data, self.pending = self.pending[:size], self.pending[size:]
+                return data
+
+        length = sum(len(part) for part in parts())
+        return Body(), length
+
+    def upload_concurrently(self) -> tuple[list, int]:
+        import threading
+        import tracemalloc
+        from django.http.multipartparser import MultiPartParser
+        from .uploads import EventImageUploadHandler
+        results: list = []
+        barrier = threading.Barrier(self.CONCURRENCY, timeout=30)
+
+        def upload() -> None:
+            body, length = self.stream("upload-boundary", png_header(4000, 3000))
+            meta = {"CONTENT_TYPE": "multipart/form-data; boundary=upload-boundary", "CONTENT_LENGTH": str(length)}
+            handler = EventImageUploadHandler()
+            barrier.wait()
+            post, files = MultiPartParser(meta, body, [handler]).parse()
+            image = files.get("image")
+            results.append((post["title"], image and image.size, image and image.sha256, handler.errors))
+            if image:
+                image.close()
+
+        tracemalloc.start()
+        try:
+            threads = [threading.Thread(target=upload) for _ in range(self.CONCURRENCY)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return results, peak
+
+    @override_settings(EVENT_IMAGE_MAX_BYTES=64 * 2**20)
+    def test_accepted_uploads(self) -> None:
+        import hashlib
+        expected = hashlib.sha256(png_header(4000, 3000))
+        expected.update(b"\x5a" * (self.SIZE - len(png_header(4000, 3000))))
+        results, peak = self.upload_concurrently()
+        self.assertEqual(results, [("Poster", self.SIZE, expected.hexdigest(), {})] * self.CONCURRENCY)
+        self.assertLess(peak, 4 * 2**20)
+
+    def test_refused_uploads(self) -> None:
+        results, peak = self.upload_concurrently()
+        self.assertEqual(
+            results, [("Poster", None, None, {"image": "The image must be no larger than 10.0\xa0MB."})] * self.CONCURRENCY
+        )
+        self.assertLess(peak, 4 * 2**20)
+
+
+class PersonalisedFeedTests(TestCase):
+    """Members see the home page ordered by their trip preferences."""
+
+    def setUp(self) -> None:
+        from datetime import datetime
+        from django.contrib.auth.models import User
+        from django.core.cache import cache
+        cache.clear()
+        self.member = User.objects.create_user(username="member", email="member@example.com")
+        self.now = datetime.now()
+        for days, title, category, difficulty in [
+            (1, "Snake Rock", "climbing", "easy"),
+            (2, "Molonglo paddle", "kayaking", "moderate"),
+            (3, "Gingera", "hiking", "hard"),
+            (4, "Pub night", "social", "none"),
+        ]:
+            self.event(title, category, difficulty, days)
+
+    def event(self, title: str, category: str, difficulty: str, days: int) -> Event:
+        from django.utils.text import slugify
+        start = self.now + timedelta(days=days)
+        return Event.objects.create(
+            title=title, slug=slugify(title), category=category, difficulty_level=difficulty,
+            description="Trip.", trip_location="ACT", start_datetime=start, end_datetime=start + timedelta(hours=8),
+        )
+
+    def titles(self) -> list[str]:
+        response = self.client.get(reverse("home"))
+        return [event.title for event in response.context["events"]]
+
+    def prefer(self, categories: list[str], difficulty: str = "") -> None:
+        profile = self.member.profile
+        profile.preferred_categories = categories
+        profile.preferred_difficulty = difficulty
+        profile.save()
+
+    def test_anonymous_visitors_see_date_order(self) -> None:
+        self.assertEqual(self.titles(), ["Snake Rock", "Molonglo paddle", "Gingera", "Pub night"])
+
+    def test_preferences_order_the_home_page(self) -> None:
+        self.prefer(["kayaking"], "hard")
+        self.client.force_login(self.member)
+        # kayaking 30 + one level off 10; hard 20; ungraded 10; two off 0
+        self.assertEqual(self.titles(), ["Molonglo paddle", "Gingera", "Pub night", "Snake Rock"])
+        self.assertContains(self.client.get(reverse("home")), "Trips that suit you are listed first")
+
+    def test_past_signups_count(self) -> None:
+        from .models import EventSignup
+        for n in range(2):
+            past = self.event(f"Old climb {n}", "climbing", "easy", -30 - n)
+            EventSignup.objects.create(event=past, user=self.member, full_name="Member", email="member@example.com")
+        self.client.force_login(self.member)
+        # No preferences: climbing history (2 × 10) and easy difficulty.
+        self.assertEqual(self.titles()[:2], ["Snake Rock", "Molonglo paddle"])
+
+    def test_edits_update_rankings_incrementally(self) -> None:
+        from . import feed
+        self.prefer(["hiking"])
+        self.client.force_login(self.member)
+        self.assertEqual(self.titles()[0], "Gingera")
+        with CaptureQueriesContext(connection) as warm:
+            self.titles()
+        with self.captureOnCommitCallbacks(execute=True):
+            pub = Event.objects.get(slug="pub-night")
+            pub.category = "hiking"
+            pub.save()
+            self.event("Mount Tennent", "hiking", "moderate", 5)
+        with self.assertNumQueries(len(warm)):
+            titles = self.titles()
+        self.assertEqual(titles[:3], ["Gingera", "Pub night", "Mount Tennent"])
+        # Applied from the change records, not rebuilt.
+        with self.captureOnCommitCallbacks(execute=True):
+            Event.objects.get(slug="gingera").delete()
+        with self.assertNumQueries(len(warm)):
+            self.assertEqual(self.titles()[:2], ["Pub night", "Mount Tennent"])
+        self.assertEqual(len(feed.ranking(self.member)), 2)
+
+    def test_query_count_does_not_grow_with_events(self) -> None:
+        self.prefer(["social"], "easy")
+        self.client.force_login(self.member)
+        self.titles()
+        with CaptureQueriesContext(connection) as few:
+            self.titles()
+        with self.captureOnCommitCallbacks(execute=True):
+            for n in range(40):
+                self.event(f"Extra trip {n}", "social", "easy", 10 + n)
+        with self.assertNumQueries(len(few)):
+            self.titles()
+
+    def test_preferences_page(self) -> None:
+        from django.core.cache import cache
+        from . import feed
+        self.client.force_login(self.member)
+        self.titles()
+        self.assertIsNotNone(cache.get(feed.FEED_KEY.format(user_id=self.member.pk)))
+        response = self.client.post(
+            reverse("my-preferences"), {"preferred_categories": ["kayaking", "climbing"], "preferred_difficulty": "easy"}
+        )
+        self.assertRedirects(response, reverse("home"), fetch_redirect_response=False)
+        self.member.profile.refresh_from_db()
+        self.assertEqual(self.member.profile.preferred_categories, ["kayaking", "climbing"])
+        self.assertIsNone(cache.get(feed.FEED_KEY.format(user_id=self.member.pk)))
+        self.assertEqual(self.titles()[:2], ["Snake Rock", "Molonglo paddle"])
+
+    @override_settings(THROTTLE_RATES={})
+    def test_signing_up_through_the_site_updates_ranking(self) -> None:
+        from . import feed
+        self.client.force_login(self.member)
+        self.assertEqual(feed.ranking(self.member), {})
+        gingera = Event.objects.get(slug="gingera")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("event-signup", kwargs={"slug": gingera.slug}),
+                {"full_name": "Member", "email": "member@example.com"},
+            )
+        self.assertEqual(response.status_code, 302)
+        # One hiking sign-up (10) and its hard difficulty (20).
+        self.assertEqual(feed.ranking(self.member)[gingera.pk], 30)
+
+    def test_local_memory_cache_keeps_rankings_briefly(self) -> None:
+        from . import feed
+        self.assertEqual(feed.feed_ttl(), feed.LOCAL_FEED_TTL)
+        redis = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://"}}
+        with override_settings(CACHES=redis):
+            self.assertEqual(feed.feed_ttl(), feed.FEED_TTL)
+
+
+@benchmark
+class PersonalisedFeedBenchmark(TestCase):
+    """Home page for a member with 2,000 upcoming events: cold, warm and after edits."""
+
+    def test_2000_events(self) -> None:
+        from datetime import datetime
+        from django.contrib.auth.models import User
+        from django.core.cache import cache
+        from . import feed
+        categories = [value for value, _ in Event.CATEGORY_CHOICES]
+        difficulties = [value for value, _ in Event.DIFFICULTY_CHOICES]
+        now = datetime.now()
+        Event.objects.bulk_create(
+            Event(
+                title=f"Trip {n}", slug=f"trip-{n}", category=categories[n % 6], difficulty_level=difficulties[n % 4],
+                description="Trip.", start_datetime=now + timedelta(hours=n), end_datetime=now + timedelta(hours=n + 8),
+            )
+            for n in range(2000)
+        )
+        member = User.objects.create_user(username="member", email="member@example.com")
+        member.profile.preferred_categories = ["hiking", "skiing"]
+        member.profile.preferred_difficulty = "moderate"
+        member.profile.save()
+        cache.clear()
+
+        def timed() -> tuple[float, int]:
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                feed.ranking(member)
+                return (time.perf_counter() - started) * 1000, len(queries)
+
+        cold = timed()
+        warm = timed()
+        with self.captureOnCommitCallbacks(execute=True):
+            for event in Event.objects.order_by("pk")[:100]:
+                event.category = "hiking"
+                event.save()
+        incremental = timed()
+        print()
+        for label, (ms, queries) in [("cold", cold), ("warm", warm), ("after 100 edits", incremental)]:
+            print(f"  ranking {label}: {ms:.2f} ms, {queries} queries")
@@ -0,0 +1,175 @@
+"""Token-bucket throttling for expensive POST endpoints.
+
+Signups for a popular trip and account registrations (which run a
+deliberately slow password hash) are the most expensive requests the site
+serves.  :class:`ThrottleMiddleware` rejects excess POSTs to those views
+with ``429 Too Many Requests`` before the view runs.
+
+Limits are configured per URL name in the ``THROTTLE_RATES`` setting, with
+one bucket per *scope*::
+
+    THROTTLE_RATES = {
+        "event-signup": {"user": "10/min", "ip": "30/min", "event": "300/min"},
+        "signup": {"ip": "10/hour"},
+    }
+
+Supported scopes are ``user`` (the authenticated user), ``ip`` (the client
+address) and ``event`` (the ``slug`` URL argument).  A request must find a
+token in every bucket that applies to it.
+
+Behind a reverse proxy ``REMOTE_ADDR`` is the proxy's own address, so every
+visitor would share one ``ip`` bucket.  Set ``THROTTLE_TRUSTED_PROXIES`` to
+the number of proxies in front of the site and :func:`client_ip` reads the
+address from ``THROTTLE_PROXY_HEADER`` (``X-Forwarded-For`` by default)
+instead.  Each proxy appends the address it received the request from, so
+the client is that many entries from the right; anything further left was
+sent by the client and is ignored.
+
+Buckets live in the default cache so all workers share them, and are
+updated only with the cache's atomic ``add``/``incr``/``decr`` operations.
+Each bucket counts tokens taken in the current refill window; the previous
+window's count is carried over in proportion to how much of it still
+overlaps the last ``period`` seconds, so tokens flow back continuously
+rather than all at once at a window boundary.
+"""
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+PERIODS = {"s": 1, "sec": 1, "m": 60, "min": 60, "h": 3600, "hour": 3600, "d": 86400, "day": 86400}
+THROTTLED_METHODS = {"POST"}
+
+
+@dataclass(frozen=True)
+class Rate:
+    capacity: int
+    period: int
+
+    @classmethod
+    def parse(cls, rate: str) -> "Rate":
+        """Parse a rate such as ``"10/min"`` or ``"100/hour"``."""
+        count, _, period = rate.partition("/")
+        return cls(int(count), PERIODS[period])
+
+
+class TokenBucket:
+    """A shared-cache token bucket identified by ``key``."""
+
+    def __init__(self, key: str, rate: Rate) -> None:
+        self.key = key
+        self.rate = rate
+
+    def _window_key(self, window: int) -> str:
+        return f"throttle:{self.key}:{window}"
+
+    def take(self, now: float | None = None) -> tuple[bool, int]:
+        """Take one token; return ``(allowed, retry_after_seconds)``."""
+        now = time.time() if now is None else now
+        period = self.rate.period
+        window, offset = divmod(now, period)
+        window = int(window)
+        current_key = self._window_key(window)
+        # ``add`` is a no-op when the key exists, so concurrent first
+        # requests don't reset each other's counts.
+        cache.add(current_key, 0, timeout=period * 2)
+        taken = cache.incr(current_key)
+        previous = cache.get(self._window_key(window - 1), 0)
+        carried = previous * (1 - offset / period)
+        if taken + carried <= self.rate.capacity:
+            return True, 0
+        self.give_back(now)
+        return False, self._retry_after(taken - 1, previous, offset)
+
+    def give_back(self, now: float | None = None) -> None:
+        """Return a token taken by :meth:`take` in the same window."""
+        now = time.time() if now is None else now
+        try:
+            cache.decr(self._window_key(int(now // self.rate.period)))
+        except ValueError:
+            # The window expired in the meantime; nothing to return.
+            pass
+
+    def _retry_after(self, taken: int, previous: int, offset: float) -> int:
+        period, capacity = self.rate.period, self.rate.capacity
+        if taken < capacity and previous:
+            # Wait until enough of the previous window has drained.
+            needed = 1 - (capacity - taken - 1) / previous
+            return max(1, math.ceil(needed * period - offset))
+        # Wait for the next window, then for this window's count to drain.
+        wait = period - offset
+        if taken >= capacity:
+            wait += (1 - (capacity - 1) / taken) * period
+        return max(1, math.ceil(wait))
+
+
+def client_ip(request) -> str:
+    """Return the address of the client, allowing for trusted proxies."""
+    remote_addr = request.META.get("REMOTE_ADDR", "")
+    hops = getattr(settings, "THROTTLE_TRUSTED_PROXIES", 0)
+    if not hops:
+        return remote_addr
+    header = getattr(settings, "THROTTLE_PROXY_HEADER", "HTTP_X_FORWARDED_FOR")
+    addresses = [address.strip() for address in request.META.get(header, "").split(",") if address.strip()]
+    if not addresses:
+        return remote_addr
+    # Fewer entries than proxies: the leftmost is the furthest one known.
+    return addresses[-min(hops, len(addresses))]
+
+
+def buckets_for(request, url_name: str, view_kwargs: dict) -> list[TokenBucket]:
+    """Return the buckets a request to ``url_name`` must draw from."""
+    scopes = getattr(settings, "THROTTLE_RATES", {}).get(url_name, {})
+    buckets = []
+    for scope, rate in scopes.items():
+        if scope == "user":
+            if not request.user.is_authenticated:
+                continue
+            ident = request.user.pk
+        elif scope == "ip":
+            ident = client_ip(request)
+        elif scope == "event":
+            ident = view_kwargs.get("slug")
+            if ident is None:
+                continue
+        else:
+            raise ValueError(f"Unknown throttle scope {scope!r} for {url_name!r}")
+        buckets.append(TokenBucket(f"{url_name}:{scope}:{ident}", Rate.parse(rate)))
+    return buckets
+
+
+class ThrottleMiddleware:
+    """Reject POSTs that exceed the ``THROTTLE_RATES`` for their URL."""
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in THROTTLED_METHODS or request.resolver_match is None:
+            return None
+        buckets = buckets_for(request, request.resolver_match.url_name, view_kwargs)
+        now = time.time()
+        granted = []
+        for bucket in buckets:
+            allowed, retry_after = bucket.take(now)
+            if not allowed:
+                # Don't charge the other buckets for a rejected request.
+                for other in granted:
+                    other.give_back(now)
+                response = HttpResponse(
+                    "Too many requests, please try again shortly.",
+                    status=429,
+                    content_type="text/plain",
+                )
+                response["Retry-After"] = str(retry_after)
+                return response
+            granted.append(bucket)
+        return None
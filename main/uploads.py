@@ -0,0 +1,279 @@
+"""Streaming, validated uploads of event images.
+
+Django's default handlers keep small uploads in memory and write large
+ones to a temporary file.  Either way they accept the whole body before
+the form's ``ImageField`` looks at it.  :class:`EventImageUploadHandler`
+replaces them on the event form, and it checks each upload as the bytes
+arrive:
+
+* The upload is refused as soon as it passes ``EVENT_IMAGE_MAX_BYTES``.
+  A request whose ``Content-Length`` is already too large is refused
+  before its first byte is read.  The rest of a refused upload is read
+  and thrown away, not stored.
+* The first bytes are held in memory until the image header has been
+  read.  Only JPEG, PNG, GIF and WebP are accepted.  Images wider or
+  taller than ``EVENT_IMAGE_MAX_SIDE``, or with more than
+  ``EVENT_IMAGE_MAX_PIXELS`` pixels, are refused before anything is
+  written to disk.  :func:`sniff` reads only the header; it never
+  decodes pixels.
+* Accepted data is written to a temporary file in 64 KiB chunks and
+  hashed with SHA-256 on the way.
+
+A refused upload is not an exception.  The handler records the reason in
+:attr:`EventImageUploadHandler.errors` and the view shows it on the
+form's ``image`` field.
+
+Event images are stored by :class:`ContentAddressedStorage` under
+``events/<hash prefix>/<sha256>.<ext>``.  Twenty events with the same
+poster therefore share a single file.  Storing a file that already exists
+writes nothing.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import struct
+import uuid
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+from django.template.defaultfilters import filesizeformat
+
+DEFAULT_MAX_BYTES = 10 * 2**20
+DEFAULT_MAX_PIXELS = 50_000_000
+DEFAULT_MAX_SIDE = 12_000
+
+#: Bytes held in memory while looking for the image dimensions.  JPEG
+#: puts them after the EXIF block, which can be large.
+HEADER_LIMIT = 256 * 2**10
+
+#: Name extensions for the formats :func:`sniff` recognises.
+EXTENSIONS = {"jpeg": "jpg", "png": "png", "gif": "gif", "webp": "webp"}
+
+# JPEG start-of-frame markers, which carry the image size.
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# Markers without a length field.
+_JPEG_STANDALONE = {0x01, *range(0xD0, 0xD9)}
+
+
+class NotAnImage(ValueError):
+    """The data does not start like a supported image."""
+
+
+def sniff(header: bytes) -> tuple[str, int, int] | None:
+    """Return ``(format, width, height)`` from the first bytes of an image.
+
+    Returns ``None`` if ``header`` is too short to tell.  Raises
+    :class:`NotAnImage` if the data is not JPEG, PNG, GIF or WebP.
+    """
+    if header[:3] == b"\xff\xd8\xff":
+        return _sniff_jpeg(header)
+    if header[:8] == b"\x89PNG\r\n\x1a\n":
+        if len(header) < 24:
+            return None
+        if header[12:16] != b"IHDR":
+            raise NotAnImage("Damaged PNG header.")
+        width, height = struct.unpack(">II", header[16:24])
+        return "png", width, height
+    if header[:6] in (b"GIF87a", b"GIF89a"):
+        if len(header) < 10:
+            return None
+        width, height = struct.unpack("<HH", header[6:10])
+        return "gif", width, height
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return _sniff_webp(header)
+    if len(header) < 12 and any(
+        magic.startswith(header[: len(magic)]) for magic in (b"\xff\xd8\xff", b"\x89PNG", b"GIF8", b"RIFF")
+    ):
+        return None
+    raise NotAnImage("Upload a JPEG, PNG, GIF or WebP image.")
+
+
+def _sniff_jpeg(header: bytes) -> tuple[str, int, int] | None:
+    i = 2
+    while True:
+        # Skip fill bytes before a marker.
+        while i < len(header) and header[i] == 0xFF:
+            i += 1
+        if i >= len(header):
+            return None
+        marker = header[i]
+        i += 1
+        if header[i - 2] != 0xFF:
+            raise NotAnImage("Damaged JPEG header.")
+        if marker in _JPEG_STANDALONE:
+            continue
+        if marker in (0xD9, 0xDA):
+            raise NotAnImage("JPEG image without a frame header.")
+        if i + 2 > len(header):
+            return None
+        (length,) = struct.unpack(">H", header[i:i + 2])
+        if marker in _JPEG_SOF:
+            if i + 7 > len(header):
+                return None
+            height, width = struct.unpack(">HH", header[i + 3:i + 7])
+            return "jpeg", width, height
+        i += length
+
+
+def _sniff_webp(header: bytes) -> tuple[str, int, int] | None:
+    if len(header) < 30:
+        return None
+    chunk = header[12:16]
+    if chunk == b"VP8X":
+        width = int.from_bytes(header[24:27], "little") + 1
+        height = int.from_bytes(header[27:30], "little") + 1
+    elif chunk == b"VP8 ":
+        if header[23:26] != b"\x9d\x01\x2a":
+            raise NotAnImage("Damaged WebP header.")
+        width, height = (value & 0x3FFF for value in struct.unpack("<HH", header[26:30]))
+    elif chunk == b"VP8L":
+        bits = int.from_bytes(header[21:25], "little")
+        width, height = (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    else:
+        raise NotAnImage("Damaged WebP header.")
+    return "webp", width, height
+
+
+class EventImageUploadHandler(FileUploadHandler):
+    """Stream an event image to disk, refusing bad uploads early.
+
+    Set this handler on the request before anything reads
+    ``request.POST`` or ``request.FILES``.
+    """
+
+    chunk_size = 64 * 2**10
+
+    def __init__(self, request=None) -> None:
+        super().__init__(request)
+        self.max_bytes = getattr(settings, "EVENT_IMAGE_MAX_BYTES", DEFAULT_MAX_BYTES)
+        self.max_pixels = getattr(settings, "EVENT_IMAGE_MAX_PIXELS", DEFAULT_MAX_PIXELS)
+        self.max_side = getattr(settings, "EVENT_IMAGE_MAX_SIDE", DEFAULT_MAX_SIDE)
+        #: Why each refused upload was refused, by field name.
+        self.errors: dict[str, str] = {}
+        self.request_length = None
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        self.request_length = content_length
+        return None
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        # The previous file belongs to the request now; don't close it.
+        self.__dict__.pop("file", None)
+        self.header = b""
+        self.received = 0
+        self.image = None
+        self.hasher = hashlib.sha256()
+        # The form fields are capped at DATA_UPLOAD_MAX_MEMORY_SIZE, so a
+        # longer request must carry too large a file.
+        form_limit = settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+        if form_limit is not None and self.request_length and self.request_length > self.max_bytes + form_limit:
+            self._refuse(self._too_large())
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_bytes:
+            self._refuse(self._too_large())
+        self.hasher.update(raw_data)
+        if self.image is None:
+            self.header += raw_data
+            try:
+                image = sniff(self.header)
+            except NotAnImage as exc:
+                self._refuse(str(exc))
+            if image is None:
+                if len(self.header) >= HEADER_LIMIT:
+                    self._refuse("The image header could not be read.")
+                return None
+            self._check_size(*image)
+            self.image = image
+            raw_data, self.header = self.header, b""
+            self.file = TemporaryUploadedFile(self.file_name, self.content_type, 0, self.charset, self.content_type_extra)
+        self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self.image is None:
+            self.errors[self.field_name] = "The upload is not a complete image." if file_size else "The upload is empty."
+            return None
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.sha256 = self.hasher.hexdigest()
+        self.file.image_format, self.file.width, self.file.height = self.image
+        return self.file
+
+    def upload_interrupted(self):
+        self._discard()
+
+    def _check_size(self, image_format: str, width: int, height: int) -> None:
+        if not width or not height:
+            self._refuse("The image has no size.")
+        if width > self.max_side or height > self.max_side or width * height > self.max_pixels:
+            self._refuse(
+                f"The image is {width} × {height} pixels; the most allowed is "
+                f"{self.max_side} pixels a side and {self.max_pixels / 1e6:g} megapixels."
+            )
+
+    def _too_large(self) -> str:
+        return f"The image must be no larger than {filesizeformat(self.max_bytes)}."
+
+    def _refuse(self, message: str):
+        self.errors[self.field_name] = message
+        self._discard()
+        raise SkipFile(message)
+
+    def _discard(self) -> None:
+        # The parser closes ``handler.file`` on errors, so it is only set
+        # while there is a file to close.  Closing a temporary upload
+        # deletes it.
+        file = self.__dict__.pop("file", None)
+        if file is not None:
+            file.close()
+        self.header = b""
+
+
+def content_hash(file) -> str:
+    """SHA-256 of an uploaded file, computed while streaming when possible."""
+    digest = getattr(file, "sha256", None)
+    if digest:
+        return digest
+    hasher = hashlib.sha256()
+    file.seek(0)
+    for chunk in file.chunks():
+        hasher.update(chunk)
+    file.seek(0)
+    return hasher.hexdigest()
+
+
+def event_image_path(instance, filename: str) -> str:
+    """``upload_to`` for ``Event.image``: a name derived from the content."""
+    file = instance.image.file
+    extension = EXTENSIONS.get(getattr(file, "image_format", None)) or os.path.splitext(filename)[1].lstrip(".").lower()
+    digest = content_hash(file)
+    return f"events/{digest[:2]}/{digest}.{extension or 'bin'}"
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """File storage where a name identifies its content.
+
+    Saving under a name that already exists keeps the stored file.  New
+    files are written under a temporary name and then renamed into
+    place.  Two uploads of the same image at the same moment therefore
+    both succeed and leave one complete file.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        if self.exists(name):
+            return name
+        partial = super()._save(f"{name}.{uuid.uuid4().hex}.part", content)
+        os.replace(self.path(partial), self.path(name))
+        return name
+
+
+image_storage = ContentAddressedStorage()
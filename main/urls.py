@@ -9,6 +9,12 @@ from . import views
 urlpatterns = [
     path("", views.HomePageView.as_view(), name="home"),
     path("events/<slug:slug>/", views.EventDetailView.as_view(), name="event-detail"),
+    # Member-only parts of the event page, fetched by the public page.
+    path(
+        "events/<slug:slug>/member/",
+        views.EventMemberFragmentView.as_view(),
+        name="event-member-fragment",
+    ),
     # Trip creation route (regular trip) under the "Organise a Trip!" menu.
     # In a complete implementation this could be restricted by
     # authentication/permissions and extended to support belay courses or
@@ -20,6 +26,12 @@ urlpatterns = [
         views.EventSignupView.as_view(),
         name="event-signup",
     ),
+    # Leader's accept/reject screen for "Trip Leader Picks" trips.
+    path(
+        "events/<slug:slug>/selection/",
+        views.EventSelectionView.as_view(),
+        name="event-selection",
+    ),
     # Static content pages replicating the Drupal structure.  Each template
     # should be created under templates/main/ and filled with the
     # appropriate HTML content.  These routes preserve readable URLs.
@@ -32,6 +44,13 @@ urlpatterns = [
     path("contact/faq/", TemplateView.as_view(template_name="main/faq.html"), name="faq"),
     path("contact/signing-up/", TemplateView.as_view(template_name="main/signing_up.html"), name="signing-up"),
     path("contact/member-protection/", TemplateView.as_view(template_name="main/member_protection.html"), name="member-protection"),
+    # Personal pages for leaders and participants
+    path("my/trips/", views.LeaderDashboardView.as_view(), name="my-trips"),
+    path("my/signups/", views.MySignupsView.as_view(), name="my-signups"),
+    path("my/preferences/", views.TripPreferencesView.as_view(), name="my-preferences"),
+    # Offline support: the service worker and the list of URLs it caches.
+    path("sw.js", views.service_worker, name="service-worker"),
+    path("offline-manifest.json", views.offline_manifest, name="offline-manifest"),
     # User registration
     path("accounts/signup/", views.SignUpView.as_view(), name="signup"),
 ]
\ No newline at end of file
@@ -1,15 +1,40 @@
 """Views for the ANUMC site."""
 from __future__ import annotations
 
+import json
+import math
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.shortcuts import get_object_or_404, render
+from django.http import Http404, HttpResponse, HttpResponseRedirect, JsonResponse
+from django.templatetags.static import static
 from django.urls import reverse
 from django.views import generic
+from django.views.decorators.cache import cache_control
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_cookie
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
 from django.contrib.auth import get_user_model
 
-from .forms import EventForm, EventSignupForm, UserRegistrationForm
-from .models import Announcement, Event, EventSignup
+from . import caching, feed, gazetteer, offline
+from .forms import EventForm, EventSignupForm, SignupSelectionForm, TripPreferencesForm, UserRegistrationForm
+from .models import ArchivedEvent, Event, EventSignup
+from .selection import set_selection
+from .uploads import EventImageUploadHandler
+
+# How long browsers and shared caches may reuse the public event page
+# before revalidating it against its ETag.
+EVENT_PAGE_MAX_AGE = 60
+
+# How long a sign-up submission's idempotency key is remembered.
+SIGNUP_SUBMISSION_TTL = 60 * 60 * 24
 
 
 class HomePageView(generic.ListView):
@@ -18,19 +43,65 @@ class HomePageView(generic.ListView):
     template_name = "main/home.html"
     context_object_name = "events"
 
+    #: Default radius for ``?near=<place>`` searches, in kilometres.
+    NEAR_KM = 150
+    #: Longest ``near`` value geocoded; each word costs gazetteer lookups.
+    NEAR_MAX_LENGTH = 100
+
     def get_queryset(self):
         # Show only upcoming events ordered by their start date/time.  Use
         # ``start_datetime`` rather than the deprecated ``start_date``.
-        return Event.objects.order_by("start_datetime")
+        events = Event.objects.order_by("start_datetime")
+        # ``?near=Canberra&km=150`` narrows the list to trips nearby.
+        near = self.request.GET.get("near", "")[: self.NEAR_MAX_LENGTH].strip()
+        point = gazetteer.geocode(near) if near else None
+        if point:
+            try:
+                km = float(self.request.GET.get("km", self.NEAR_KM))
+            except ValueError:
+                km = self.NEAR_KM
+            # ``nan`` and ``inf`` parse as floats but slip through the clamp.
+            km = min(max(km, 1.0), 5000.0) if math.isfinite(km) else self.NEAR_KM
+            events = events.within_radius(*point, km)
+        return events
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["announcements"] = Announcement.objects.filter(display_on_home=True)
+        # Scheduled announcements are cached until the next publish/expire
+        # boundary; see caching.home_announcements.
+        context["announcements"] = caching.home_announcements()
+        # Members see the trips that suit them first; the ranking is
+        # cached and kept current by feed.py, so this adds no queries.
+        if self.request.user.is_authenticated:
+            context["events"] = context["object_list"] = feed.personalise(self.request.user, context["object_list"])
+            context["personalised"] = True
         return context
 
 
+def event_etag(request, slug: str) -> str | None:
+    """ETag for the public event page, derived from the event's last edit."""
+    updated_at = Event.objects.filter(slug=slug).values_list("updated_at", flat=True).first()
+    if updated_at is None:
+        # Archived trips no longer change; their archive time will do.
+        updated_at = ArchivedEvent.objects.filter(slug=slug).values_list("archived_at", flat=True).first()
+    if updated_at is None:
+        return None
+    return offline.event_page_etag(slug, updated_at)
+
+
+@method_decorator(condition(etag_func=event_etag), name="get")
+@method_decorator(cache_control(public=True, max_age=EVENT_PAGE_MAX_AGE), name="get")
 class EventDetailView(generic.DetailView):
-    """Display details of a single event."""
+    """Display the public details of a single event.
+
+    The page is identical for every visitor, so it can be served from a
+    shared cache or reverse proxy: it never touches the session (and so
+    gets no ``Vary: Cookie``).  Member-only details are loaded separately
+    from :class:`EventMemberFragmentView`.
+
+    Trips moved to the archive by ``archive_events`` are still served,
+    read-only, from their archived copy.
+    """
 
     model = Event
     template_name = "main/event_detail.html"
@@ -39,12 +110,75 @@ class EventDetailView(generic.DetailView):
     slug_field = "slug"
     slug_url_kwarg = "slug"
 
+    def get_object(self, queryset=None):
+        self.archived = False
+        try:
+            return super().get_object(queryset)
+        except Http404:
+            archived = ArchivedEvent.objects.filter(slug=self.kwargs["slug"]).first()
+            if archived is None:
+                raise
+            self.archived = True
+            return archived.to_event()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["archived"] = self.archived
+        return context
+
+
+def member_fragment_etag(request, slug: str) -> str | None:
+    """ETag for the member fragment; lets the offline worker skip unchanged rosters."""
+    if not request.user.is_authenticated:
+        return None
+    row = (
+        Event.objects.filter(slug=slug)
+        .annotate(signup_count=Count("signups"), last_signup=Max("signups__pk"))
+        .values_list("created_by_id", "updated_at", "signup_count", "last_signup")
+        .first()
+    )
+    if row is None:
+        return None
+    created_by_id, updated_at, signup_count, last_signup = row
+    leader = request.user.pk == created_by_id or request.user.is_staff
+    return offline.roster_etag(slug, updated_at, signup_count, last_signup, leader=leader)
+
+
+def my_trips_etag(request) -> str | None:
+    """ETag for the leader dashboard, from the same query as the manifest's."""
+    if not request.user.is_authenticated:
+        return None
+    return offline.my_trips_etag(offline.leader_trips(request.user))
+
+
+@method_decorator(condition(etag_func=member_fragment_etag), name="get")
+@method_decorator(cache_control(private=True, no_cache=True), name="get")
+class EventMemberFragmentView(generic.DetailView):
+    """Per-user fragment of the event page.
+
+    Members see the leader's contact details; the event creator and staff
+    also see the participant list.  Anonymous visitors get an empty
+    ``204`` response without a database query.
+    """
+
+    model = Event
+    template_name = "main/event_member_fragment.html"
+    context_object_name = "event"
+
+    slug_field = "slug"
+    slug_url_kwarg = "slug"
+
+    def get(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return HttpResponse(status=204)
+        return super().get(request, *args, **kwargs)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        event: Event = self.get_object()
+        event: Event = self.object
         user = self.request.user
         # Determine if the current user can view sign‑ups: the event creator or staff
-        if user.is_authenticated and (user == event.created_by or user.is_staff):
+        if user == event.created_by or user.is_staff:
             context["show_signups"] = True
             context["signups"] = event.signups.all()
         else:
@@ -53,6 +187,7 @@ class EventDetailView(generic.DetailView):
         return context
 
 
+@method_decorator(csrf_exempt, name="dispatch")
 class EventCreateView(generic.CreateView):
     """Allow trip leaders to create a new event (trip).
 
@@ -61,6 +196,12 @@ class EventCreateView(generic.CreateView):
     event.  In a future iteration, access control should be added so
     that only authenticated users with appropriate permissions can
     create trips.
+
+    The event image is read by :class:`~main.uploads.EventImageUploadHandler`.
+    That handler has to be installed before anything reads the request
+    body.  The CSRF middleware reads ``request.POST``, so it is skipped
+    here and the CSRF check runs in :meth:`dispatch` instead, once the
+    handler is in place.
     """
 
     model = Event
@@ -71,6 +212,13 @@ class EventCreateView(generic.CreateView):
         # After saving, redirect to the newly created event's detail page
         return self.object.get_absolute_url()
 
+    def get_form(self, form_class=None):
+        form = super().get_form(form_class)
+        # Uploads the handler refused never reach the form; report why.
+        for field, message in self.upload_handler.errors.items():
+            form.add_error(field, message)
+        return form
+
     def form_valid(self, form):
         # Attach the creator to the event before saving
         if self.request.user.is_authenticated:
@@ -78,9 +226,15 @@ class EventCreateView(generic.CreateView):
         return super().form_valid(form)
 
     @method_decorator(login_required)
-    def dispatch(self, *args, **kwargs):  # type: ignore[override]
+    def dispatch(self, request, *args, **kwargs):  # type: ignore[override]
         """Ensure only authenticated users can access the create view."""
-        return super().dispatch(*args, **kwargs)
+        self.upload_handler = EventImageUploadHandler(request)
+        request.upload_handlers = [self.upload_handler]
+        return csrf_protect(super().dispatch)(request, *args, **kwargs)
+
+
+class EventFull(Exception):
+    """Raised to roll back a sign-up to a trip with no places left."""
 
 
 class EventSignupView(generic.CreateView):
@@ -101,9 +255,17 @@ class EventSignupView(generic.CreateView):
         return Event.objects.get(slug=self.kwargs["slug"])
 
     def form_valid(self, form):
+        # A retried submission of the same form (double-click, flaky mobile
+        # connection) is answered from the cache without touching the DB.
+        key = form.cleaned_data.get("idempotency_key") or uuid.uuid4()
+        cache_key = f"signup-submission:{self.request.user.pk}:{key}"
+        if cache.get(cache_key):
+            return HttpResponseRedirect(self.get_success_url())
+
         # Attach the event and user to the sign‑up instance before saving
         event = self.get_event()
         form.instance.event = event
+        form.instance.idempotency_key = key
         if self.request.user.is_authenticated:
             form.instance.user = self.request.user
             # Pre-fill full_name and email if not provided
@@ -111,7 +273,26 @@ class EventSignupView(generic.CreateView):
                 form.instance.full_name = self.request.user.profile.full_name
             if not form.cleaned_data.get("email"):
                 form.instance.email = self.request.user.email
-        return super().form_valid(form)
+        try:
+            with transaction.atomic():
+                # Duplicate (event, email) submissions return the existing
+                # sign-up instead of raising IntegrityError.
+                self.object, created = EventSignup.objects.insert_or_get(form.instance)
+                if created and self.object.user_id:
+                    # The insert sends no post_save, so drop the member's
+                    # feed ranking here; see main.signals.reset_feed_for_signup.
+                    user_id = self.object.user_id
+                    transaction.on_commit(lambda: feed.invalidate(user_id))
+                if created and self.object.occupies_place(event):
+                    # Take the place only if one is left, in the same UPDATE,
+                    # so concurrent sign-ups can't overfill the trip.
+                    if not Event.objects.filter(pk=event.pk).with_places_left().adjust_participant_count(1):
+                        raise EventFull
+        except EventFull:
+            form.add_error(None, "Sorry, this trip is full.")
+            return self.form_invalid(form)
+        cache.set(cache_key, self.object.pk, SIGNUP_SUBMISSION_TTL)
+        return HttpResponseRedirect(self.get_success_url())
 
     def get_success_url(self):
         # Redirect back to the event detail page after successful sign‑up
@@ -123,6 +304,85 @@ class EventSignupView(generic.CreateView):
         return super().dispatch(*args, **kwargs)
 
 
+@method_decorator(condition(etag_func=my_trips_etag), name="get")
+class LeaderDashboardView(LoginRequiredMixin, generic.ListView):
+    """List the trips led by the current user with sign-up statistics.
+
+    Counts come from a single aggregated query (see
+    ``EventQuerySet.with_signup_stats``), so the page costs the same
+    number of queries however many trips the leader runs.
+    """
+
+    template_name = "main/my_trips.html"
+    context_object_name = "events"
+
+    def get_queryset(self):
+        return self.request.user.events_created.with_signup_stats().order_by("start_datetime")
+
+
+class MySignupsView(LoginRequiredMixin, generic.ListView):
+    """List the trips the current user has signed up for."""
+
+    template_name = "main/my_signups.html"
+    context_object_name = "signups"
+
+    def get_queryset(self):
+        return self.request.user.event_signups.select_related("event").order_by("event__start_datetime")
+
+
+class TripPreferencesView(LoginRequiredMixin, generic.UpdateView):
+    """Let members choose the trips shown first on their home page."""
+
+    form_class = TripPreferencesForm
+    template_name = "main/preferences.html"
+
+    def get_object(self, queryset=None):
+        return self.request.user.profile
+
+    def get_success_url(self):
+        return reverse("home")
+
+
+class EventSelectionView(LoginRequiredMixin, generic.FormView):
+    """Let the leader of a "Trip Leader Picks" trip accept or reject sign-ups.
+
+    Any number of sign-ups can be decided at once; see
+    :func:`main.selection.set_selection`.
+    """
+
+    form_class = SignupSelectionForm
+    template_name = "main/event_selection.html"
+
+    def dispatch(self, request, *args, **kwargs):  # type: ignore[override]
+        self.event = get_object_or_404(Event, slug=kwargs["slug"])
+        user = request.user
+        if user.is_authenticated and not (user == self.event.created_by or user.is_staff):
+            raise PermissionDenied
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs["event"] = self.event
+        return kwargs
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["event"] = self.event
+        return context
+
+    def form_valid(self, form):
+        ids = [signup.pk for signup in form.cleaned_data["signups"]]
+        try:
+            set_selection(self.event, ids, form.cleaned_data["action"])
+        except ValidationError as exc:
+            form.add_error(None, exc)
+            return self.form_invalid(form)
+        return super().form_valid(form)
+
+    def get_success_url(self):
+        return reverse("event-selection", kwargs={"slug": self.event.slug})
+
+
 class SignUpView(generic.CreateView):
     """Allow new users to create an account.
 
@@ -142,4 +402,34 @@ class SignUpView(generic.CreateView):
         # Automatically log the user in after registration
         from django.contrib.auth import login
         login(self.request, self.object)
-        return response
\ No newline at end of file
+        return response
+
+
+@cache_control(no_cache=True)
+def service_worker(request):
+    """Serve the offline service worker from the site root.
+
+    It must live at ``/sw.js`` (not under ``/static/``) to control every
+    page, and is revalidated on each load so deploys are picked up.
+    """
+    return render(
+        request,
+        "main/sw.js",
+        {
+            "version": offline.cache_version(),
+            "manifest_url": reverse("offline-manifest"),
+            "login_path": reverse("login"),
+            "logout_path": reverse("logout"),
+            "static_prefix": static(""),
+            "content_paths": json.dumps([reverse(name) for name in offline.CONTENT_PAGES]),
+            "network_first_paths": json.dumps([reverse(name) for name in offline.NETWORK_FIRST_PAGES]),
+        },
+        content_type="application/javascript",
+    )
+
+
+@vary_on_cookie
+@cache_control(private=True, no_cache=True)
+def offline_manifest(request):
+    """List the URLs the service worker keeps offline, with their ETags."""
+    return JsonResponse(offline.manifest(request.user))
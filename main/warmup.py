@@ -0,0 +1,199 @@
+"""Warm a freshly started worker before it serves traffic.
+
+A new worker pays on its first requests for importing the views,
+building the URL resolver, compiling templates, connecting to the
+database and filling empty caches, which shows up as latency spikes after
+every deploy or worker recycle.  :func:`warm_up` does all of that up
+front.  It is run by the ``warmup`` management command and by the
+gunicorn ``post_worker_init`` hook in ``gunicorn.conf.py``.
+
+:func:`profile_imports` reports where start-up time goes, per module,
+using Python's ``-X importtime`` in a fresh interpreter.
+"""
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+import sys
+import time
+import uuid
+from importlib import import_module
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.template import TemplateDoesNotExist, engines
+from django.urls import get_resolver, resolve, reverse
+from django.utils import timezone
+
+#: Modules imported for every installed app, when they exist.
+APP_MODULES = ("models", "views", "urls", "forms", "admin", "signals")
+
+#: Sample values used to reverse URL patterns with arguments.
+SAMPLE_ARGUMENTS = {"slug": "warmup", "str": "warmup", "path": "warmup", "int": 1, "uuid": uuid.UUID(int=0)}
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_app_modules() -> int:
+    """Import the views, URLs, forms etc. of every installed app."""
+    imported = 0
+    for app in apps.get_app_configs():
+        for name in APP_MODULES:
+            module = f"{app.name}.{name}"
+            try:
+                import_module(module)
+            except ModuleNotFoundError as exc:
+                if exc.name != module:
+                    raise
+                continue
+            imported += 1
+    return imported
+
+
+def resolve_urls() -> int:
+    """Build the URL resolver and reverse/resolve every named ``main`` URL."""
+    from main import urls
+
+    get_resolver().reverse_dict  # noqa: B018 - populates the resolver
+    resolved = 0
+    for pattern in urls.urlpatterns:
+        if not getattr(pattern, "name", None):
+            continue
+        converters = getattr(pattern.pattern, "converters", {})
+        kwargs = {
+            arg: SAMPLE_ARGUMENTS.get(type(converter).__name__.replace("Converter", "").lower(), "warmup")
+            for arg, converter in converters.items()
+        }
+        resolve(reverse(pattern.name, kwargs=kwargs or None))
+        resolved += 1
+    return resolved
+
+
+def compile_templates() -> int:
+    """Load every template under ``templates/main/`` into each engine's cache."""
+    names = sorted(
+        f"main/{path.name}"
+        for directory in _template_dirs()
+        for path in (Path(directory) / "main").glob("*")
+        if path.is_file()
+    )
+    compiled = 0
+    for engine in engines.all():
+        for name in names:
+            try:
+                engine.get_template(name)
+            except TemplateDoesNotExist:
+                continue
+            compiled += 1
+    return compiled
+
+
+def _template_dirs() -> list:
+    dirs = []
+    for config in settings.TEMPLATES:
+        dirs.extend(config.get("DIRS", []))
+    return dirs
+
+
+def open_connections() -> int:
+    """Connect to every configured database.
+
+    Only worth doing with a non-zero ``CONN_MAX_AGE`` (see settings.py):
+    otherwise the first request closes the connection again.
+    """
+    for connection in connections.all():
+        connection.ensure_connection()
+    return len(connections.all())
+
+
+def prime_caches(*, host: str | None = None, events: int = 20) -> int:
+    """Fill the home and event page caches; return the pages rendered.
+
+    The home page and the next ``events`` event pages are requested
+    through the full middleware stack, once per supported encoding, so
+    the compressed variants are cached too.
+    """
+    from django.test import Client
+
+    from . import caching, compression, offline
+    from .models import Event
+
+    caching.home_announcements()
+    offline.cache_version()
+    upcoming = (
+        Event.objects.filter(start_datetime__gte=timezone.now())
+        .order_by("start_datetime")
+        .values_list("slug", flat=True)[:events]
+    )
+    urls = [reverse("home")] + [reverse("event-detail", args=[slug]) for slug in upcoming]
+    client = Client(HTTP_HOST=host or default_host(), raise_request_exception=False)
+    rendered = 0
+    for encoding in compression.available_encodings():
+        for url in urls:
+            client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+            rendered += 1
+    return rendered
+
+
+def default_host() -> str:
+    for host in settings.ALLOWED_HOSTS:
+        if host != "*" and not host.startswith("."):
+            return host
+    return "localhost"
+
+
+def warm_up(*, host: str | None = None, events: int = 20, on_error=None) -> list[tuple[str, int, float]]:
+    """Run every warm-up step; return ``(step, items, seconds)`` for each.
+
+    A failing step raises, unless ``on_error`` is given.  In that case it
+    is called as ``on_error(step, exc)`` from inside the ``except`` block,
+    the step is left out of the result and the remaining steps still run.
+    A worker that could not warm up should still serve requests cold.
+    """
+    steps = [
+        ("imports", import_app_modules),
+        ("urls", resolve_urls),
+        ("templates", compile_templates),
+        ("databases", open_connections),
+        ("caches", lambda: prime_caches(host=host, events=events)),
+    ]
+    timings = []
+    for name, step in steps:
+        started = time.perf_counter()
+        try:
+            count = step()
+        except Exception as exc:
+            if on_error is None:
+                raise
+            on_error(name, exc)
+            continue
+        timings.append((name, count, time.perf_counter() - started))
+    return timings
+
+
+def profile_imports(modules: tuple[str, ...] = ("anumc_website.wsgi", "main.views")) -> list[tuple[str, int, int]]:
+    """Import ``modules`` in a fresh interpreter and time every import.
+
+    Returns ``(module, self_us, cumulative_us)`` for each module, slowest
+    first by self time.
+    """
+    code = "import django; django.setup(); " + "; ".join(f"import {module}" for module in modules)
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "anumc_website.settings")}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=settings.BASE_DIR,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            rows.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    rows.sort(key=lambda row: row[1], reverse=True)
+    return rows
@@ -0,0 +1,216 @@
+// Offline-first service worker for the ANUMC site; see main/offline.py.
+//
+// * static assets: cache first, precached on install;
+// * content and event pages: stale-while-revalidate, except the
+//   personalised home page, which is network first;
+// * the leader's rosters: network first, falling back to the offline copy.
+//
+// Cache names carry the deploy's version, so activating a new worker
+// drops the caches of the previous one.  Pages and rosters belong to the
+// member who was logged in when they were cached; they are dropped on
+// login, logout and whenever the manifest names a different member.
+const VERSION = '{{ version|escapejs }}';
+const MANIFEST_URL = '{{ manifest_url|escapejs }}';
+const LOGIN_PATH = '{{ login_path|escapejs }}';
+const LOGOUT_PATH = '{{ logout_path|escapejs }}';
+const STATIC_PREFIX = '{{ static_prefix|escapejs }}';
+const CONTENT_PATHS = {{ content_paths|safe }};
+const NETWORK_FIRST_PATHS = {{ network_first_paths|safe }};
+const ROSTER_PATHS = [/^\/my\/trips\/$/, /^\/events\/[^/]+\/member\/$/];
+const EVENT_PATH = /^\/events\/[^/]+\/$/;
+
+const STATIC_CACHE = `anumc-static-${VERSION}`;
+const PAGE_CACHE = `anumc-pages-${VERSION}`;
+const ROSTER_CACHE = `anumc-rosters-${VERSION}`;
+const META_CACHE = `anumc-meta-${VERSION}`;
+const CURRENT_CACHES = [STATIC_CACHE, PAGE_CACHE, ROSTER_CACHE, META_CACHE];
+const USER_KEY = new URL('/sw-cached-for', self.location).href;
+const SYNCED_KEY = new URL('/sw-synced-at', self.location).href;
+// Pages ask for a sync on every load; the manifest is fetched at most
+// this often (in milliseconds).
+const SYNC_INTERVAL = 5 * 60 * 1000;
+
+self.addEventListener('install', event => {
+  event.waitUntil(sync().catch(() => undefined).then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', event => {
+  event.waitUntil(
+    caches.keys()
+      .then(keys => Promise.all(
+        keys.filter(key => key.startsWith('anumc-') && !CURRENT_CACHES.includes(key))
+          .map(key => caches.delete(key))
+      ))
+      .then(() => self.clients.claim())
+  );
+});
+
+// Pages ask for a sync on every load, so offline copies follow edits.
+self.addEventListener('message', event => {
+  if (event.data === 'sync') {
+    event.waitUntil(throttledSync().catch(() => undefined));
+  }
+});
+
+async function throttledSync() {
+  const meta = await caches.open(META_CACHE);
+  const stored = await meta.match(SYNCED_KEY);
+  const last = stored ? Number(await stored.text()) : 0;
+  if (Date.now() - last < SYNC_INTERVAL) {
+    return;
+  }
+  // Recorded up front so pages loading meanwhile don't sync as well.
+  await meta.put(SYNCED_KEY, new Response(String(Date.now())));
+  await sync();
+}
+
+async function dropPersonalCaches() {
+  await Promise.all([caches.delete(PAGE_CACHE), caches.delete(ROSTER_CACHE)]);
+}
+
+// Drop every personal copy, e.g. on a shared club laptop after logout,
+// and sync again on the next page load.
+async function forgetUser() {
+  await dropPersonalCaches();
+  const meta = await caches.open(META_CACHE);
+  await Promise.all([meta.delete(USER_KEY), meta.delete(SYNCED_KEY)]);
+}
+
+// Forget pages cached for a different member (or before logging out).
+async function switchUser(user) {
+  const meta = await caches.open(META_CACHE);
+  const stored = await meta.match(USER_KEY);
+  const previous = stored ? await stored.text() : '';
+  if (previous !== (user || '')) {
+    await dropPersonalCaches();
+    await meta.delete(USER_KEY);
+  } else if (!user) {
+    await caches.delete(ROSTER_CACHE);
+  }
+  if (user) {
+    await meta.put(USER_KEY, new Response(user));
+  }
+}
+
+async function store(cache, url) {
+  const response = await fetch(url, {credentials: 'same-origin'});
+  if (response.status === 200) {
+    await cache.put(url, response.clone());
+  }
+  return response;
+}
+
+// Make ``cache`` hold exactly the ``entries`` (``{url, etag}``) of the
+// manifest, downloading only those whose ETag changed.
+async function refresh(cache, entries) {
+  const listed = new Set(entries.map(entry => new URL(entry.url, self.location).href));
+  for (const request of await cache.keys()) {
+    if (!listed.has(request.url)) {
+      await cache.delete(request);
+    }
+  }
+  await Promise.all(entries.map(async entry => {
+    const cached = await cache.match(entry.url);
+    // Compressed responses carry the weak form of the same ETag.
+    const etag = cached && (cached.headers.get('ETag') || '').replace(/^W\//, '');
+    if (cached && (!entry.etag || etag === entry.etag)) {
+      return;
+    }
+    await store(cache, entry.url);
+  }));
+}
+
+// Bring the caches in line with the manifest.
+async function sync() {
+  const response = await fetch(MANIFEST_URL, {credentials: 'same-origin', cache: 'no-store'});
+  if (!response.ok) {
+    return;
+  }
+  const manifest = await response.json();
+  await switchUser(manifest.user);
+
+  const staticCache = await caches.open(STATIC_CACHE);
+  await Promise.all(manifest.precache.map(async url => {
+    if (!(await staticCache.match(url))) {
+      await store(staticCache, url);
+    }
+  }));
+
+  await refresh(await caches.open(PAGE_CACHE), manifest.pages);
+  await refresh(await caches.open(ROSTER_CACHE), manifest.rosters);
+}
+
+async function cacheFirst(event, cacheName) {
+  const cache = await caches.open(cacheName);
+  const cached = await cache.match(event.request);
+  if (cached) {
+    return cached;
+  }
+  const response = await fetch(event.request);
+  if (response.status === 200 || response.type === 'opaque') {
+    await cache.put(event.request, response.clone());
+  }
+  return response;
+}
+
+async function staleWhileRevalidate(event, cacheName) {
+  const cache = await caches.open(cacheName);
+  const cached = await cache.match(event.request);
+  const network = fetch(event.request).then(async response => {
+    if (response.status === 200) {
+      await cache.put(event.request, response.clone());
+    }
+    return response;
+  });
+  if (cached) {
+    event.waitUntil(network.catch(() => undefined));
+    return cached;
+  }
+  return network;
+}
+
+async function networkFirst(event, cacheName) {
+  const cache = await caches.open(cacheName);
+  try {
+    const response = await fetch(event.request);
+    if (response.status === 200) {
+      await cache.put(event.request, response.clone());
+    }
+    return response;
+  } catch (error) {
+    const cached = await cache.match(event.request);
+    if (cached) {
+      return cached;
+    }
+    throw error;
+  }
+}
+
+self.addEventListener('fetch', event => {
+  const request = event.request;
+  const url = new URL(request.url);
+  const signInOrOut = [LOGIN_PATH, LOGOUT_PATH].includes(url.pathname);
+  if (request.method === 'POST' && url.origin === self.location.origin && signInOrOut) {
+    event.waitUntil(forgetUser());
+    return;
+  }
+  if (request.method !== 'GET') {
+    return;
+  }
+  if (url.origin !== self.location.origin) {
+    // The Bulma stylesheet comes from a CDN.
+    if (request.destination === 'style') {
+      event.respondWith(cacheFirst(event, STATIC_CACHE));
+    }
+    return;
+  }
+  if (url.pathname.startsWith(STATIC_PREFIX)) {
+    event.respondWith(cacheFirst(event, STATIC_CACHE));
+  } else if (ROSTER_PATHS.some(pattern => pattern.test(url.pathname))) {
+    event.respondWith(networkFirst(event, ROSTER_CACHE));
+  } else if (!url.search && NETWORK_FIRST_PATHS.includes(url.pathname)) {
+    event.respondWith(networkFirst(event, PAGE_CACHE));
+  } else if (!url.search && (CONTENT_PATHS.includes(url.pathname) || EVENT_PATH.test(url.pathname))) {
+    event.respondWith(staleWhileRevalidate(event, PAGE_CACHE));
+  }
+});